@@ -0,0 +1,135 @@
+"""
+Классы документов, сгенерированные по схеме заранее (schema_docs.codegen), в сравнении с классами динамической
+области имен: время импорта модуля (с байт-кодом в __pycache__) для схемы из нескольких сотен типов, создание
+документа, чтение и запись полей, валидация.
+
+Запуск: python -m benchmarks.bench_codegen [количество типов]
+"""
+import datetime
+import importlib.util
+import os
+import py_compile
+import sys
+import tempfile
+import time
+import timeit
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.codegen import write_module
+
+from benchmarks.bench_startup import make_schema
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'required'},
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'title': {'type': 'string', 'validate': 'not-empty'},
+        'uid': 'uuid',
+        'date': 'date',
+        'amount': 'number',
+        'active': 'boolean',
+        'line': 'Line',
+    }
+}]
+
+DATA = {
+    'name': 'document', 'title': 'title', 'uid': uuid.UUID(int=1), 'date': datetime.date(2020, 1, 5),
+    'amount': 10.5, 'active': True, 'line': {'code': 'x', 'qty': 1},
+}
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_import(directory: str, name: str, number=5) -> float:
+    """ Возвращает время импорта сгенерированного модуля (байт-код уже в __pycache__), мс """
+    # байт-код записывается явно: при PYTHONDONTWRITEBYTECODE импорт его не сохраняет
+    py_compile.compile(os.path.join(directory, name + '.py'), doraise=True)
+
+    sys.path.insert(0, directory)
+    try:
+        timings = []
+        for _ in range(number):
+            sys.modules.pop(name, None)
+            started = time.perf_counter()
+            importlib.import_module(name)
+            timings.append(time.perf_counter() - started)
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop(name, None)
+
+    return min(timings) * 1000
+
+
+def measure_build(schema, number=5) -> float:
+    """ Возвращает время построения области имен без мемоизации, мс """
+    timings = []
+    for _ in range(number):
+        started = time.perf_counter()
+        build_schemadoc_namespace(schema, memoize=False)
+        timings.append(time.perf_counter() - started)
+
+    return min(timings) * 1000
+
+
+def measure_op(stmt, number=100000) -> float:
+    """ Возвращает время операции, нс """
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e9
+
+
+def main(types=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        startup_path = os.path.join(tmp, 'generated_startup.py')
+        startup_schema = make_schema(types)
+        write_module(startup_schema, startup_path)
+
+        print('{0:<24} {1:>10.2f} ms'.format('build namespace', measure_build(startup_schema)))
+        print('{0:<24} {1:>10.2f} ms'.format('import generated', measure_import(tmp, 'generated_startup')))
+        print()
+
+        path = os.path.join(tmp, 'generated_docs.py')
+        write_module(SCHEMA, path)
+        generated = load_module(path, 'generated_docs').ns
+        dynamic = build_schemadoc_namespace(SCHEMA)
+
+        print('{0:<24} {1:>12} {2:>12}'.format('operation, ns', 'namespace', 'generated'))
+        for name, make_stmt in (
+            ('construct', lambda ns: lambda: ns.Document(**DATA)),
+            ('get fields', lambda ns: _get_fields(ns.Document(**DATA))),
+            ('set fields', lambda ns: _set_fields(ns.Document())),
+            ('validate', lambda ns: ns.Document(**DATA).validate),
+        ):
+            print('{0:<24} {1:>12.1f} {2:>12.1f}'.format(
+                name, measure_op(make_stmt(dynamic)), measure_op(make_stmt(generated))
+            ))
+
+
+def _get_fields(doc):
+    def get():
+        return doc.name, doc.title, doc.uid, doc.date, doc.amount, doc.active
+    return get
+
+
+def _set_fields(doc):
+    def set_():
+        doc.name = 'document'
+        doc.title = 'title'
+        doc.amount = 10.5
+        doc.active = True
+    return set_
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
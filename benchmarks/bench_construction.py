@@ -0,0 +1,53 @@
+"""
+Стоимость создания документов из именованных аргументов и из словаря.
+
+Запуск: python -m benchmarks.bench_construction
+"""
+import timeit
+
+from schema_docs import build_schemadoc_namespace
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': 'string',
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': 'string',
+        'amount': 'number',
+        'line': 'Line',
+    }
+}]
+
+
+def main(number=100000):
+    ns = build_schemadoc_namespace(SCHEMA)
+    data = {'name': 'abc', 'amount': 10, 'line': {'code': 'x', 'qty': 1}}
+
+    cases = (
+        ('empty', lambda: ns.Document()),
+        ('from_dict', lambda: ns.Document(data)),
+        ('kwargs', lambda: ns.Document(**data)),
+    )
+
+    for name, case in cases:
+        per_call = min(timeit.repeat(case, number=number, repeat=3)) / number * 1e9
+        print('{0:<12} {1:>10.1f} ns'.format(name, per_call))
+
+    records = [dict(data, amount=i) for i in range(1000)]
+    batch_cases = (
+        ('loop kwargs', lambda: [ns.Document(**record) for record in records]),
+        ('from_records', lambda: ns.Document.from_records(records)),
+    )
+
+    for name, case in batch_cases:
+        per_doc = min(timeit.repeat(case, number=number // 1000, repeat=3)) / number * 1e9
+        print('{0:<12} {1:>10.1f} ns/doc'.format(name, per_doc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Пропускная способность разбора дат: dateutil против строгого разбора ISO-8601.
+
+Запуск: python -m benchmarks.bench_dates
+"""
+import time
+
+from dateutil import parser
+
+from schema_docs.utils import iso_to_datetime, parse_iso_datetime
+
+
+VALUES = [
+    '2020-01-05',
+    '2020-01-05T10:20:30',
+    '2020-01-05T10:20:30.123456+03:00',
+    '2020-01-05T10:20:30Z',
+    '20200105T102030+0300',
+]
+
+
+def throughput(func, values, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        for value in values:
+            func(value)
+    return number * len(values) / (time.perf_counter() - started)
+
+
+def main(number=20000):
+    print('{0:<36} {1:>14} {2:>14} {3:>14}'.format('value', 'dateutil, 1/s', 'fallback, 1/s', 'iso, 1/s'))
+
+    for value in VALUES:
+        print('{0:<36} {1:>14.0f} {2:>14.0f} {3:>14.0f}'.format(
+            value,
+            throughput(parser.parse, [value], number),
+            throughput(parse_iso_datetime, [value], number),
+            throughput(iso_to_datetime, [value], number),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Накладные расходы на чтение и запись полей документа: дескрипторы полей против диспетчеризации
+через __getattr__/__setattr__ (прежняя реализация SchemaDoc воспроизведена ниже).
+
+Запуск: python -m benchmarks.bench_field_access
+"""
+import timeit
+import uuid
+import datetime
+
+from schema_docs import build_schemadoc_namespace
+
+
+SCHEMA = [{
+    'name': 'Document',
+    'fields': {
+        'name': 'string',
+        'amount': 'number',
+        'uid': 'uuid',
+        'created': 'date',
+    }
+}]
+
+
+def legacy_get(doc, item):
+    if item in doc.schema['fields']:
+        return doc._cast.to_ext(
+            value=doc._data.get(item),
+            field_name=item,
+            field_def=doc.schema['fields'][item],
+            doc=doc
+        )
+
+    raise AttributeError(item)
+
+
+def legacy_set(doc, key, value):
+    if key in doc.schema['fields']:
+        doc._data[key] = doc._cast.from_ext(
+            value=value,
+            field_name=key,
+            field_def=doc.schema['fields'][key],
+            doc=doc
+        )
+    else:
+        object.__setattr__(doc, key, value)
+
+
+def main(number=200000):
+    ns = build_schemadoc_namespace(SCHEMA)
+    doc = ns.Document(name='abc', amount=10, uid=uuid.uuid4(), created=datetime.date.today())
+
+    print('{0:<10} {1:<6} {2:>14} {3:>14} {4:>8}'.format('field', 'op', 'legacy, ns', 'descr., ns', 'speedup'))
+
+    for field_name in ('name', 'amount', 'uid', 'created'):
+        value = getattr(doc, field_name)
+        cases = (
+            ('get', lambda: legacy_get(doc, field_name), lambda: getattr(doc, field_name)),
+            ('set', lambda: legacy_set(doc, field_name, value), lambda: setattr(doc, field_name, value)),
+        )
+        for op, legacy, compiled in cases:
+            legacy_ns = min(timeit.repeat(legacy, number=number, repeat=3)) / number * 1e9
+            compiled_ns = min(timeit.repeat(compiled, number=number, repeat=3)) / number * 1e9
+            print('{0:<10} {1:<6} {2:>14.1f} {3:>14.1f} {4:>7.2f}x'.format(
+                field_name, op, legacy_ns, compiled_ns, legacy_ns / compiled_ns
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Пул повторяющихся значений (build_schemadoc_namespace(..., intern_size=...)) при загрузке записей из JSON:
+время from_records и память, которую занимают загруженные документы вместе со значениями (строки, полученные
+из JSON, у каждой записи свои).
+
+Запуск: python -m benchmarks.bench_intern
+"""
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+
+
+SCHEMA = {
+    'name': 'Document',
+    'fields': {
+        'status': 'string',
+        'currency': 'string',
+        'customer': 'uuid',
+        'product': 'uuid',
+        'amount': 'number',
+    }
+}
+
+
+def feed(count: int, cardinality: int = 100) -> str:
+    customers = [uuid.UUID(int=i).hex for i in range(cardinality)]
+    products = [str(uuid.UUID(int=i * 7919)) for i in range(cardinality)]
+    return json.dumps([{
+        'status': ('new', 'paid', 'closed')[i % 3],
+        'currency': ('RUB', 'USD', 'EUR')[i % 3],
+        'customer': customers[i % cardinality],
+        'product': products[i * 31 % cardinality],
+        'amount': i,
+    } for i in range(count)])
+
+
+def measure_time(doc_cls, text: str) -> float:
+    """ Возвращает время загрузки записей в документы, с """
+    records = json.loads(text)
+    started = time.perf_counter()
+    doc_cls.from_records(records)
+    return time.perf_counter() - started
+
+
+def measure_memory(doc_cls, text: str) -> float:
+    """ Возвращает количество байт на документ (вместе со значениями) после освобождения записей """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        records = json.loads(text)
+        docs = doc_cls.from_records(records).docs
+        del records
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return (current - 8 * len(docs)) / len(docs)
+
+
+def main(count=100000):
+    text = feed(count)
+    plain_ns = build_schemadoc_namespace(SCHEMA)
+    intern_ns = build_schemadoc_namespace(SCHEMA, intern_size=4096)
+
+    print('{0:<10} {1:>12} {2:>12}'.format('pool', 'load, ms', 'B/doc'))
+    for name, ns in (('none', plain_ns), ('intern', intern_ns)):
+        elapsed = min(measure_time(ns.Document, text) for _ in range(3))
+        print('{0:<10} {1:>12.1f} {2:>12.1f}'.format(name, elapsed * 1000, measure_memory(ns.Document, text)))
+
+
+if __name__ == '__main__':
+    main()
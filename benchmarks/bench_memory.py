@@ -0,0 +1,77 @@
+"""
+Память, занимаемая документами: обычные документы (словари) и документы с компактным хранением
+(build_schemadoc_namespace(..., compact=True)). Замер через tracemalloc, значения записей общие для обоих
+вариантов, поэтому учитываются только сами документы.
+
+Запуск: python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': 'string',
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': 'string',
+        'uid': 'uuid',
+        'date': 'date',
+        'amount': 'number',
+        'active': 'bool',
+        'line': 'Line',
+    }
+}]
+
+
+def records(count: int, nested: bool) -> list:
+    result = []
+    for i in range(count):
+        record = {
+            'name': 'doc', 'uid': '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60', 'date': '2020-01-05', 'amount': 1,
+            'active': True,
+        }
+        if nested:
+            record['line'] = {'code': 'a', 'qty': 1}
+        result.append(record)
+    return result
+
+
+def measure(doc_cls, data: list) -> float:
+    """ Возвращает количество байт на документ """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        docs = doc_cls.from_records(data).docs
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # список документов (по 8 байт на ссылку) не учитываем
+    return (current - 8 * len(docs)) / len(docs)
+
+
+def main(count=100000):
+    dict_ns = build_schemadoc_namespace(SCHEMA)
+    compact_ns = build_schemadoc_namespace(SCHEMA, compact=True)
+
+    print('{0:<10} {1:>12} {2:>12} {3:>8}'.format('records', 'dict, B/doc', 'compact', 'ratio'))
+    for nested in (False, True):
+        data = records(count, nested)
+        dict_size = measure(dict_ns.Document, data)
+        compact_size = measure(compact_ns.Document, data)
+
+        print('{0:<10} {1:>12.1f} {2:>12.1f} {3:>7.1f}x'.format(
+            'nested' if nested else 'flat', dict_size, compact_size, dict_size / compact_size
+        ))
+
+
+if __name__ == '__main__':
+    main()
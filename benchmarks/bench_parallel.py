@@ -0,0 +1,53 @@
+"""
+Масштабирование валидации записей в пуле процессов (1..N процессов).
+
+Запуск: python -m benchmarks.bench_parallel [количество записей]
+"""
+import os
+import sys
+import time
+
+from schema_docs.parallel import validate_records
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'not-empty'},
+        'qty': {'type': 'number', 'validate': 'required'},
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'uid': {'type': 'uuid', 'validate': 'not-empty'},
+        'date': {'type': 'date', 'validate': 'not-empty'},
+        'amount': 'number',
+        'line': 'Line',
+    }
+}]
+
+
+def main(count=200000):
+    records = [{
+        'name': 'doc{0}'.format(i),
+        'uid': '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60',
+        'date': '2020-01-01',
+        'amount': i,
+        'line': {'code': 'a', 'qty': i},
+    } for i in range(count)]
+
+    print('{0:<8} {1:>12} {2:>14} {3:>8}'.format('workers', 'seconds', 'records/s', 'scaling'))
+
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        started = time.perf_counter()
+        validate_records(SCHEMA, 'Document', records, max_workers=workers, chunk_size=5000)
+        elapsed = time.perf_counter() - started
+
+        baseline = baseline or elapsed
+        print('{0:<8} {1:>12.2f} {2:>14.0f} {3:>7.2f}x'.format(workers, elapsed, count / elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,51 @@
+"""
+Время построения области имен для схемы из нескольких сотен типов: полная сборка, повторный вызов
+с мемоизацией и холодный старт с загрузкой скомпилированной схемы с диска.
+
+Запуск: python -m benchmarks.bench_startup [количество типов]
+"""
+import sys
+import tempfile
+import time
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.cache import SchemaDocNamespaceCache
+
+
+def make_schema(types: int):
+    return [{
+        'name': 'Type{0}'.format(i),
+        'fields': dict(
+            {'field{0}'.format(j): {'type': ('string', 'number', 'date', 'uuid')[j % 4], 'validate': 'required'}
+             for j in range(20)},
+            child='Type{0}'.format((i + 1) % types)
+        )
+    } for i in range(types)]
+
+
+def measure(func, number=5):
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - started) / number * 1000
+
+
+def main(types=300):
+    schema = make_schema(types)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        SchemaDocNamespaceCache(directory=tmp).get(schema)
+
+        print('{0:<24} {1:>10.2f} ms'.format(
+            'build', measure(lambda: build_schemadoc_namespace(schema, memoize=False))
+        ))
+        print('{0:<24} {1:>10.2f} ms'.format(
+            'memoized', measure(lambda: build_schemadoc_namespace(schema))
+        ))
+        print('{0:<24} {1:>10.2f} ms'.format(
+            'cold start from disk', measure(lambda: SchemaDocNamespaceCache(directory=tmp).get(schema))
+        ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,72 @@
+"""
+Стоимость валидации документа: скомпилированный план валидации против сбора правил на каждый вызов
+(прежняя реализация SchemaDocValidator воспроизведена ниже).
+
+Запуск: python -m benchmarks.bench_validation
+"""
+import timeit
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.utils import field_def_param
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'not-empty'},
+        'qty': {'type': 'number', 'validate': 'required'},
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'code': {'type': 'string', 'validate': 'not-empty'},
+        'uid': {'type': 'uuid', 'validate': 'not-empty'},
+        'date': {'type': 'date', 'validate': 'not-empty'},
+        'amount': {'type': 'number', 'validate': lambda value, doc: None if (value or 0) >= 0 else 'negative amount'},
+        'comment': 'string',
+        'line': 'Line',
+    }
+}]
+
+
+def legacy_failed_validation(validator, schema_doc):
+    result = []
+
+    for rule in validator._collect_validation_rules(schema_doc.schema):
+        validation_result = rule.validate(schema_doc)
+        if validation_result is not None:
+            result.append(validation_result)
+
+    for field_name, field_def in schema_doc.schema['fields'].items():
+        if field_def_param(field_def, 'type') in schema_doc.ns.types:
+            nested_doc = getattr(schema_doc, field_name, None)
+            if nested_doc is not None:
+                result.extend(legacy_failed_validation(validator, nested_doc))
+
+    return result
+
+
+def main(number=50000):
+    ns = build_schemadoc_namespace(SCHEMA)
+    docs = {
+        'valid': ns.Document(
+            name='abc', code='x', uid='8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60', date='2020-01-01', amount=1,
+            line={'code': 'a', 'qty': 1}
+        ),
+        'invalid': ns.Document(line={}),
+    }
+
+    print('{0:<10} {1:>14} {2:>14} {3:>8} {4:>16}'.format('doc', 'legacy, ns', 'plan, ns', 'speedup', 'validate(), ns'))
+
+    for name, doc in docs.items():
+        legacy = min(timeit.repeat(lambda: legacy_failed_validation(doc._validator, doc), number=number, repeat=3))
+        compiled = min(timeit.repeat(lambda: doc.failed_validations(), number=number, repeat=3))
+        short_circuit = min(timeit.repeat(lambda: doc.validate(), number=number, repeat=3))
+        print('{0:<10} {1:>14.1f} {2:>14.1f} {3:>7.2f}x {4:>16.1f}'.format(
+            name, legacy / number * 1e9, compiled / number * 1e9, legacy / compiled, short_circuit / number * 1e9
+        ))
+
+
+if __name__ == '__main__':
+    main()
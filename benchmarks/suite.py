@@ -0,0 +1,485 @@
+"""
+Набор бенчмарков горячих путей: создание документов, касты, валидация, вложенные документы, пакетная
+загрузка и сериализация.
+
+Результаты выводятся в JSON (время на операцию в наносекундах). В режиме сравнения с базовыми результатами
+(--baseline) отмечаются замедления больше порога, а код возврата равен 1, если они есть.
+
+Запуск:
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json --threshold 0.1
+    python -m benchmarks --filter cast.
+    python -m benchmarks --filter batch. --max-batch 1000000
+"""
+import argparse
+import datetime
+import decimal
+import json
+import platform
+import sys
+import timeit
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.caster import SchemaDocCaster
+from schema_docs.collection import SchemaDocCollection
+from schema_docs.diff import apply_patch, diff, diff_many
+
+
+# Примеры значений во внешнем представлении для каждого типа поля кастера
+SAMPLE_VALUES = {
+    'string': 'abc',
+    'str': 'abc',
+    'number': 10.5,
+    'num': decimal.Decimal('10'),
+    'int': 10,
+    'array': [1, 2, 3],
+    'list': [1, 2, 3],
+    'object': {'a': 1},
+    'obj': {'a': 1},
+    'date': datetime.date(2020, 1, 5),
+    'datetime': datetime.datetime(2020, 1, 5, 10, 20, 30),
+    'uuid': uuid.UUID('8f5a7a8e-2c1b-4d6e-9f0a-1b2c3d4e5f60'),
+    'boolean': 'true',
+    'bool': True,
+}
+
+# Примеры значений во внутреннем представлении (строки для дат и uuid)
+SAMPLE_INTERNAL_VALUES = {
+    'date': '2020-01-05',
+    'datetime': '2020-01-05T10:20:30+03:00',
+    'uuid': '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60',
+}
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000, 1000000)
+NESTING_LEVELS = (1, 2, 3, 4, 5)
+
+
+class Case(object):
+    """ Бенчмарк: функция, выполняющая items элементарных операций за вызов """
+
+    def __init__(self, name: str, func, items: int = 1):
+        self.name = name
+        self.func = func
+        self.items = items
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Схемы
+# ----------------------------------------------------------------------------------------------------------------------
+def all_types_namespace():
+    return build_schemadoc_namespace([{
+        'name': 'AllTypes',
+        'fields': {field_type: field_type for field_type in SchemaDocCaster().MAP_FROM_EXT},
+    }])
+
+
+def document_namespace(compact: bool = False):
+    return build_schemadoc_namespace([{
+        'name': 'Line',
+        'fields': {
+            'code': {'type': 'string', 'validate': 'not-empty'},
+            'qty': {'type': 'number', 'validate': 'required'},
+        }
+    }, {
+        'name': 'Document',
+        'fields': {
+            'name': {'type': 'string', 'validate': 'required'},
+            'uid': {'type': 'uuid', 'validate': 'not-empty'},
+            'date': {'type': 'date', 'validate': 'not-empty'},
+            'created': 'datetime',
+            'amount': 'number',
+            'active': 'bool',
+            'line': 'Line',
+        }
+    }], compact=compact)
+
+
+def document_record(i: int = 0) -> dict:
+    return {
+        'name': 'doc{0}'.format(i),
+        'uid': '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60',
+        'date': '2020-01-05',
+        'created': '2020-01-05T10:20:30',
+        'amount': i,
+        'active': True,
+        'line': {'code': 'a', 'qty': i},
+    }
+
+
+def nested_namespace(levels: int):
+    schema = [{
+        'name': 'Level{0}'.format(level),
+        'fields': {
+            'name': {'type': 'string', 'validate': 'required'},
+            'date': 'date',
+            'child': 'Level{0}'.format(level + 1),
+        } if level < levels else {
+            'name': {'type': 'string', 'validate': 'required'},
+            'date': 'date',
+        }
+    } for level in range(levels + 1)]
+
+    return build_schemadoc_namespace(schema)
+
+
+def nested_record(levels: int) -> dict:
+    record = {'name': 'leaf', 'date': '2020-01-05'}
+    for level in range(levels):
+        record = {'name': 'level', 'date': '2020-01-05', 'child': record}
+    return record
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Бенчмарки
+# ----------------------------------------------------------------------------------------------------------------------
+def construction_cases():
+    ns = document_namespace()
+    record = document_record()
+
+    yield Case('construct.empty', lambda: ns.Document())
+    yield Case('construct.kwargs', lambda: ns.Document(**record))
+    yield Case('construct.from_dict', lambda: ns.Document().from_dict(record))
+    yield Case('construct.cast_dict', lambda: ns.Document.cast_dict(record))
+
+    compact_ns = document_namespace(compact=True)
+    compact_doc = compact_ns.Document(**record)
+    yield Case('construct.compact.kwargs', lambda: compact_ns.Document(**record))
+    yield Case('construct.compact.to_dict', compact_doc.to_dict)
+    yield Case('construct.compact.read_field', lambda: compact_doc.amount)
+
+
+def cast_cases():
+    ns = all_types_namespace()
+    doc = ns.AllTypes()
+    caster = doc._cast
+
+    for field_type in caster.MAP_FROM_EXT:
+        value = SAMPLE_VALUES[field_type]
+        yield Case('cast.from_ext.{0}'.format(field_type), lambda f=field_type, v=value: setattr(doc, f, v))
+
+    for field_type, to_ext in caster.MAP_TO_EXT.items():
+        value = SAMPLE_INTERNAL_VALUES.get(field_type, SAMPLE_VALUES[field_type])
+        # вызываем кастер напрямую, в обход кэша значений документа
+        yield Case(
+            'cast.to_ext.{0}'.format(field_type),
+            lambda f=field_type, v=value, t=to_ext: t(v, f, f, doc)
+        )
+
+
+def uncached(doc, method_name: str):
+    """
+    Возвращает вызов метода валидации документа без кэша результатов правил: from_dict сбрасывает кэш документа,
+    поэтому правила проверяются заново при каждом вызове
+    """
+    data = doc.to_dict()
+    return lambda: getattr(doc.from_dict(data), method_name)()
+
+
+def validation_cases():
+    rules = {
+        'required': {'type': 'string', 'validate': 'required'},
+        'not-empty.string': {'type': 'string', 'validate': 'not-empty'},
+        'not-empty.number': {'type': 'number', 'validate': 'not-empty'},
+        'not-empty.date': {'type': 'date', 'validate': 'not-empty'},
+        'not-empty.datetime': {'type': 'datetime', 'validate': 'not-empty'},
+        'not-empty.uuid': {'type': 'uuid', 'validate': 'not-empty'},
+        'custom': {'type': 'string', 'validate': lambda value, doc: None if value else 'empty value'},
+    }
+    values = {
+        'valid': {'string': 'abc', 'number': 1, 'date': '2020-01-05', 'datetime': '2020-01-05T10:20:30',
+                  'uuid': '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60'},
+        'invalid': {},
+    }
+
+    for rule_name, field_def in rules.items():
+        ns = build_schemadoc_namespace({'name': 'Document', 'fields': {'x': field_def}})
+
+        for state, state_values in values.items():
+            value = state_values.get(field_def['type'])
+            doc = ns.Document() if value is None else ns.Document(x=value)
+
+            yield Case('validate.{0}.{1}.failed_validations'.format(rule_name, state),
+                       uncached(doc, 'failed_validations'))
+            yield Case('validate.{0}.{1}.validate'.format(rule_name, state), uncached(doc, 'validate'))
+            yield Case('validate.{0}.{1}.failed_validations.cached'.format(rule_name, state), doc.failed_validations)
+            yield Case('validate.{0}.{1}.validate.cached'.format(rule_name, state), doc.validate)
+
+
+def incremental_validation_cases():
+    size = 200
+    fields = {'f{0}'.format(i): {'type': 'string', 'validate': 'not-empty'} for i in range(size)}
+    ns = build_schemadoc_namespace({'name': 'Form', 'fields': fields})
+    record = {name: 'abc' for name in fields}
+
+    doc = ns.Form(**record)
+    doc.validate()
+
+    def edit_and_validate():
+        doc.f0 = 'abcd'
+        return doc.failed_validations()
+
+    yield Case('validate.form.{0}.fresh'.format(size), lambda: ns.Form(**record).failed_validations())
+    yield Case('validate.form.{0}.one_edit'.format(size), edit_and_validate)
+
+
+def nesting_cases():
+    for levels in NESTING_LEVELS:
+        ns = nested_namespace(levels)
+        record = nested_record(levels)
+        doc = ns.Level0(**record)
+
+        def read_leaf(doc=doc, levels=levels):
+            for _ in range(levels):
+                doc = doc.child
+            return doc.date
+
+        yield Case('nested.{0}.construct'.format(levels), lambda ns=ns, r=record: ns.Level0(**r))
+        yield Case('nested.{0}.read_leaf'.format(levels), read_leaf)
+        yield Case('nested.{0}.validate'.format(levels), uncached(doc, 'validate'))
+        yield Case('nested.{0}.failed_validations'.format(levels), uncached(doc, 'failed_validations'))
+        yield Case('nested.{0}.validate.cached'.format(levels), doc.validate)
+        yield Case('nested.{0}.failed_validations.cached'.format(levels), doc.failed_validations)
+
+
+def serialization_cases():
+    ns = document_namespace()
+    doc = ns.Document(**document_record())
+
+    yield Case('serialize.to_dict', doc.to_dict)
+    yield Case('serialize.json_dumps', lambda: json.dumps(doc.to_dict()))
+    yield Case('serialize.to_json', doc.to_json)
+
+
+def array_cases():
+    ns = build_schemadoc_namespace([{
+        'name': 'Line',
+        'fields': {
+            'code': {'type': 'string', 'validate': 'required'},
+            'qty': 'number',
+        }
+    }, {
+        'name': 'Document',
+        'fields': {
+            'ids': {'type': 'array', 'items': 'uuid'},
+            'dates': {'type': 'array', 'items': 'date'},
+            'lines': {'type': 'array', 'items': 'Line'},
+        }
+    }])
+    item_ns = build_schemadoc_namespace({'name': 'Item', 'fields': {'id': 'uuid'}})
+
+    size = 1000
+    ids = [uuid.UUID(int=i).hex for i in range(size)]
+    dates = ['2020-01-05'] * size
+    lines = [{'code': 'a', 'qty': i} for i in range(size)]
+    doc = ns.Document(ids=ids, lines=lines)
+
+    # для сравнения: проверка элементов по одному через поле документа
+    item = item_ns.Item()
+    yield Case('array.{0}.uuid.per_item'.format(size), lambda: [setattr(item, 'id', v) for v in ids], size)
+    yield Case('array.{0}.uuid.cast'.format(size), lambda: ns.Document(ids=ids), size)
+    yield Case('array.{0}.date.cast'.format(size), lambda: ns.Document(dates=dates), size)
+    yield Case('array.{0}.sub_doc.cast'.format(size), lambda: ns.Document(lines=lines), size)
+    yield Case('array.{0}.uuid.read'.format(size), lambda: ns.Document(ids=ids).ids.to_list(), size)
+    yield Case('array.{0}.sub_doc.validate'.format(size), uncached(doc, 'validate'), size)
+
+
+def diff_cases():
+    size = 200
+    fields = {'f{0}'.format(i): 'string' for i in range(size)}
+    ns = build_schemadoc_namespace({'name': 'Wide', 'fields': fields})
+    record = {name: 'abc' for name in fields}
+
+    old = ns.Wide(**record)
+    new = ns.Wide(**record)
+    new.f0 = 'abcd'
+    patch = diff(old, new)
+
+    # для сравнения: сравнение всех полей документов через дескрипторы
+    yield Case('diff.wide.{0}.by_fields'.format(size), lambda: {
+        name: getattr(new, name) for name in fields if getattr(old, name) != getattr(new, name)
+    })
+    yield Case('diff.wide.{0}.one_change'.format(size), lambda: diff(old, new))
+    yield Case('diff.wide.{0}.apply'.format(size), lambda: apply_patch(ns.Wide(**record), patch))
+
+    doc_ns = document_namespace()
+    old_docs = doc_ns.Document.from_records([document_record(i) for i in range(1000)]).docs
+    new_docs = doc_ns.Document.from_records([document_record(i % 10) for i in range(1000)]).docs
+    yield Case('diff.batch.1000', lambda: diff_many(old_docs, new_docs), 1000)
+
+
+def binary_cases():
+    ns = document_namespace()
+    docs = ns.Document.from_records([document_record(i) for i in range(1000)]).docs
+    data = ns.Document.encode_many(docs)
+    text = ns.Document.dumps_many(docs)
+
+    print('binary: {0} bytes, json: {1} bytes per 1000 documents'.format(
+        len(data), len(text.encode('utf-8'))
+    ), file=sys.stderr)
+
+    yield Case('binary.1000.encode_many', lambda: ns.Document.encode_many(docs), 1000)
+    yield Case('binary.1000.decode_many', lambda: ns.Document.decode_many(data), 1000)
+    yield Case('binary.1000.json_dumps_many', lambda: ns.Document.dumps_many(docs), 1000)
+    yield Case('binary.1000.json_loads', lambda: ns.Document.from_records(json.loads(text)), 1000)
+
+
+def collection_cases():
+    ns = document_namespace()
+    size = 10000
+    docs = ns.Document.from_records([
+        dict(document_record(i), uid=uuid.UUID(int=i).hex, date='2020-{0:02d}-01'.format(i % 12 + 1))
+        for i in range(size)
+    ]).docs
+    collection = SchemaDocCollection(ns.Document, docs, hash_index=('uid', ), sorted_index=('date', ))
+    uid = uuid.UUID(int=size // 2)
+
+    # для сравнения: поиск перебором документов
+    yield Case('collection.{0}.scan_uid'.format(size), lambda: [doc for doc in docs if doc.uid == uid])
+    yield Case('collection.{0}.find_uid'.format(size), lambda: collection.find('uid', uid))
+    yield Case('collection.{0}.range_date'.format(size), lambda: collection.range('date', '2020-03-01', '2020-03-31'))
+    yield Case('collection.{0}.update'.format(size), lambda: setattr(docs[0], 'date', '2020-05-01'))
+
+
+def error_cases():
+    ns = document_namespace()
+    size = 1000
+    # некорректные значения (в том числе большие) в нескольких полях каждой записи
+    garbage = [dict(
+        document_record(i), name=list(range(100)), amount='x' * 1000, line={'code': 'a', 'qty': {'n': i}}
+    ) for i in range(size)]
+    invalid_docs = ns.Document.from_records([
+        dict(document_record(i), name=None, uid=None, line={'code': '', 'qty': None}) for i in range(size)
+    ]).docs
+
+    yield Case('errors.{0}.from_records'.format(size), lambda: ns.Document.from_records(garbage), size)
+    yield Case('errors.{0}.try_cast_dict'.format(size), lambda: [
+        ns.Document.try_cast_dict(record) for record in garbage
+    ], size)
+    invalid_calls = [uncached(doc, 'failed_validations') for doc in invalid_docs]
+    yield Case('errors.{0}.failed_validations'.format(size), lambda: [call() for call in invalid_calls], size)
+
+
+def batch_cases(max_batch: int):
+    ns = document_namespace()
+
+    for size in BATCH_SIZES:
+        if size > max_batch:
+            break
+
+        records = [document_record(i) for i in range(size)]
+        docs = ns.Document.from_records(records).docs
+        validate_calls = [uncached(doc, 'validate') for doc in docs]
+
+        yield Case('batch.{0}.kwargs'.format(size), lambda r=records: [ns.Document(**record) for record in r], size)
+        yield Case('batch.{0}.from_records'.format(size), lambda r=records: ns.Document.from_records(r), size)
+        yield Case('batch.{0}.validate'.format(size), lambda c=validate_calls: [call() for call in c], size)
+        yield Case('batch.{0}.json_dumps'.format(size), lambda d=docs: json.dumps([doc.to_dict() for doc in d]), size)
+        yield Case('batch.{0}.dumps_many'.format(size), lambda d=docs: ns.Document.dumps_many(d), size)
+
+
+def collect_cases(max_batch: int):
+    yield from construction_cases()
+    yield from cast_cases()
+    yield from validation_cases()
+    yield from incremental_validation_cases()
+    yield from nesting_cases()
+    yield from serialization_cases()
+    yield from array_cases()
+    yield from diff_cases()
+    yield from binary_cases()
+    yield from collection_cases()
+    yield from error_cases()
+    yield from batch_cases(max_batch)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Запуск и сравнение
+# ----------------------------------------------------------------------------------------------------------------------
+def run_case(case: Case, repeat: int, min_time: float) -> dict:
+    timer = timeit.Timer(case.func)
+
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    best = min([elapsed] + timer.repeat(repeat=repeat - 1, number=number))
+
+    return {
+        'ns_per_op': best / number * 1e9,
+        'ns_per_item': best / number / case.items * 1e9,
+        'items': case.items,
+        'number': number,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Сравнивает результаты с базовыми. Возвращает список замедлившихся бенчмарков
+    """
+    regressions = []
+
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print('{0:<55} {1:>14.1f} ns {2:>10}'.format(name, result['ns_per_op'], 'new'))
+            continue
+
+        ratio = result['ns_per_op'] / base['ns_per_op']
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = 'improved'
+
+        print('{0:<55} {1:>14.1f} ns {2:>9.2f}x {3}'.format(name, result['ns_per_op'], ratio, mark))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='schema_docs benchmark suite')
+    parser.add_argument('--output', help='файл для записи результатов в JSON (по умолчанию - stdout)')
+    parser.add_argument('--baseline', help='файл с базовыми результатами для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.1, help='допустимое замедление (доля), по умолчанию 0.1')
+    parser.add_argument('--filter', default='', help='запускать только бенчмарки с указанным префиксом имени')
+    parser.add_argument('--max-batch', type=int, default=100000,
+                        help='максимальный размер пачки (по умолчанию 100000, полный набор - 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='количество повторов (берется лучшее время)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='минимальное время одного замера, с')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for case in collect_cases(args.max_batch):
+        if case.name.startswith(args.filter):
+            results[case.name] = run_case(case, repeat=args.repeat, min_time=args.min_time)
+            print('{0:<55} {1:>14.1f} ns'.format(case.name, results[case.name]['ns_per_op']), file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': datetime.datetime.now().isoformat(),
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+        if regressions:
+            print('{0} regression(s) above {1:.0%}'.format(len(regressions), args.threshold), file=sys.stderr)
+            return 1
+
+    return 0
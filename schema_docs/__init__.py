@@ -1 +1 @@
-from schema_docs.api import build_schemadoc_namespace
+from schema_docs.api import build_schemadoc_namespace, read_schemadoc_jsonl
@@ -1,7 +1,52 @@
+from typing import Optional
+
 from schema_docs.builder import SchemaDocBuilder
+from schema_docs.cache import SchemaDocNamespaceCache
 from schema_docs.i import ISchemaDocNamespace
+from schema_docs.stream import SchemaDocJsonLinesReader
+
+
+# Кэш областей имен в памяти и кэши с сохранением скомпилированных схем на диск (по каталогам)
+_namespace_cache = SchemaDocNamespaceCache()
+_namespace_disk_caches = {}
+
+
+def build_schemadoc_namespace(schema, memoize: bool = True, cache_dir: Optional[str] = None,
+                              compact: bool = False, intern_size: Optional[int] = None) -> ISchemaDocNamespace:
+    """
+    Строит область имен схемных документов
+
+    :param schema: схема типа или список схем типов
+    :param memoize: если True, то для одинаковых по содержимому схем возвращается одна и та же область имен.
+        Ее классы документов общие: SchemaDocInstrumentation.enable() и производные классы setup(...) компактных
+        документов действуют для всех, кто построил ту же схему. Для отдельной области имен - memoize=False
+    :param cache_dir: каталог, в котором сохраняются скомпилированные схемы для быстрого старта процессов
+    :param compact: документы с компактным хранением значений (слоты и список значений вместо словарей, см.
+        CompactSchemaDoc) - для хранения большого количества документов в памяти
+    :param intern_size: размер пула повторяющихся строк и uuid (см. SchemaDocInternPool) - для массовой загрузки
+        данных с часто повторяющимися значениями. None - без пула
+    :return:
+    """
+    if cache_dir is not None:
+        if cache_dir not in _namespace_disk_caches:
+            _namespace_disk_caches[cache_dir] = SchemaDocNamespaceCache(directory=cache_dir)
+        return _namespace_disk_caches[cache_dir].get(schema, compact=compact, intern_size=intern_size)
+
+    if memoize:
+        return _namespace_cache.get(schema, compact=compact, intern_size=intern_size)
+
+    return SchemaDocBuilder().build_namespace(schema, compact=compact, intern_size=intern_size)
+
 
+def read_schemadoc_jsonl(ns: ISchemaDocNamespace, type_name: str, source,
+                         mode: str = SchemaDocJsonLinesReader.MODE_REPORT) -> SchemaDocJsonLinesReader:
+    """
+    Возвращает итератор документов типа type_name, построчно читаемых из файла JSON Lines
 
-def build_schemadoc_namespace(schema) -> ISchemaDocNamespace:
-    """ """
-    return SchemaDocBuilder().build_namespace(schema)
+    :param ns: область имен схемных документов
+    :param type_name: наименование типа документа
+    :param source: путь к файлу или открытый файловый объект
+    :param mode: режим обработки невалидных строк (report, skip-invalid, fail-fast)
+    :return: итератор кортежей (номер строки, документ, список несработавших валидаций) со счетчиками обработки
+    """
+    return SchemaDocJsonLinesReader(ns.types[type_name], source, mode=mode)
@@ -0,0 +1,72 @@
+from typing import Sequence
+
+from schema_docs.i import ISchemaDoc
+
+
+_MISSING = object()
+
+
+class SchemaDocList(Sequence):
+    """
+    Представление типизированного списка документа ({'type': 'array', 'items': ...}) только для чтения.
+
+    Элементы хранятся в документе во внутреннем представлении (строки для дат и uuid, словари для вложенных
+    документов) и преобразуются во внешнее представление при первом обращении к элементу. Вложенные документы
+    создаются над словарями списка, поэтому изменения в них видны в документе-владельце. Для замены элементов
+    полю присваивается новый список.
+    """
+    __slots__ = ('_items', '_to_ext', '_field_name', '_items_def', '_doc', '_decoded')
+
+    def __init__(self, items: list, to_ext, field_name: str, items_def, doc: ISchemaDoc):
+        """
+        :param items: список значений во внутреннем представлении
+        :param to_ext: метод кастера для преобразования элемента во внешнее представление
+        :param field_name: наименование поля со списком
+        :param items_def: описание элемента списка из схемы
+        :param doc: документ-владелец
+        """
+        self._items = items
+        self._to_ext = to_ext
+        self._field_name = field_name
+        self._items_def = items_def
+        self._doc = doc
+        self._decoded = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+
+        if self._decoded is None:
+            self._decoded = [_MISSING] * len(self._items)
+
+        value = self._decoded[index]
+        if value is _MISSING:
+            item = self._items[index]
+            value = self._decoded[index] = None if item is None else self._to_ext(
+                item, self._field_name, self._items_def, self._doc
+            )
+
+        return value
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (SchemaDocList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return 'SchemaDocList({0!r})'.format(self._items)
+
+    def to_list(self) -> list:
+        """ Возвращает список значений во внешнем представлении """
+        return list(self)
+
+    def raw(self) -> list:
+        """ Возвращает список значений во внутреннем представлении (тот же объект, что хранится в документе) """
+        return self._items
@@ -0,0 +1,490 @@
+from typing import Iterable, List, Union
+
+import datetime
+import struct
+
+from schema_docs.exceptions import SchemaDocBinaryException
+from schema_docs.utils import field_def_param
+
+
+_MISSING = object()
+
+_DOUBLE = struct.Struct('<d')
+_DATETIME_MIN = datetime.datetime.min
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Маркеры значений полей типа number (у целых чисел младший бит первого байта всегда 0)
+_NUMBER_FLOAT = 0x01
+_NUMBER_FALSE = 0x03
+_NUMBER_TRUE = 0x05
+
+# Маркеры значений полей без схемы (object, array без items)
+_ANY_NONE, _ANY_FALSE, _ANY_TRUE, _ANY_INT, _ANY_FLOAT, _ANY_STR, _ANY_LIST, _ANY_DICT = range(8)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Целые числа переменной длины (младшие 7 бит в каждом байте, старший бит - признак продолжения)
+# ----------------------------------------------------------------------------------------------------------------------
+def _write_uvarint(buf: bytearray, value: int):
+    while value > 0x7f:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_uvarint(buf, pos: int):
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+
+    result = byte & 0x7f
+    shift = 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos + 1
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Кодирование значений по типам полей. Функции записи дописывают значение в буфер, функции чтения возвращают
+# значение и позицию за ним
+# ----------------------------------------------------------------------------------------------------------------------
+def _write_string(buf: bytearray, value):
+    if type(value) is not str:
+        _raise_type_error(value, 'string')
+    data = value.encode('utf-8')
+    _write_uvarint(buf, len(data))
+    buf += data
+
+
+def _read_string(buf, pos: int):
+    size, pos = _read_uvarint(buf, pos)
+    end = pos + size
+    return str(buf[pos:end], 'utf-8'), end
+
+
+def _write_number(buf: bytearray, value):
+    value_type = type(value)
+    if value_type is int:
+        _write_uvarint(buf, _zigzag(value) << 1)
+    elif value_type is float:
+        buf.append(_NUMBER_FLOAT)
+        buf += _DOUBLE.pack(value)
+    elif value_type is bool:
+        buf.append(_NUMBER_TRUE if value else _NUMBER_FALSE)
+    else:
+        _raise_type_error(value, 'number')
+
+
+def _read_number(buf, pos: int):
+    marker = buf[pos]
+    if not marker & 1:
+        value, pos = _read_uvarint(buf, pos)
+        return _unzigzag(value >> 1), pos
+    elif marker == _NUMBER_FLOAT:
+        return _DOUBLE.unpack_from(buf, pos + 1)[0], pos + 9
+
+    return marker == _NUMBER_TRUE, pos + 1
+
+
+def _write_boolean(buf: bytearray, value):
+    if type(value) is not bool:
+        _raise_type_error(value, 'boolean')
+    buf.append(1 if value else 0)
+
+
+def _read_boolean(buf, pos: int):
+    return buf[pos] == 1, pos + 1
+
+
+def _write_packed_string(buf: bytearray, value: str):
+    # строка, для которой нет упакованного представления: длина с признаком в младшем бите
+    data = value.encode('utf-8')
+    _write_uvarint(buf, (len(data) << 1) | 1)
+    buf += data
+
+
+def _write_date(buf: bytearray, value):
+    """
+    Даты хранятся в документе строками. Строка в формате date.isoformat() записывается номером дня (ordinal),
+    остальные строки (например, в базовом формате ISO-8601) записываются как есть, чтобы данные документа
+    после декодирования совпадали с исходными
+    """
+    if type(value) is not str:
+        _raise_type_error(value, 'date')
+
+    if len(value) == 10:
+        try:
+            date = datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+        else:
+            if date.isoformat() == value:
+                _write_uvarint(buf, date.toordinal() << 1)
+                return
+
+    _write_packed_string(buf, value)
+
+
+def _read_date(buf, pos: int):
+    value, pos = _read_uvarint(buf, pos)
+    if value & 1:
+        end = pos + (value >> 1)
+        return str(buf[pos:end], 'utf-8'), end
+
+    return datetime.date.fromordinal(value >> 1).isoformat(), pos
+
+
+def _write_datetime(buf: bytearray, value):
+    """
+    Дата/время в формате datetime.isoformat() без часового пояса записывается количеством микросекунд от
+    datetime.min, остальные строки - как есть (см. _write_date)
+    """
+    if type(value) is not str:
+        _raise_type_error(value, 'datetime')
+
+    try:
+        dt = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        dt = None
+
+    if dt is not None and dt.tzinfo is None and dt.isoformat() == value:
+        _write_uvarint(buf, ((dt - _DATETIME_MIN) // _MICROSECOND) << 1)
+    else:
+        _write_packed_string(buf, value)
+
+
+def _read_datetime(buf, pos: int):
+    value, pos = _read_uvarint(buf, pos)
+    if value & 1:
+        end = pos + (value >> 1)
+        return str(buf[pos:end], 'utf-8'), end
+
+    return (_DATETIME_MIN + datetime.timedelta(microseconds=value >> 1)).isoformat(), pos
+
+
+def _write_uuid(buf: bytearray, value):
+    """
+    uuid в виде 32 шестнадцатеричных цифр в нижнем регистре (как uuid_to_str) записывается 16 байтами после
+    нулевого байта, остальные строки - как есть
+    """
+    if type(value) is not str:
+        _raise_type_error(value, 'uuid')
+
+    if len(value) == 32:
+        try:
+            data = bytes.fromhex(value)
+        except ValueError:
+            data = None
+        if data is not None and data.hex() == value:
+            buf.append(0)
+            buf += data
+            return
+
+    _write_packed_string(buf, value)
+
+
+def _read_uuid(buf, pos: int):
+    if buf[pos] == 0:
+        end = pos + 17
+        return buf[pos + 1:end].hex(), end
+
+    value, pos = _read_uvarint(buf, pos)
+    end = pos + (value >> 1)
+    return str(buf[pos:end], 'utf-8'), end
+
+
+def _write_any(buf: bytearray, value):
+    """ Значения полей без схемы (object, array без items): JSON-совместимые значения с маркером типа """
+    value_type = type(value)
+    if value is None:
+        buf.append(_ANY_NONE)
+    elif value_type is bool:
+        buf.append(_ANY_TRUE if value else _ANY_FALSE)
+    elif value_type is int:
+        buf.append(_ANY_INT)
+        _write_uvarint(buf, _zigzag(value))
+    elif value_type is float:
+        buf.append(_ANY_FLOAT)
+        buf += _DOUBLE.pack(value)
+    elif value_type is str:
+        buf.append(_ANY_STR)
+        _write_string(buf, value)
+    elif value_type is list:
+        buf.append(_ANY_LIST)
+        _write_uvarint(buf, len(value))
+        for item in value:
+            _write_any(buf, item)
+    elif value_type is dict:
+        buf.append(_ANY_DICT)
+        _write_uvarint(buf, len(value))
+        for key, item in value.items():
+            _write_string(buf, key)
+            _write_any(buf, item)
+    else:
+        _raise_type_error(value, 'object')
+
+
+def _read_any(buf, pos: int):
+    marker = buf[pos]
+    pos += 1
+
+    if marker == _ANY_STR:
+        return _read_string(buf, pos)
+    elif marker == _ANY_INT:
+        value, pos = _read_uvarint(buf, pos)
+        return _unzigzag(value), pos
+    elif marker == _ANY_FLOAT:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    elif marker == _ANY_LIST:
+        size, pos = _read_uvarint(buf, pos)
+        result = []
+        for _ in range(size):
+            item, pos = _read_any(buf, pos)
+            result.append(item)
+        return result, pos
+    elif marker == _ANY_DICT:
+        size, pos = _read_uvarint(buf, pos)
+        result = {}
+        for _ in range(size):
+            key, pos = _read_string(buf, pos)
+            result[key], pos = _read_any(buf, pos)
+        return result, pos
+    elif marker > _ANY_TRUE:
+        raise SchemaDocBinaryException('Unknown value marker {0} at position {1}'.format(marker, pos - 1))
+
+    return (None, False, True)[marker], pos
+
+
+def _raise_type_error(value, field_type: str):
+    raise SchemaDocBinaryException('Value {0!r} can not be encoded as {1}'.format(value, field_type))
+
+
+FIELD_CODECS = {
+    'string': (_write_string, _read_string),
+    'str': (_write_string, _read_string),
+    'number': (_write_number, _read_number),
+    'num': (_write_number, _read_number),
+    'int': (_write_number, _read_number),
+    'boolean': (_write_boolean, _read_boolean),
+    'bool': (_write_boolean, _read_boolean),
+    'date': (_write_date, _read_date),
+    'datetime': (_write_datetime, _read_datetime),
+    'uuid': (_write_uuid, _read_uuid),
+}
+
+
+class SchemaDocBinaryCodec(object):
+    """
+    Компактный бинарный формат данных документов одного типа (для передачи между процессами и хранения).
+
+    Документ кодируется как битовая карта присутствующих полей (по позиции поля в схеме), битовая карта полей
+    со значением None (числом переменной длины) и значения остальных присутствующих полей в порядке схемы. Имена
+    полей не записываются, поэтому декодировать данные можно только по той же схеме. Числа и булевы значения
+    хранятся в двоичном виде, uuid - 16 байтами, даты и дата/время - целыми числами, вложенные документы
+    кодируются рекурсивно, типизированные списки - количеством элементов, битовой картой элементов None и
+    значениями остальных элементов.
+
+    Ключи данных, которых нет в схеме, не кодируются. Значения, тип которых не соответствует полю (например,
+    строка в поле number), вызывают SchemaDocBinaryException.
+    """
+
+    def __init__(self, doc_cls):
+        self._doc_cls = doc_cls
+        self._fields = None
+        self._bitmap_size = 0
+        self._header = None
+
+    def encode(self, doc) -> bytes:
+        """ Кодирует документ (или словарь данных документа) """
+        buf = bytearray()
+        self._write(buf, self._data(doc))
+        return bytes(buf)
+
+    def decode(self, buf: Union[bytes, bytearray, memoryview]):
+        """
+        Создает документ по данным, закодированным методом encode. Данные читаются из буфера без копирования
+        """
+        buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+        data, pos = self._read_checked(buf, 0)
+        self._check_end(buf, pos)
+        return self._doc_cls._new(data)
+
+    def encode_many(self, docs: Iterable) -> bytes:
+        """ Кодирует документы (или словари данных документов): количество документов и документы подряд """
+        docs = docs if isinstance(docs, (list, tuple)) else list(docs)
+        buf = bytearray()
+        _write_uvarint(buf, len(docs))
+        write = self._write
+        for doc in docs:
+            write(buf, self._data(doc))
+        return bytes(buf)
+
+    def decode_many(self, buf: Union[bytes, bytearray, memoryview]) -> List:
+        """ Создает документы по данным, закодированным методом encode_many """
+        buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+        new = self._doc_cls._new
+
+        try:
+            count, pos = _read_uvarint(buf, 0)
+        except IndexError as e:
+            raise SchemaDocBinaryException('Unexpected end of data') from e
+
+        docs = []
+        for _ in range(count):
+            data, pos = self._read_checked(buf, pos)
+            docs.append(new(data))
+
+        self._check_end(buf, pos)
+        return docs
+
+    def _write(self, buf: bytearray, data: dict):
+        if self._fields is None:
+            self._compile()
+
+        # место под битовую карту присутствующих полей и битовую карту полей со значением None (обычно пустую,
+        # то есть один нулевой байт) резервируется перед значениями и заполняется после них
+        start = len(buf)
+        nulls_pos = start + self._bitmap_size
+        buf += self._header
+
+        present = 0
+        nulls = 0
+        get = data.get
+        for bit, name, write, read in self._fields:
+            value = get(name, _MISSING)
+            if value is None:
+                nulls |= bit
+            elif value is _MISSING:
+                continue
+            else:
+                write(buf, value)
+            present |= bit
+
+        buf[start:nulls_pos] = present.to_bytes(self._bitmap_size, 'little')
+        if nulls:
+            nulls_buf = bytearray()
+            _write_uvarint(nulls_buf, nulls)
+            buf[nulls_pos:nulls_pos + 1] = nulls_buf
+
+    def _read(self, buf, pos: int):
+        if self._fields is None:
+            self._compile()
+
+        end = pos + self._bitmap_size
+        present = int.from_bytes(buf[pos:end], 'little')
+        nulls, pos = _read_uvarint(buf, end)
+
+        data = {}
+        if nulls:
+            for bit, name, write, read in self._fields:
+                if present & bit:
+                    if nulls & bit:
+                        data[name] = None
+                    else:
+                        data[name], pos = read(buf, pos)
+        else:
+            for bit, name, write, read in self._fields:
+                if present & bit:
+                    data[name], pos = read(buf, pos)
+
+        return data, pos
+
+    def _read_checked(self, buf, pos: int):
+        try:
+            return self._read(buf, pos)
+        except (IndexError, ValueError, struct.error) as e:
+            raise SchemaDocBinaryException('Malformed data for {0}: {1}'.format(
+                self._doc_cls.schema['name'], e
+            )) from e
+
+    def _check_end(self, buf, pos: int):
+        # срезы буфера за его границей не вызывают ошибок, поэтому обрезанные данные обнаруживаются здесь
+        if pos > len(buf):
+            raise SchemaDocBinaryException('Unexpected end of data')
+        elif pos < len(buf):
+            raise SchemaDocBinaryException('Unexpected {0} bytes after the end of data'.format(len(buf) - pos))
+
+    @staticmethod
+    def _data(doc) -> dict:
+        return doc if isinstance(doc, dict) else doc.to_dict()
+
+    def _compile(self):
+        fields = []
+        for index, field in enumerate(self._doc_cls._fields):
+            write, read = self._field_codec(field.field_def)
+            fields.append((1 << index, field.name, write, read))
+
+        self._bitmap_size = (len(fields) + 7) // 8
+        self._header = bytes(self._bitmap_size + 1)
+        self._fields = tuple(fields)
+
+    def _field_codec(self, field_def) -> tuple:
+        """ Возвращает функции записи и чтения значения (не None) поля с описанием field_def """
+        field_type = field_def_param(field_def, 'type')
+        types = self._doc_cls.ns.types
+
+        if field_type in FIELD_CODECS:
+            return FIELD_CODECS[field_type]
+
+        elif field_type in types:
+            # функции вложенного типа получаем при первом использовании: типы могут ссылаться друг на друга
+            codec = types[field_type]._binary
+
+            def write_sub_doc(buf, value):
+                if type(value) is not dict:
+                    _raise_type_error(value, field_type)
+                codec._write(buf, value)
+
+            return write_sub_doc, codec._read
+
+        items_def = field_def_param(field_def, 'items') if field_type in ('array', 'list') else None
+        if items_def is not None:
+            return self._list_codec(*self._field_codec(items_def))
+
+        return _write_any, _read_any
+
+    @staticmethod
+    def _list_codec(write_item, read_item) -> tuple:
+        def write_list(buf, value):
+            if type(value) is not list:
+                _raise_type_error(value, 'array')
+
+            _write_uvarint(buf, len(value))
+            nulls = 0
+            for index, item in enumerate(value):
+                if item is None:
+                    nulls |= 1 << index
+            _write_uvarint(buf, nulls)
+
+            for item in value:
+                if item is not None:
+                    write_item(buf, item)
+
+        def read_list(buf, pos):
+            size, pos = _read_uvarint(buf, pos)
+            nulls, pos = _read_uvarint(buf, pos)
+
+            result = []
+            append = result.append
+            for index in range(size):
+                if nulls and nulls >> index & 1:
+                    append(None)
+                else:
+                    item, pos = read_item(buf, pos)
+                    append(item)
+
+            return result, pos
+
+        return write_list, read_list
@@ -1,22 +1,178 @@
+from typing import Optional
+
 from schema_docs.i import ISchemaDocBuilder, ISchemaDocNamespace
-from schema_docs.doc import SchemaDoc
+from schema_docs.binary import SchemaDocBinaryCodec
+from schema_docs.doc import SchemaDoc, SlottedSetupMixin
+from schema_docs.caster import SchemaDocCaster
+from schema_docs.compact import CompactSchemaDoc, SchemaDocCompactCaster, SchemaDocCompactField, \
+    SchemaDocCompactCachedField
+from schema_docs.diff import SchemaDocDiff
+from schema_docs.field import SchemaDocField, SchemaDocCachedField
+from schema_docs.intern import SchemaDocInternPool
 from schema_docs.namespace import SchemaDocNamespace
+from schema_docs.serialization import SchemaDocJsonSerializer
+from schema_docs.validation import SchemaDocValidator
+
+
+# Версия формата скомпилированной схемы (см. SchemaDocBuilder.compile). Меняется при любом изменении формата,
+# чтобы сохраненные на диске скомпилированные схемы прежнего формата не использовались
+COMPILED_SCHEMA_VERSION = 2
+
+# Методы и атрибуты, через которые библиотека работает с документами, и служебные атрибуты классов документов.
+# Поля схемы становятся дескрипторами класса, поэтому поле с таким наименованием сломало бы документ. Остальные
+# публичные методы (to_json, from_records и т.д.) поле перекрывает только в своем типе документа
+RESERVED_FIELD_NAMES = frozenset((
+    'ns', 'schema', 'to_dict', 'from_dict', 'cast_dict', 'setup',
+    'validate', 'failed_validations', 'avalidate', 'afailed_validations', '_data', '_decoded',
+)) | frozenset(name for name in dir(SchemaDoc) + dir(SlottedSetupMixin) if name.startswith('_'))
+
+# Дополнительно для документов с компактным хранением (кроме слотов значений, см. CompactSchemaDoc.slot_name)
+COMPACT_RESERVED_FIELD_NAMES = frozenset(('from_ext_dict', )) | frozenset(
+    name for name in dir(CompactSchemaDoc) if name.startswith('_')
+)
 
 
 class SchemaDocBuilder(ISchemaDocBuilder):
     """
     Билдер для объектов
     """
-    def build_namespace(self, schema) -> ISchemaDocNamespace:
+    def build_namespace(self, schema, compact: bool = False, intern_size: Optional[int] = None) -> ISchemaDocNamespace:
         """
         Строит объекты по указанной схеме
+
+        :param compact: строить классы документов с компактным хранением значений (см. CompactSchemaDoc)
+        :param intern_size: размер пула повторяющихся значений области имен (см. SchemaDocInternPool)
+        """
+        return self.build_compiled(self.compile(schema), compact=compact, intern_size=intern_size)
+
+    def compile(self, schema) -> dict:
+        """
+        Компилирует схему: для каждого поля определяет методы кастера, для каждого типа - план валидации.
+
+        Результат не содержит ссылок на классы документов и кастер и может быть сохранен через pickle, если
+        функции валидации в схеме объявлены на уровне модуля
         """
         schema = [schema] if isinstance(schema, dict) else schema
 
-        ns = SchemaDocNamespace()
+        caster = SchemaDocCaster()
+        validator = SchemaDocValidator()
+
+        # Ссылки на вложенные документы разрешаются по всем типам схемы независимо от порядка их описания
+        type_names = {type_schema['name'] for type_schema in schema}
 
+        types = []
         for type_schema in schema:
-            type_name = type_schema['name']
-            ns.types[type_name] = type(type_name, (SchemaDoc, ), {'ns': ns, 'schema': type_schema})
+            fields = []
+            for field_name, field_def in type_schema['fields'].items():
+                if field_name in RESERVED_FIELD_NAMES:
+                    self._raise_reserved(field_name, type_schema['name'])
+                fields.append((
+                    field_name,
+                    caster.resolve_from_ext(field_def, type_names).__name__,
+                    caster.resolve_to_ext(field_def, type_names).__name__,
+                ))
+
+            types.append({
+                'schema': type_schema,
+                'fields': fields,
+                'validation_plan': validator.compile(type_schema, type_names),
+            })
+
+        return {'version': COMPILED_SCHEMA_VERSION, 'types': types}
+
+    def build_compiled(self, compiled: dict, compact: bool = False,
+                       intern_size: Optional[int] = None) -> ISchemaDocNamespace:
+        """
+        Строит область имен по скомпилированной схеме (см. compile)
+
+        :param compact: строить классы документов с компактным хранением значений (см. CompactSchemaDoc)
+        :param intern_size: размер пула повторяющихся значений области имен (None - без пула)
+        """
+        ns = SchemaDocNamespace()
+        if intern_size:
+            ns.intern_pool = SchemaDocInternPool(intern_size)
+
+        # Кастер и валидатор не имеют состояния документов, поэтому на все типы области имен создается по одному
+        # экземпляру (пул значений кастера общий для всех типов)
+        caster_cls = SchemaDocCompactCaster if compact else SchemaDocCaster
+        caster = caster_cls(intern_pool=ns.intern_pool)
+        validator = SchemaDocValidator()
+        base_cls = CompactSchemaDoc if compact else SchemaDoc
+
+        for compiled_type in compiled['types']:
+            type_schema = compiled_type['schema']
+
+            attrs = self._type_attrs(type_schema, ns, caster, validator)
+            if compact:
+                # по слоту на каждое поле, без __slots__ у каждого документа появился бы __dict__
+                attrs['__slots__'] = tuple(
+                    CompactSchemaDoc.slot_name(index) for index in range(len(compiled_type['fields']))
+                )
+                for field_name, _, _ in compiled_type['fields']:
+                    if field_name in COMPACT_RESERVED_FIELD_NAMES or field_name in attrs['__slots__']:
+                        self._raise_reserved(field_name, type_schema['name'])
+
+            doc_cls = type(type_schema['name'], (base_cls, ), attrs)
+
+            self._compile_fields(doc_cls, caster, compiled_type['fields'], compact)
+            doc_cls._validation_plan = compiled_type['validation_plan']
+            doc_cls._json = SchemaDocJsonSerializer()
+            doc_cls._diff = SchemaDocDiff(doc_cls)
+            doc_cls._binary = SchemaDocBinaryCodec(doc_cls)
+
+            ns.types[type_schema['name']] = doc_cls
+
+        if compact:
+            for doc_cls in ns.types.values():
+                doc_cls._compile_layout()
 
         return ns
+
+    @staticmethod
+    def _raise_reserved(field_name: str, type_name: str):
+        raise ValueError('Field {0} of {1} conflicts with the attribute of the document class'.format(
+            field_name, type_name
+        ))
+
+    def _type_attrs(self, type_schema: dict, ns: ISchemaDocNamespace, caster: SchemaDocCaster,
+                    validator: SchemaDocValidator) -> dict:
+        """
+        Возвращает атрибуты класса документа с учетом опций, указанных в схеме типа
+        """
+        attrs = {'ns': ns, 'schema': type_schema, '_cast': caster, '_validator': validator}
+
+        options = type_schema.get('options') or {}
+        if 'soft_numbers' in options:
+            attrs['_soft_numbers'] = True
+        if 'lenient_dates' in options:
+            attrs['_lenient_dates'] = True
+
+        return attrs
+
+    def _compile_fields(self, doc_cls, caster: SchemaDocCaster, compiled_fields: list, compact: bool = False):
+        """
+        Создает в классе документа дескрипторы для всех полей схемы
+        """
+        fields = []
+        for index, (field_name, from_ext_name, to_ext_name) in enumerate(compiled_fields):
+            to_ext = getattr(caster, to_ext_name)
+            field_def = doc_cls.schema['fields'][field_name]
+            from_ext = getattr(caster, from_ext_name)
+
+            # Результат чтения кэшируется только для полей, внешнее представление которых нужно вычислять
+            # (вложенные документы компактных документов хранятся готовыми документами)
+            if compact:
+                cached = to_ext != caster._to_ext_raw and to_ext != caster._to_ext_sub_doc
+                field_cls = SchemaDocCompactCachedField if cached else SchemaDocCompactField
+                field = field_cls(
+                    name=field_name, field_def=field_def, from_ext=from_ext, to_ext=to_ext,
+                    slot=getattr(doc_cls, CompactSchemaDoc.slot_name(index))
+                )
+            else:
+                field_cls = SchemaDocField if to_ext == caster._to_ext_raw else SchemaDocCachedField
+                field = field_cls(name=field_name, field_def=field_def, from_ext=from_ext, to_ext=to_ext)
+
+            setattr(doc_cls, field_name, field)
+            fields.append(field)
+
+        doc_cls._fields = tuple(fields)
@@ -0,0 +1,152 @@
+from typing import Optional
+
+import os
+import sys
+import copy
+import json
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+from schema_docs.builder import SchemaDocBuilder, COMPILED_SCHEMA_VERSION
+from schema_docs.i import ISchemaDocNamespace
+
+
+def schema_hash(schema) -> str:
+    """
+    Возвращает хэш содержимого схемы, не зависящий от порядка ключей в словарях.
+
+    Функции валидации учитываются по ссылке для импорта (модуль и имя), если функция объявлена на уровне
+    модуля, иначе - по идентичности объекта (в пределах процесса). Поэтому схемы с lambda-функциями
+    и вложенными функциями совпадают только при использовании тех же самых объектов функций
+    """
+    content = json.dumps(schema, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def callable_reference(obj) -> Optional[str]:
+    """
+    Возвращает ссылку для импорта функции вида module:qualname или None, если функцию нельзя импортировать
+    по имени (lambda, вложенные функции)
+    """
+    module_name = getattr(obj, '__module__', None)
+    qualname = getattr(obj, '__qualname__', None)
+    if not module_name or not qualname or '<' in qualname:
+        return None
+
+    target = sys.modules.get(module_name)
+    for name in qualname.split('.'):
+        target = getattr(target, name, None)
+
+    return '{0}:{1}'.format(module_name, qualname) if target is obj else None
+
+
+def _json_default(obj):
+    if callable(obj):
+        reference = callable_reference(obj)
+        return 'callable:{0}'.format(reference) if reference else 'callable@{0}'.format(id(obj))
+
+    return repr(obj)
+
+
+class SchemaDocNamespaceCache(object):
+    """
+    Кэш построенных областей имен.
+
+    Области имен запоминаются в памяти по хэшу содержимого схемы (см. schema_hash), поэтому для одинаковых
+    схем возвращается одна и та же область имен. Если указан каталог, скомпилированные схемы
+    (см. SchemaDocBuilder.compile) дополнительно сохраняются на диск и при следующем запуске процесса
+    загружаются оттуда без повторной компиляции.
+
+    Политика для функций валидации: на диск сохраняются только схемы, все функции которых можно
+    импортировать по имени (объявлены на уровне модуля). Схемы с lambda-функциями и вложенными функциями
+    кэшируются только в памяти.
+
+    Область имен строится по копии схемы, поэтому изменение переданной схемы после построения не меняет
+    запомненную область имен (измененная схема получает другой хэш и строится заново). Классы документов
+    запомненной области имен общие для всех, кто построил ту же схему.
+    """
+
+    def __init__(self, directory: Optional[str] = None, maxsize: int = 256):
+        """
+        :param directory: каталог для хранения скомпилированных схем (None - только кэш в памяти)
+        :param maxsize: максимальное количество областей имен в памяти
+        """
+        self._directory = directory
+        self._maxsize = maxsize
+        self._namespaces = OrderedDict()
+        self._builder = SchemaDocBuilder()
+
+    def get(self, schema, compact: bool = False, intern_size: Optional[int] = None) -> ISchemaDocNamespace:
+        """
+        Возвращает область имен для схемы, при необходимости строит ее
+
+        :param compact: область имен с компактным хранением документов (см. CompactSchemaDoc)
+        :param intern_size: размер пула повторяющихся значений (см. SchemaDocInternPool)
+        """
+        key = schema_hash(schema)
+        # скомпилированная схема не зависит от способа хранения и пула значений, а области имен - разные
+        ns_key = key + '-compact' if compact else key
+        if intern_size:
+            ns_key = '{0}-intern{1}'.format(ns_key, intern_size)
+
+        ns = self._namespaces.get(ns_key)
+        if ns is not None:
+            self._namespaces.move_to_end(ns_key)
+            return ns
+
+        compiled = self._load(key) if self._directory else None
+        if compiled is None:
+            compiled = self._builder.compile(copy.deepcopy(schema))
+            if self._directory:
+                self._store(key, compiled)
+
+        ns = self._builder.build_compiled(compiled, compact=compact, intern_size=intern_size)
+
+        self._namespaces[ns_key] = ns
+        if len(self._namespaces) > self._maxsize:
+            self._namespaces.popitem(last=False)
+
+        return ns
+
+    def clear(self):
+        """ Очищает кэш в памяти (сохраненные на диск схемы не удаляются) """
+        self._namespaces.clear()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, 'schema-{0}-{1}.pickle'.format(COMPILED_SCHEMA_VERSION, key))
+
+    def _load(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                compiled = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # поврежденный файл или схема, функции валидации которой больше нельзя импортировать
+            return None
+
+        return compiled if compiled.get('version') == COMPILED_SCHEMA_VERSION else None
+
+    def _store(self, key: str, compiled: dict):
+        try:
+            content = pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # в схеме есть функции валидации, которые нельзя импортировать по имени
+            return
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        # запись во временный файл и переименование, чтобы параллельно стартующие процессы не прочитали
+        # недописанный файл
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,20 +1,91 @@
-from typing import Optional, List, Union
+from typing import Optional, Union
 
+import re
 import decimal
 import uuid
 import datetime
 
 
 from schema_docs.i import ISchemaDocCaster, ISchemaDoc
+from schema_docs.array import SchemaDocList
+from schema_docs.errors import ERROR_TYPE
 from schema_docs.exceptions import SchemaDocFieldException
-from schema_docs.utils import field_def_param, safe_iso_to_date, date_to_iso, safe_iso_to_datetime, datetime_to_iso, \
-    iso_to_date, iso_to_datetime,  safe_str_to_uuid, uuid_to_str, to_uuid
+from schema_docs.intern import SchemaDocInternPool
+from schema_docs.utils import safe_iso_to_date, date_to_iso, safe_iso_to_datetime, datetime_to_iso, \
+    iso_to_date, iso_to_datetime,  safe_str_to_uuid, uuid_to_str, to_uuid, field_def_param
+
+
+_UUID_RE = re.compile(r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}')
+
+
+def _all_of_types(*types):
+    types = frozenset(types)
+    return lambda items: all(type(item) in types for item in items)
+
+
+def _all_uuid_strings(items: list) -> bool:
+    match = _UUID_RE.fullmatch
+    return all(type(item) is str and match(item) for item in items)
+
+
+def _all_iso_strings(parse):
+    def check(items: list) -> bool:
+        try:
+            for item in items:
+                if type(item) is not str:
+                    return False
+                parse(item)
+        except ValueError:
+            return False
+        return True
+
+    return check
+
+
+# Проверки списков целиком для типов элементов, значения которых во внешнем представлении уже совпадают
+# с внутренним (строки, числа, логические значения, uuid и даты в строках ISO-8601). Если проверка прошла,
+# список сохраняется как есть, иначе элементы преобразуются по одному
+ITEMS_BATCH_CHECKS = {
+    'string': _all_of_types(str),
+    'str': _all_of_types(str),
+    'number': _all_of_types(int, float, bool),
+    'num': _all_of_types(int, float, bool),
+    'int': _all_of_types(int, float, bool),
+    'boolean': _all_of_types(bool),
+    'bool': _all_of_types(bool),
+    'uuid': _all_uuid_strings,
+    'date': _all_iso_strings(datetime.date.fromisoformat),
+    'datetime': _all_iso_strings(datetime.datetime.fromisoformat),
+}
+
+
+# Типы элементов, списки которых при включенном пуле значений преобразуются поэлементно (чтобы элементы попали
+# в пул), а не проверяются целиком
+INTERNED_ITEM_TYPES = ('string', 'str', 'uuid')
 
 
 class SchemaDocCaster(ISchemaDocCaster):
 
-    def __init__(self):
+    def __init__(self, intern_pool: Optional[SchemaDocInternPool] = None):
+        """
+        :param intern_pool: пул повторяющихся значений (см. SchemaDocInternPool). Если указан, методы
+            преобразования строк и uuid заменяются на методы, использующие пул
+        """
         self._allow_number_as_string = False
+        self._intern = intern_pool
+        self._items_batch_checks = ITEMS_BATCH_CHECKS
+
+        if intern_pool is not None:
+            # билдер получает методы кастера по имени (см. SchemaDocBuilder.compile), поэтому замена методов
+            # экземпляра действует на все поля области имен
+            self._from_ext_string = self._from_ext_string_interned
+            self._from_ext_uuid = self._from_ext_uuid_interned
+            self._to_ext_uuid = self._to_ext_uuid_interned
+            self._items_batch_checks = {
+                field_type: check for field_type, check in ITEMS_BATCH_CHECKS.items()
+                if field_type not in INTERNED_ITEM_TYPES
+            }
+
         self.MAP_FROM_EXT = {
             'string': self._from_ext_string,
             'str': self._from_ext_string,
@@ -57,27 +128,47 @@ class SchemaDocCaster(ISchemaDocCaster):
             # Значение None преобразовывать не нужно. Просто отдаем как есть
             return None
 
+        return self.resolve_from_ext(field_def, doc.ns.types)(value, field_name, field_def, doc)
+
+    def to_ext(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        """ """
+        return self.resolve_to_ext(field_def, doc.ns.types)(value, field_name, field_def, doc)
+
+    def resolve_from_ext(self, field_def, types: dict):
+        """
+        Возвращает метод преобразования из внешнего представления для поля с описанием field_def
+        """
         field_type = self._field_type(field_def)
 
-        if field_type in self.MAP_FROM_EXT:
-            return self.MAP_FROM_EXT[field_type](value, field_name, field_def, doc)
+        if self._is_typed_list(field_def):
+            return self._from_ext_typed_list
 
-        elif field_type in doc.ns.types:
-            return self._from_ext_sub_doc(value, field_name, field_def, doc)
+        elif field_type in self.MAP_FROM_EXT:
+            return self.MAP_FROM_EXT[field_type]
 
-        else:
-            self._raise_not_implemented(value, field_name, field_def)
+        elif field_type in types:
+            return self._from_ext_sub_doc
 
-    def to_ext(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
-        """ """
+        return self._from_ext_not_implemented
+
+    def resolve_to_ext(self, field_def, types: dict):
+        """
+        Возвращает метод преобразования во внешнее представление для поля с описанием field_def
+        """
         field_type = self._field_type(field_def)
-        if field_type in self.MAP_TO_EXT:
-            return self.MAP_TO_EXT[field_type](value, field_name, field_def, doc)
 
-        elif field_type in doc.ns.types:
-            return self._to_ext_sub_doc(value, field_name, field_def, doc)
+        if self._is_typed_list(field_def):
+            # списки элементов, которые не нужно преобразовывать, отдаются как есть
+            items_to_ext = self.resolve_to_ext(field_def['items'], types)
+            return self._to_ext_raw if items_to_ext == self._to_ext_raw else self._to_ext_typed_list
 
-        self._raise_not_implemented(value, field_name, field_def)
+        elif field_type in self.MAP_TO_EXT:
+            return self.MAP_TO_EXT[field_type]
+
+        elif field_type in types:
+            return self._to_ext_sub_doc
+
+        return self._to_ext_not_implemented
 
     @property
     def allow_number_as_string(self) -> bool:
@@ -94,6 +185,12 @@ class SchemaDocCaster(ISchemaDocCaster):
         self._check_value_type(value, field_name, field_def, (str,))
         return value
 
+    def _from_ext_string_interned(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[str]:
+        if type(value) is str:
+            return self._intern.string(value)
+        # проверка типа - методом класса (метод экземпляра заменен на этот)
+        return type(self)._from_ext_string(self, value, field_name, field_def, doc)
+
     def _from_ext_number(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[Union[int, float]]:
         """
 
@@ -104,7 +201,7 @@ class SchemaDocCaster(ISchemaDocCaster):
         :return:
         """
         allowed_types = (int, float, decimal.Decimal,)
-        if self.allow_number_as_string:
+        if self.allow_number_as_string or doc._soft_numbers:
             allowed_types = allowed_types + (str, )
 
         self._check_value_type(value, field_name, field_def, allowed_types)
@@ -126,7 +223,7 @@ class SchemaDocCaster(ISchemaDocCaster):
         self._check_value_type(value, field_name, field_def, (datetime.date, datetime.datetime, str))
 
         if isinstance(value, str):
-            if safe_iso_to_date(value) is None:
+            if safe_iso_to_date(value, lenient=doc._lenient_dates) is None:
                 self._raise_type_error(value, field_name, field_def)
             return value
 
@@ -136,7 +233,7 @@ class SchemaDocCaster(ISchemaDocCaster):
         self._check_value_type(value, field_name, field_def, (datetime.datetime, str))
 
         if isinstance(value, str):
-            if safe_iso_to_datetime(value) is None:
+            if safe_iso_to_datetime(value, lenient=doc._lenient_dates) is None:
                 self._raise_type_error(value, field_name, field_def)
             return value
 
@@ -154,6 +251,18 @@ class SchemaDocCaster(ISchemaDocCaster):
             return None
         return uuid_to_str(value)
 
+    def _from_ext_uuid_interned(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[str]:
+        # строка проверяется один раз, повторные значения берутся из пула
+        if type(value) is str:
+            result = self._intern.uuid_string(value)
+            if result is None:
+                self._raise_type_error(value, field_name, field_def)
+            return result
+        elif isinstance(value, uuid.UUID):
+            return self._intern.uuid_to_string(value)
+
+        return type(self)._from_ext_uuid(self, value, field_name, field_def, doc)
+
     def _from_ext_list(self, value, field_name, field_def, doc: ISchemaDoc) -> Optional[list]:
         """
 
@@ -168,6 +277,29 @@ class SchemaDocCaster(ISchemaDocCaster):
         # тут надо ещё проверить, что внутри списка находятся объекты нужного типа
         return value
 
+    def _from_ext_typed_list(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[list]:
+        """
+        Преобразует список с элементами типа, указанного в items описания поля. Функция преобразования элементов
+        определяется один раз на весь список, для простых типов список проверяется целиком без преобразования
+        """
+        self._check_value_type(value, field_name, field_def, (list, ))
+
+        items_def = field_def['items']
+        batch_check = self._items_batch_checks.get(self._field_type(items_def))
+        if batch_check is not None and batch_check(value):
+            return value
+
+        cast = self.resolve_from_ext(items_def, doc.ns.types)
+
+        result = []
+        for index, item in enumerate(value):
+            try:
+                result.append(None if item is None else cast(item, field_name, items_def, doc))
+            except SchemaDocFieldException as e:
+                self._raise_item_error(e, field_name, index)
+
+        return result
+
     def _from_ext_object(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[dict]:
         self._check_value_type(value, field_name, field_def, (dict, ISchemaDoc))
 
@@ -176,8 +308,14 @@ class SchemaDocCaster(ISchemaDocCaster):
     def _from_ext_sub_doc(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[dict]:
         self._check_value_type(value, field_name, field_def, (dict, ISchemaDoc))
 
-        return value.to_dict() if isinstance(value, ISchemaDoc) else \
-            getattr(doc.ns, field_def_param(field_def, 'type'))(**value).to_dict()
+        if isinstance(value, ISchemaDoc):
+            return value.to_dict()
+
+        # Данные вложенного документа преобразуются без создания промежуточного документа
+        try:
+            return doc.ns.types[self._field_type(field_def)].cast_dict(value)
+        except SchemaDocFieldException as e:
+            self._raise_nested_error(e, field_name)
 
     def _from_ext_boolean(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[bool]:
         self._check_value_type(value, field_name, field_def, (bool, str))
@@ -187,6 +325,9 @@ class SchemaDocCaster(ISchemaDocCaster):
 
         return value in ['true', 'True', '1', 'on', True]
 
+    def _from_ext_not_implemented(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        self._raise_not_implemented(value, field_name, field_def)
+
     # ------------------------------------------------------------------------------------------------------------------
     # Методы преобразования к внешнему типу
     # ------------------------------------------------------------------------------------------------------------------
@@ -196,18 +337,31 @@ class SchemaDocCaster(ISchemaDocCaster):
     def _to_ext_sub_doc(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
         if value is None:
             return None
-        doc_cls = doc.ns.types[self._field_type(field_def)]
-        return doc_cls(value)
+        # Документ-обертка создается над словарем данных родительского документа (без копирования), поэтому
+        # изменения во вложенном документе видны в родительском
+        return doc.ns.types[self._field_type(field_def)]._new(value)
+
+    def _to_ext_typed_list(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[SchemaDocList]:
+        if value is None:
+            return None
+        items_def = field_def['items']
+        return SchemaDocList(value, self.resolve_to_ext(items_def, doc.ns.types), field_name, items_def, doc)
 
     def _to_ext_date(self, value, field_name: str, field_def: dict, doc: ISchemaDoc) -> Optional[datetime.date]:
-        return iso_to_date(value) if isinstance(value, str) else None
+        return iso_to_date(value, lenient=doc._lenient_dates) if isinstance(value, str) else None
 
     def _to_ext_datetime(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
-        return iso_to_datetime(value) if isinstance(value, str) else None
+        return iso_to_datetime(value, lenient=doc._lenient_dates) if isinstance(value, str) else None
 
     def _to_ext_uuid(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
         return to_uuid(value)
 
+    def _to_ext_uuid_interned(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        return self._intern.uuid(value) if type(value) is str else to_uuid(value)
+
+    def _to_ext_not_implemented(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        self._raise_not_implemented(value, field_name, field_def)
+
     # ------------------------------------------------------------------------------------------------------------------
     # Вспомогательные методы
     # ------------------------------------------------------------------------------------------------------------------
@@ -216,15 +370,22 @@ class SchemaDocCaster(ISchemaDocCaster):
             self._raise_type_error(value, field_name, field_def)
 
     def _raise_type_error(self, value, field_name: str, field_def: dict):
+        # описание ошибки формируется только по требованию (см. SchemaDocFieldException.msg)
         raise SchemaDocFieldException(
-            msg='Value {0} is not compatible with field {1} of type {2}'.format(
-                value, field_name, self._field_type(field_def)
-            ),
-            field_name=field_name,
-            field_type=self._field_type(field_def),
-            failed_value=value
+            field_type=self._field_type(field_def), failed_value=value, code=ERROR_TYPE, path=(field_name, )
         )
 
+    def _raise_item_error(self, error: SchemaDocFieldException, field_name: str, index: int):
+        # элемент преобразуется с наименованием поля списка, к нему добавляется номер элемента (и путь внутри
+        # вложенного документа, если элемент - документ)
+        error.path = (field_name, index) + error.path[1:]
+        raise error
+
+    def _raise_nested_error(self, error: SchemaDocFieldException, field_name: str):
+        # путь к полю вложенного документа дополняется наименованием поля родительского документа
+        error.path = (field_name, ) + error.path
+        raise error
+
     def _raise_not_implemented(self, value, field_name: str, field_def: dict):
         raise NotImplementedError('Field {0} with type {1} if not implemented for value {2}'.format(
             field_name, self._field_type(field_def), value
@@ -232,3 +393,6 @@ class SchemaDocCaster(ISchemaDocCaster):
 
     def _field_type(self, field_def):
         return field_def if isinstance(field_def, str) else field_def['type']
+
+    def _is_typed_list(self, field_def) -> bool:
+        return self._field_type(field_def) in ('array', 'list') and field_def_param(field_def, 'items') is not None
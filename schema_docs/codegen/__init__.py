@@ -0,0 +1,2 @@
+from schema_docs.codegen.generator import SchemaDocCodeGenerator, generate_module, write_module
+from schema_docs.codegen.runtime import GeneratedSchemaDoc, finish_types
@@ -0,0 +1,6 @@
+import sys
+
+from schema_docs.codegen.cli import main
+
+
+sys.exit(main())
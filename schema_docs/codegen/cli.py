@@ -0,0 +1,48 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from schema_docs.codegen.generator import generate_module
+
+
+def load_schema(source: str):
+    """
+    Загружает схему по ссылке: путь к JSON-файлу или module:attribute (атрибут модуля со схемой, например
+    myapp.schemas:SCHEMA)
+    """
+    if os.path.isfile(source):
+        with open(source, encoding='utf-8') as f:
+            return json.load(f)
+
+    module_name, _, attribute = source.partition(':')
+    if not attribute:
+        raise ValueError('Schema source {0} is neither a file nor a module:attribute reference'.format(source))
+
+    value = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        value = getattr(value, name)
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m schema_docs.codegen', description='генерация модуля с классами документов по схеме'
+    )
+    parser.add_argument('schema', help='JSON-файл со схемой или ссылка module:attribute на схему')
+    parser.add_argument('-o', '--output', help='файл для записи модуля (по умолчанию - stdout)')
+    args = parser.parse_args(argv)
+
+    try:
+        code = generate_module(load_schema(args.schema), source=args.schema)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(code)
+    else:
+        sys.stdout.write(code)
+
+    return 0
@@ -0,0 +1,484 @@
+from typing import List, Optional
+
+import keyword
+import re
+
+from schema_docs.builder import SchemaDocBuilder
+from schema_docs.cache import callable_reference
+from schema_docs.utils import field_def_param
+from schema_docs.validation import FieldNotEmptyValidation, FieldRequiredValidation, EMPTY_CHECKS
+
+
+# Методы кастера, для которых значение уже нужного типа не преобразуется: проверка типа выполняется
+# в сгенерированном коде, метод вызывается только для остальных значений
+FAST_CAST_CHECKS = {
+    '_from_ext_string': 'type(value) is not str',
+    '_from_ext_number': 'type(value) is not int and type(value) is not float',
+    '_from_ext_boolean': 'type(value) is not bool',
+}
+
+# Типы полей, "пустое" значение которых проверяется по значению во внутреннем представлении (not value)
+RAW_EMPTY_TYPES = ('str', 'string', 'number', 'num', 'int', 'array', 'list', 'object', 'obj')
+
+# Максимальная длина строки сгенерированного кода, в которую записывается значение из схемы целиком
+_INLINE_WIDTH = 110
+
+_INDENT = '    '
+
+
+class SchemaDocCodeGenerator(object):
+    """
+    Генератор python-модуля с классами документов по схеме.
+
+    Модуль содержит по классу на тип схемы с __slots__, свойствами полей с преобразованием значений без обращений
+    к схеме, явными __init__, to_dict, from_dict, cast_dict и validate (проверка правил required и not-empty
+    встроена в код, функции валидации вызываются через правила плана валидации). Остальное поведение (описания
+    несработавших валидаций, асинхронная валидация, сериализация, патчи, коллекции) то же, что у классов
+    динамической области имен: модуль использует те же кастер, план валидации и вспомогательные классы.
+
+    Функции валидации в схеме должны импортироваться по имени (объявлены на уровне модуля), как и для сохранения
+    скомпилированных схем на диск (см. SchemaDocNamespaceCache). Инструментирование (SchemaDocInstrumentation)
+    свойства сгенерированных классов не замеряет: они вызывают методы кастера напрямую
+    """
+
+    def generate(self, schema, source: Optional[str] = None) -> str:
+        """
+        Возвращает исходный код модуля
+
+        :param schema: схема типа или список схем типов
+        :param source: описание источника схемы для заголовка модуля (путь к файлу, ссылка на объект)
+        """
+        schema = [schema] if isinstance(schema, dict) else list(schema)
+        compiled = SchemaDocBuilder().compile(schema)
+
+        self._imports = {}
+        self._used = set()
+        self._empty_checks = set()
+        self._class_names = {
+            type_schema['name']: self._unique(self._identifier(type_schema['name'])) for type_schema in schema
+        }
+
+        schema_literal = self._literal(schema, 0)
+        body = []
+        caster_methods = set()
+        definitions = []
+
+        for type_index, compiled_type in enumerate(compiled['types']):
+            body.extend(self._class_code(type_index, compiled_type, caster_methods, definitions))
+
+        return '\n'.join(self._header(source) + [
+            'SCHEMA = {0}'.format(schema_literal),
+            '',
+            'ns = SchemaDocNamespace()',
+            '_cast = SchemaDocCaster()',
+            '_validator = SchemaDocValidator()',
+            '',
+            '_MISSING = object()',
+            '',
+        ] + [
+            '{0} = _cast.{0}'.format(method) for method in sorted(caster_methods)
+        ] + [
+            '_is_empty_{0} = EMPTY_CHECKS[{0!r}]'.format(field_type) for field_type in sorted(self._empty_checks)
+        ] + definitions + body + [
+            '',
+            '',
+            'finish_types(ns, {0})'.format(self._names_tuple(self._class_names.values())),
+            '',
+        ])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Заголовок и литерал схемы
+    # ------------------------------------------------------------------------------------------------------------------
+    def _header(self, source: Optional[str]) -> List[str]:
+        lines = [
+            '"""',
+            'Классы схемных документов, сгенерированные schema_docs.codegen. Модуль не редактируется вручную:',
+            'изменения вносятся в схему, после чего модуль генерируется заново.',
+        ]
+        if source:
+            lines.extend(['', 'Схема: {0}'.format(source)])
+        lines.extend([
+            '"""',
+            'from schema_docs.caster import SchemaDocCaster',
+            'from schema_docs.codegen.runtime import GeneratedSchemaDoc, finish_types',
+            'from schema_docs.field import SchemaDocCachedField, SchemaDocField',
+            'from schema_docs.namespace import SchemaDocNamespace',
+            'from schema_docs.validation import (',
+            '    EMPTY_CHECKS, CustomValidation, FieldItemsValidation, FieldNotEmptyValidation,',
+            '    FieldRequiredValidation, SchemaDocValidationPlan, SchemaDocValidator,',
+            ')',
+        ])
+
+        if self._imports:
+            lines.append('')
+            for reference, alias in self._imports.items():
+                module_name, qualname = reference.split(':')
+                root, _, rest = qualname.partition('.')
+                if rest:
+                    lines.append('from {0} import {1} as {2}_root'.format(module_name, root, alias))
+                    lines.append('{0} = {0}_root.{1}'.format(alias, rest))
+                else:
+                    lines.append('from {0} import {1} as {2}'.format(module_name, root, alias))
+
+        return lines + ['', '']
+
+    def _literal(self, value, indent: int) -> str:
+        inline = self._inline(value)
+        if len(inline) + len(_INDENT) * indent <= _INLINE_WIDTH or not isinstance(value, (dict, list, tuple)):
+            return inline
+
+        pad = _INDENT * (indent + 1)
+        if isinstance(value, dict):
+            items = ['{0}{1!r}: {2},'.format(pad, key, self._literal(item, indent + 1)) for key, item in value.items()]
+            brackets = '{}'
+        else:
+            items = ['{0}{1},'.format(pad, self._literal(item, indent + 1)) for item in value]
+            brackets = '[]' if isinstance(value, list) else '()'
+
+        return '\n'.join([brackets[0]] + items + [_INDENT * indent + brackets[1]])
+
+    def _inline(self, value) -> str:
+        if isinstance(value, dict):
+            return '{' + ', '.join('{0!r}: {1}'.format(key, self._inline(item)) for key, item in value.items()) + '}'
+        elif isinstance(value, list):
+            return '[' + ', '.join(self._inline(item) for item in value) + ']'
+        elif isinstance(value, tuple):
+            return '(' + ', '.join(self._inline(item) for item in value) + (',' if len(value) == 1 else '') + ')'
+        elif value is None or isinstance(value, (str, int, float, bool)):
+            return repr(value)
+        elif callable(value):
+            return self._callable_alias(value)
+
+        raise ValueError('Value {0!r} can not be written to the generated module'.format(value))
+
+    def _callable_alias(self, func) -> str:
+        reference = callable_reference(func)
+        if reference is None:
+            raise ValueError(
+                'Function {0!r} can not be imported by name; declare validation functions at module level'.format(func)
+            )
+
+        if reference not in self._imports:
+            self._imports[reference] = self._unique('_validate_{0}'.format(
+                self._identifier(reference.split(':')[1].split('.')[-1])
+            ))
+        return self._imports[reference]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Классы документов
+    # ------------------------------------------------------------------------------------------------------------------
+    def _class_code(self, type_index: int, compiled_type: dict, caster_methods: set,
+                    definitions: list) -> List[str]:
+        type_schema = compiled_type['schema']
+        class_name = self._class_names[type_schema['name']]
+
+        definitions.append('')
+        fields = []
+        for field_name, from_ext, to_ext in compiled_type['fields']:
+            constant = self._unique('_{0}_{1}'.format(class_name, self._identifier(field_name)))
+            definitions.append('{0} = SCHEMA[{1}][{2!r}][{3!r}]'.format(
+                constant, type_index, 'fields', field_name
+            ))
+            fields.append({
+                'name': field_name,
+                'def': type_schema['fields'][field_name],
+                'constant': constant,
+                'from_ext': from_ext,
+                'to_ext': to_ext,
+                'method': self._identifier(field_name),
+            })
+            caster_methods.update((from_ext, to_ext))
+
+        self._deduplicate_methods(fields)
+        fields_by_name = {field['name']: field for field in fields}
+
+        # правила валидации создаются по плану, построенному при генерации, без разбора схемы при импорте
+        plan = compiled_type['validation_plan']
+        rules = self._unique('_{0}_rules'.format(class_name))
+        definitions.append('{0} = ({1})'.format(rules, ''.join(
+            '\n    {0}({1!r}, {2}),'.format(type(rule).__name__, rule.field_name,
+                                          fields_by_name[rule.field_name]['constant'])
+            for rule in plan.rules
+        ) + ('\n' if plan.rules else '')))
+
+        lines = [
+            '',
+            '',
+            'class {0}(GeneratedSchemaDoc):'.format(class_name),
+            "    __slots__ = ('_data', '_decoded', '_validated', '_dirty', '_collections')",
+            '',
+            '    ns = ns',
+            '    schema = SCHEMA[{0}]'.format(type_index),
+            '    _cast = _cast',
+            '    _validator = _validator',
+        ]
+
+        options = type_schema.get('options') or {}
+        for option in ('soft_numbers', 'lenient_dates'):
+            if option in options:
+                lines.append('    _{0} = True'.format(option))
+
+        lines.append('')
+        lines.append('    _fields = (')
+        for field in fields:
+            lines.append('        {0}({1!r}, {2}, {3}, {4}),'.format(
+                'SchemaDocField' if field['to_ext'] == '_to_ext_raw' else 'SchemaDocCachedField',
+                field['name'], field['constant'], field['from_ext'], field['to_ext']
+            ))
+        lines.append('    )')
+        lines.append('    _validation_plan = SchemaDocValidationPlan({0}, nested_fields={1}, nested_lists={2})'.format(
+            rules, self._inline(plan.nested_fields), self._inline(plan.nested_lists)
+        ))
+
+        lines.extend(self._init_code(fields))
+        lines.extend(self._new_code())
+        lines.extend(self._cast_dict_code(fields))
+        lines.extend(self._dict_code())
+        lines.extend(self._validate_code(class_name, plan, rules, fields_by_name))
+
+        properties, named_properties = [], []
+        for field in fields:
+            lines.extend(self._getter_code(field))
+            lines.extend(self._setter_code(field))
+
+            if field['name'].isidentifier() and not keyword.iskeyword(field['name']):
+                properties.append('    {0} = property(_get_{1}, _set_{1})'.format(field['name'], field['method']))
+            else:
+                # наименование поля не может быть именем атрибута в теле класса
+                named_properties.append('setattr({0}, {1!r}, property({0}._get_{2}, {0}._set_{2}))'.format(
+                    class_name, field['name'], field['method']
+                ))
+
+        if properties:
+            lines.extend([''] + properties)
+        if named_properties:
+            lines.extend([''] + named_properties)
+
+        return lines
+
+    def _init_code(self, fields: list) -> List[str]:
+        lines = [
+            '',
+            '    def __init__(self, *args, **options):',
+            '        self._data = {}',
+            '        self._decoded = {}',
+            '        self._validated = None',
+            '        self._dirty = None',
+            '        self._collections = None',
+            '',
+            '        if args and isinstance(args[0], dict):',
+            '            self.from_dict(args[0])',
+        ]
+
+        if fields:
+            lines.extend(['', '        if options:'])
+            for field in fields:
+                lines.extend([
+                    '            if {0!r} in options:'.format(field['name']),
+                    '                self._set_{0}(options[{1!r}])'.format(field['method'], field['name']),
+                ])
+
+        return lines
+
+    def _new_code(self) -> List[str]:
+        return [
+            '',
+            '    @classmethod',
+            '    def _new(cls, data=None):',
+            '        doc = cls.__new__(cls)',
+            '        doc._data = {} if data is None else data',
+            '        doc._decoded = {}',
+            '        doc._validated = None',
+            '        doc._dirty = None',
+            '        doc._collections = None',
+            '        return doc',
+        ]
+
+    def _cast_dict_code(self, fields: list) -> List[str]:
+        lines = [
+            '',
+            '    @classmethod',
+            '    def cast_dict(cls, value):',
+            '        result = {}',
+        ]
+
+        for field in fields:
+            lines.extend([
+                '        if {0!r} in value:'.format(field['name']),
+                '            field_value = value[{0!r}]'.format(field['name']),
+            ])
+            lines.extend(self._cast_code(field, 'field_value', 'cls', '            '))
+            lines.append('            result[{0!r}] = field_value'.format(field['name']))
+
+        return lines + ['        return result']
+
+    def _dict_code(self) -> List[str]:
+        return [
+            '',
+            '    def to_dict(self):',
+            '        return self._data',
+            '',
+            '    def from_dict(self, value):',
+            '        self._data = value',
+            '        self._decoded.clear()',
+            '        if self._validated is not None:',
+            '            self._validated = None',
+            '            self._dirty = None',
+            '        if self._collections is not None:',
+            '            for collection in self._collections:',
+            '                collection._doc_changed(self)',
+            '        return self',
+        ]
+
+    def _validate_code(self, class_name: str, plan, rules: str, fields_by_name: dict) -> List[str]:
+        lines = [
+            '',
+            '    def validate(self, raise_exception=False):',
+            '        if raise_exception:',
+            '            return super({0}, self).validate(raise_exception=True)'.format(class_name),
+            '',
+            '        data = self._data',
+        ]
+
+        for index, rule in enumerate(plan.rules):
+            field = fields_by_name[rule.field_name]
+            field_type = field_def_param(field['def'], 'type')
+
+            if type(rule) is FieldNotEmptyValidation and field_type in RAW_EMPTY_TYPES:
+                lines.append('        if not data.get({0!r}):'.format(field['name']))
+            elif type(rule) is FieldNotEmptyValidation and field_type in EMPTY_CHECKS:
+                self._empty_checks.add(field_type)
+                lines.extend([
+                    '        value = self._get_{0}()'.format(field['method']),
+                    '        if value is None or _is_empty_{0}(value):'.format(field_type),
+                ])
+            elif type(rule) in (FieldRequiredValidation, FieldNotEmptyValidation):
+                lines.append('        if data.get({0!r}) is None:'.format(field['name']))
+            else:
+                # функции валидации и правила для элементов списков
+                lines.append('        if not {0}[{1}].is_valid(self):'.format(rules, index))
+            lines.append('            return False')
+
+        for field_name in plan.nested_fields:
+            lines.extend([
+                '        value = self._get_{0}()'.format(fields_by_name[field_name]['method']),
+                '        if value is not None and not value.validate():',
+                '            return False',
+            ])
+
+        for field_name in plan.nested_lists:
+            lines.extend([
+                '        items = self._get_{0}()'.format(fields_by_name[field_name]['method']),
+                '        if items is not None:',
+                '            for item in items:',
+                '                if item is not None and not item.validate():',
+                '                    return False',
+            ])
+
+        return lines + ['        return True']
+
+    def _getter_code(self, field: dict) -> List[str]:
+        name, method = field['name'], field['method']
+        lines = ['', '    def _get_{0}(self):'.format(method)]
+
+        if field['to_ext'] == '_to_ext_raw':
+            return lines + ['        return self._data.get({0!r})'.format(name)]
+
+        if field['to_ext'] == '_to_ext_sub_doc':
+            # вложенный документ создается над словарем данных родительского документа, как в _to_ext_sub_doc
+            sub_doc_cls = self._class_names[field_def_param(field['def'], 'type')]
+            decode = [
+                '            value = self._data.get({0!r})'.format(name),
+                '            value = None if value is None else {0}._new(value)'.format(sub_doc_cls),
+            ]
+        else:
+            decode = [
+                '            value = {0}(self._data.get({1!r}), {1!r}, {2}, self)'.format(
+                    field['to_ext'], name, field['constant']
+                ),
+            ]
+
+        return lines + [
+            '        value = self._decoded.get({0!r}, _MISSING)'.format(name),
+            '        if value is _MISSING:',
+        ] + decode + [
+            '            self._decoded[{0!r}] = value'.format(name),
+            '        return value',
+        ]
+
+    def _setter_code(self, field: dict) -> List[str]:
+        name = field['name']
+        lines = ['', '    def _set_{0}(self, value):'.format(field['method'])]
+        lines.extend(self._cast_code(field, 'value', 'self', '        '))
+        lines.append('        self._data[{0!r}] = value'.format(name))
+
+        if field['to_ext'] != '_to_ext_raw':
+            lines.append('        self._decoded.pop({0!r}, None)'.format(name))
+
+        return lines + [
+            '        if self._dirty is not None:',
+            '            self._dirty.add({0!r})'.format(name),
+            '        if self._collections is not None:',
+            '            for collection in self._collections:',
+            '                collection._field_changed(self, {0!r})'.format(name),
+        ]
+
+    def _cast_code(self, field: dict, variable: str, doc: str, indent: str) -> List[str]:
+        check = FAST_CAST_CHECKS.get(field['from_ext'])
+        condition = '{0} is not None'.format(variable)
+        if check is not None:
+            condition += ' and ' + check.replace('value', variable)
+
+        return [
+            '{0}if {1}:'.format(indent, condition),
+            '{0}    {1} = {2}({1}, {3!r}, {4}, {5})'.format(
+                indent, variable, field['from_ext'], field['name'], field['constant'], doc
+            ),
+        ]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Имена
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _names_tuple(names) -> str:
+        names = list(names)
+        return '(' + ', '.join(names) + (',' if len(names) == 1 else '') + ')'
+
+    @staticmethod
+    def _identifier(name: str) -> str:
+        identifier = re.sub(r'\W', '_', name)
+        if not identifier or identifier[0].isdigit() or keyword.iskeyword(identifier):
+            identifier = '_' + identifier
+        return identifier
+
+    def _unique(self, name: str) -> str:
+        result, index = name, 1
+        while result in self._used:
+            index += 1
+            result = '{0}_{1}'.format(name, index)
+        self._used.add(result)
+        return result
+
+    @staticmethod
+    def _deduplicate_methods(fields: list):
+        used = set()
+        for index, field in enumerate(fields):
+            if field['method'] in used:
+                field['method'] = '{0}_{1}'.format(field['method'], index)
+            used.add(field['method'])
+
+
+def generate_module(schema, source: Optional[str] = None) -> str:
+    """
+    Возвращает исходный код python-модуля с классами документов по схеме (см. SchemaDocCodeGenerator)
+    """
+    return SchemaDocCodeGenerator().generate(schema, source=source)
+
+
+def write_module(schema, path: str, source: Optional[str] = None):
+    """
+    Генерирует модуль с классами документов по схеме и записывает его в файл path
+    """
+    code = generate_module(schema, source=source)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(code)
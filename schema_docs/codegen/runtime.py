@@ -0,0 +1,32 @@
+from typing import Iterable
+
+from schema_docs.binary import SchemaDocBinaryCodec
+from schema_docs.diff import SchemaDocDiff
+from schema_docs.doc import SchemaDoc, SlottedSetupMixin
+from schema_docs.i import ISchemaDocNamespace
+from schema_docs.serialization import SchemaDocJsonSerializer
+
+
+class GeneratedSchemaDoc(SlottedSetupMixin, SchemaDoc):
+    """
+    Базовый класс документов, сгенерированных schema_docs.codegen.
+
+    Сгенерированные классы объявляют __slots__, поэтому у документов нет __dict__, и setup(...) заменяет класс
+    документа на производный класс с включенными опциями (как у документов с компактным хранением)
+    """
+    __slots__ = ()
+
+
+def finish_types(ns: ISchemaDocNamespace, classes: Iterable):
+    """
+    Регистрирует сгенерированные классы в области имен и назначает им сериализаторы и построитель патчей.
+    Описания полей и план валидации сгенерированный модуль задает в теле классов
+    """
+    classes = tuple(classes)
+    for doc_cls in classes:
+        ns.types[doc_cls.schema['name']] = doc_cls
+
+    for doc_cls in classes:
+        doc_cls._json = SchemaDocJsonSerializer()
+        doc_cls._diff = SchemaDocDiff(doc_cls)
+        doc_cls._binary = SchemaDocBinaryCodec(doc_cls)
@@ -0,0 +1,290 @@
+from typing import Iterable, Iterator, List, Optional
+
+from bisect import bisect_left, bisect_right, insort
+
+import datetime
+
+from schema_docs.utils import field_def_param, iso_to_date, iso_to_datetime, date_to_iso
+
+
+_MISSING = object()
+
+# Типы полей, по которым можно строить индексы (значения хранятся в документе строками, числами или bool)
+INDEXABLE_TYPES = ('string', 'str', 'number', 'num', 'int', 'boolean', 'bool', 'date', 'datetime', 'uuid')
+
+# Верхняя граница для поиска строк по префиксу
+_MAX_CHAR = '\U0010ffff'
+
+
+def _uuid_key(value):
+    # uuid может храниться с тире или без, ключ индекса - запись без тире в нижнем регистре (как uuid_to_str)
+    return value.replace('-', '').lower() if isinstance(value, str) else value
+
+
+def _date_key(value):
+    # дата может храниться в любой записи ISO-8601 (например, 20200105), ключ - запись YYYY-MM-DD
+    return date_to_iso(iso_to_date(value, lenient=True))
+
+
+def _datetime_key(value):
+    # ключ - запись ISO-8601 без часового пояса с микросекундами: значения с часовым поясом приводятся к UTC,
+    # поэтому строки ключей сравниваются в порядке моментов времени
+    value = iso_to_datetime(value, lenient=True)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec='microseconds')
+
+
+_KEY_FUNCTIONS = {
+    'uuid': _uuid_key,
+    'date': _date_key,
+    'datetime': _datetime_key,
+}
+
+
+class SchemaDocHashIndex(object):
+    """
+    Индекс по значениям поля для поиска на равенство. Ключ индекса - значение поля во внутреннем представлении
+    """
+
+    def __init__(self, field, make_key=None):
+        self.field = field
+        self._make_key = make_key
+        # ключ -> {id документа: документ} (словарь сохраняет порядок добавления документов)
+        self._buckets = {}
+        # id документа -> ключ, под которым документ находится в индексе
+        self._doc_keys = {}
+
+    def key(self, doc):
+        value = self.field.raw(doc)
+        return value if self._make_key is None or value is None else self._make_key(value)
+
+    def add(self, doc):
+        key = self.key(doc)
+        self._doc_keys[id(doc)] = key
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+            self._key_added(key)
+        bucket[id(doc)] = doc
+
+    def remove(self, doc):
+        key = self._doc_keys.pop(id(doc))
+
+        bucket = self._buckets[key]
+        del bucket[id(doc)]
+        if not bucket:
+            del self._buckets[key]
+            self._key_removed(key)
+
+    def update(self, doc):
+        if self._doc_keys.get(id(doc), _MISSING) != self.key(doc):
+            self.remove(doc)
+            self.add(doc)
+
+    def eq(self, key) -> List:
+        bucket = self._buckets.get(key)
+        return list(bucket.values()) if bucket else []
+
+    def _key_added(self, key):
+        pass
+
+    def _key_removed(self, key):
+        pass
+
+
+class SchemaDocSortedIndex(SchemaDocHashIndex):
+    """
+    Индекс с упорядоченным списком ключей для поиска на равенство, по диапазону и по префиксу. Ключи дат
+    и даты/времени - строки ISO-8601 в единой записи (дата/время приводится к UTC), порядок которых совпадает
+    с порядком значений. Документы без значения поля (None) в упорядоченный список ключей не попадают
+    """
+
+    def __init__(self, field, make_key=None):
+        super(SchemaDocSortedIndex, self).__init__(field, make_key)
+        self._keys = []
+
+    def range(self, start=None, stop=None, include_stop: bool = True) -> List:
+        keys = self._keys
+        lo = 0 if start is None else bisect_left(keys, start)
+        if stop is None:
+            hi = len(keys)
+        else:
+            hi = bisect_right(keys, stop) if include_stop else bisect_left(keys, stop)
+
+        buckets = self._buckets
+        result = []
+        for key in keys[lo:hi]:
+            result.extend(buckets[key].values())
+        return result
+
+    def prefix(self, prefix: str) -> List:
+        return self.range(prefix, prefix + _MAX_CHAR, include_stop=False)
+
+    def _key_added(self, key):
+        if key is not None:
+            insort(self._keys, key)
+
+    def _key_removed(self, key):
+        if key is not None:
+            del self._keys[bisect_left(self._keys, key)]
+
+
+class SchemaDocCollection(object):
+    """
+    Коллекция документов одного типа с индексами по полям схемы.
+
+    Хэш-индексы (hash_index) ускоряют поиск на равенство, упорядоченные индексы (sorted_index) - поиск
+    на равенство, по диапазону и по префиксу строки. Индексы обновляются при присваивании значений полям
+    документов коллекции, при загрузке данных через from_dict и применении патча (см. schema_docs.diff.apply_patch).
+    Изменения в словаре to_dict() индексами не отслеживаются.
+
+    Значения для поиска указываются во внешнем представлении (date, UUID и т.д.) или во внутреннем (строки).
+    Значения uuid, дат и даты/времени сравниваются в единой записи независимо от того, в каком виде они
+    хранятся в документе. Поиск по полю без индекса просматривает все документы коллекции.
+    """
+
+    def __init__(self, doc_cls, docs: Optional[Iterable] = None, hash_index: Iterable[str] = (),
+                 sorted_index: Iterable[str] = ()):
+        """
+        :param doc_cls: тип документов коллекции (класс из области имен)
+        :param docs: документы, добавляемые в коллекцию
+        :param hash_index: наименования полей для хэш-индексов
+        :param sorted_index: наименования полей для упорядоченных индексов
+        """
+        self.doc_cls = doc_cls
+        self._docs = {}
+        self._indexes = {}
+        self._fields = {field.name: field for field in doc_cls._fields}
+
+        for field_name in hash_index:
+            self._indexes[field_name] = self._make_index(SchemaDocHashIndex, field_name)
+        for field_name in sorted_index:
+            self._indexes[field_name] = self._make_index(SchemaDocSortedIndex, field_name)
+
+        if docs is not None:
+            self.extend(docs)
+
+    def add(self, doc):
+        if not isinstance(doc, self.doc_cls):
+            raise TypeError('Collection of {0} can not contain {1}'.format(
+                self.doc_cls.schema['name'], type(doc).__name__
+            ))
+        if id(doc) in self._docs:
+            return
+
+        self._docs[id(doc)] = doc
+        for index in self._indexes.values():
+            index.add(doc)
+
+        if doc._collections is None:
+            doc._collections = []
+        doc._collections.append(self)
+
+    def extend(self, docs: Iterable):
+        for doc in docs:
+            self.add(doc)
+
+    def remove(self, doc):
+        if self._docs.pop(id(doc), None) is None:
+            raise KeyError('Document is not in the collection')
+
+        for index in self._indexes.values():
+            index.remove(doc)
+
+        doc._collections.remove(self)
+        if not doc._collections:
+            doc._collections = None
+
+    def clear(self):
+        for doc in list(self._docs.values()):
+            self.remove(doc)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._docs.values())
+
+    def __contains__(self, doc):
+        return id(doc) in self._docs
+
+    def find(self, field_name: str, value) -> List:
+        """ Возвращает документы, у которых значение поля field_name равно value """
+        key = self._key(field_name, value)
+
+        index = self._indexes.get(field_name)
+        if index is not None:
+            return index.eq(key)
+
+        field = self._field(field_name)
+        make_key = self._key_function(field)
+        return [doc for doc in self._docs.values() if self._make_key(make_key, field.raw(doc)) == key]
+
+    def find_one(self, field_name: str, value):
+        """ Возвращает первый документ со значением value поля field_name (None, если таких нет) """
+        result = self.find(field_name, value)
+        return result[0] if result else None
+
+    def range(self, field_name: str, start=None, stop=None, include_stop: bool = True) -> List:
+        """
+        Возвращает документы со значением поля от start до stop (включительно, если include_stop) в порядке
+        значений поля. Если граница не указана, диапазон с этой стороны не ограничен
+        """
+        index = self._sorted_index(field_name)
+        return index.range(
+            None if start is None else self._key(field_name, start),
+            None if stop is None else self._key(field_name, stop),
+            include_stop=include_stop,
+        )
+
+    def prefix(self, field_name: str, prefix: str) -> List:
+        """ Возвращает документы, значение строкового поля которых начинается с prefix """
+        return self._sorted_index(field_name).prefix(prefix)
+
+    def _field_changed(self, doc, field_name: str):
+        index = self._indexes.get(field_name)
+        if index is not None:
+            index.update(doc)
+
+    def _doc_changed(self, doc):
+        for index in self._indexes.values():
+            index.update(doc)
+
+    def _make_index(self, index_cls, field_name: str):
+        field = self._field(field_name)
+        if field_def_param(field.field_def, 'type') not in INDEXABLE_TYPES:
+            raise ValueError('Field {0} of type {1} can not be indexed'.format(
+                field_name, field_def_param(field.field_def, 'type')
+            ))
+        return index_cls(field, self._key_function(field))
+
+    def _sorted_index(self, field_name: str) -> SchemaDocSortedIndex:
+        index = self._indexes.get(field_name)
+        if not isinstance(index, SchemaDocSortedIndex):
+            raise ValueError('Field {0} has no sorted index'.format(field_name))
+        return index
+
+    def _field(self, field_name: str):
+        field = self._fields.get(field_name)
+        if field is None:
+            raise ValueError('Field {0} is not defined in {1}'.format(field_name, self.doc_cls.schema['name']))
+        return field
+
+    def _key(self, field_name: str, value):
+        """ Преобразует значение для поиска во внутреннее представление поля """
+        field = self._field(field_name)
+        if value is None:
+            return None
+
+        value = field.from_ext(value, field.name, field.field_def, self.doc_cls)
+        return self._make_key(self._key_function(field), value)
+
+    @staticmethod
+    def _key_function(field):
+        return _KEY_FUNCTIONS.get(field_def_param(field.field_def, 'type'))
+
+    @staticmethod
+    def _make_key(make_key, value):
+        return value if make_key is None or value is None else make_key(value)
@@ -0,0 +1,306 @@
+from typing import Optional
+
+from schema_docs.caster import SchemaDocCaster
+from schema_docs.doc import SchemaDoc, SlottedSetupMixin
+from schema_docs.exceptions import SchemaDocFieldException
+from schema_docs.field import SchemaDocField
+from schema_docs.i import ISchemaDoc
+from schema_docs.utils import field_def_param
+
+
+_MISSING = object()
+
+
+class CompactSchemaDoc(SlottedSetupMixin, SchemaDoc):
+    """
+    Документ с компактным хранением (область имен, построенная с compact=True).
+
+    Классы документов объявляют __slots__: значение каждого поля хранится в отдельном слоте по позиции поля
+    в схеме (слот, которому значение не присваивалось, соответствует отсутствующему ключу словаря данных),
+    у документов нет __dict__ и словарей _data и _decoded. Вложенные документы хранятся как документы
+    (а не словари), списки вложенных документов - как списки документов. Словарь с данными документа
+    формируется при вызове to_dict().
+
+    Отличия от обычных документов:
+
+    * to_dict() возвращает новый словарь, изменения в нем не влияют на документ;
+    * from_dict() копирует значения в документ, ключи, которых нет в схеме, не сохраняются;
+    * setup(soft_numbers=True) заменяет класс документа на производный класс с включенной опцией;
+    * на документы нельзя создавать слабые ссылки.
+    """
+    __slots__ = ('_decoded', '_validated', '_dirty', '_collections')
+
+    # Поля с вложенными документами (дескриптор поля, тип документа, признак списка документов) и запись
+    # значений в слоты по наименованиям полей (заполняются билдером)
+    _sub_doc_fields = ()
+    _slot_setters = None
+
+    @staticmethod
+    def slot_name(index: int) -> str:
+        """ Наименование слота для значения поля с позицией index """
+        return '_v{0}'.format(index)
+
+    def __init__(self, *args, **options):
+        self._decoded = None
+        self._validated = None
+        self._dirty = None
+        self._collections = None
+
+        if args and isinstance(args[0], dict):
+            self.from_dict(args[0])
+
+        if options:
+            for field_name in self.schema['fields'].keys():
+                if field_name in options:
+                    setattr(self, field_name, options[field_name])
+
+    @classmethod
+    def _new(cls, data: Optional[dict] = None):
+        doc = cls.__new__(cls)
+        doc._decoded = None
+        doc._validated = None
+        doc._dirty = None
+        doc._collections = None
+        if data:
+            doc._assign(data)
+        return doc
+
+    @classmethod
+    def cast_dict(cls, value: dict) -> dict:
+        return cls.from_ext_dict(value).to_dict()
+
+    @classmethod
+    def _from_values(cls, values: dict) -> 'CompactSchemaDoc':
+        # вложенные документы кастер уже вернул документами, поэтому значения записываются в слоты как есть
+        doc = cls._new()
+        setters = cls._slot_setters
+        for field_name, value in values.items():
+            setters[field_name](doc, value)
+        return doc
+
+    @classmethod
+    def _data_dict(cls, values: dict) -> dict:
+        # в словаре данных вложенные документы хранятся словарями
+        return cls._from_values(values).to_dict()
+
+    @classmethod
+    def _from_ext_dict(cls, value: dict) -> 'CompactSchemaDoc':
+        return cls.from_ext_dict(value)
+
+    @classmethod
+    def from_ext_dict(cls, value: dict) -> 'CompactSchemaDoc':
+        """
+        Создает документ из словаря с данными во внешнем представлении (аналог cls(**value) без разбора аргументов)
+        """
+        doc = cls._new()
+
+        for field in cls._fields:
+            field_name = field.name
+            if field_name in value:
+                field_value = value[field_name]
+                if field_value is not None:
+                    field_value = field.from_ext(field_value, field_name, field.field_def, cls)
+                field.slot.__set__(doc, field_value)
+
+        return doc
+
+    def _assign(self, data: dict):
+        """ Записывает в слоты значения из словаря данных документа во внутреннем представлении """
+        for field in self._fields:
+            if field.name in data:
+                field.slot.__set__(self, data[field.name])
+
+        for field, doc_cls, is_list in self._sub_doc_fields:
+            value = data.get(field.name)
+            if value is not None:
+                field.slot.__set__(self, self._pack_value(field, value))
+
+    def _pack_value(self, field, value):
+        """ Преобразует словари данных вложенных документов в значении поля field в документы """
+        for sub_doc_field, doc_cls, is_list in self._sub_doc_fields:
+            if sub_doc_field is field:
+                if is_list and type(value) is list:
+                    return [doc_cls._new(item) if type(item) is dict else item for item in value]
+                elif type(value) is dict:
+                    return doc_cls._new(value)
+                break
+
+        return value
+
+    @property
+    def _data(self) -> dict:
+        # совместимость с кодом, читающим данные обычных документов (например, сериализатор в JSON)
+        return self.to_dict()
+
+    def to_dict(self) -> dict:
+        result = {}
+        for field in self._fields:
+            try:
+                result[field.name] = field.slot.__get__(self, None)
+            except AttributeError:
+                # значение полю не присваивалось
+                pass
+
+        for field, doc_cls, is_list in self._sub_doc_fields:
+            value = result.get(field.name)
+            if value is None:
+                continue
+            if is_list:
+                result[field.name] = [None if item is None else item.to_dict() for item in value]
+            else:
+                result[field.name] = value.to_dict()
+
+        return result
+
+    def from_dict(self, value):
+        for field in self._fields:
+            try:
+                field.slot.__delete__(self)
+            except AttributeError:
+                pass
+
+        self._assign(value)
+        self._decoded = None
+        self._validated = None
+        self._dirty = None
+        if self._collections is not None:
+            for collection in self._collections:
+                collection._doc_changed(self)
+        return self
+
+    @classmethod
+    def _compile_layout(cls):
+        """
+        Определяет поля с вложенными документами. Вызывается билдером после создания всех типов области имен
+        """
+        types = cls.ns.types
+        sub_doc_fields = []
+
+        for field in cls._fields:
+            field_type = field_def_param(field.field_def, 'type')
+            items_def = field_def_param(field.field_def, 'items') if field_type in ('array', 'list') else None
+
+            if field_type in types:
+                sub_doc_fields.append((field, types[field_type], False))
+            elif items_def is not None and field_def_param(items_def, 'type') in types:
+                sub_doc_fields.append((field, types[field_def_param(items_def, 'type')], True))
+
+        cls._sub_doc_fields = tuple(sub_doc_fields)
+        cls._slot_setters = {field.name: field.slot.__set__ for field in cls._fields}
+
+
+class SchemaDocCompactField(SchemaDocField):
+    """
+    Дескриптор поля компактного документа: значение хранится в слоте документа (slot - дескриптор слота)
+    """
+    __slots__ = ('slot', )
+
+    def __init__(self, name: str, field_def, from_ext, to_ext, slot):
+        super(SchemaDocCompactField, self).__init__(name, field_def, from_ext, to_ext)
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            value = self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = None
+
+        return self.to_ext(value, self.name, self.field_def, instance)
+
+    def __set__(self, instance, value):
+        if value is not None:
+            value = self.from_ext(value, self.name, self.field_def, instance)
+
+        self.slot.__set__(instance, value)
+
+        dirty = instance._dirty
+        if dirty is not None:
+            dirty.add(self.name)
+
+        collections = instance._collections
+        if collections is not None:
+            for collection in collections:
+                collection._field_changed(instance, self.name)
+
+    def raw(self, instance):
+        try:
+            return self.slot.__get__(instance, None)
+        except AttributeError:
+            return None
+
+    def store(self, instance, value):
+        self.slot.__set__(instance, instance._pack_value(self, value))
+        self._changed(instance)
+
+    def unset(self, instance):
+        try:
+            self.slot.__delete__(instance)
+        except AttributeError:
+            pass
+        self._changed(instance)
+
+
+class SchemaDocCompactCachedField(SchemaDocCompactField):
+    """
+    Дескриптор поля компактного документа с кэшированием значения во внешнем представлении (см.
+    SchemaDocCachedField). Словарь кэша создается при первом чтении такого поля
+    """
+    __slots__ = ()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        decoded = instance._decoded
+        if decoded is None:
+            decoded = instance._decoded = {}
+
+        value = decoded.get(self.name, _MISSING)
+        if value is _MISSING:
+            try:
+                value = self.slot.__get__(instance, owner)
+            except AttributeError:
+                value = None
+            value = decoded[self.name] = self.to_ext(value, self.name, self.field_def, instance)
+
+        return value
+
+    def __set__(self, instance, value):
+        super(SchemaDocCompactCachedField, self).__set__(instance, value)
+
+        if instance._decoded is not None:
+            instance._decoded.pop(self.name, None)
+
+    def _changed(self, instance):
+        if instance._decoded is not None:
+            instance._decoded.pop(self.name, None)
+        super(SchemaDocCompactCachedField, self)._changed(instance)
+
+
+class SchemaDocCompactCaster(SchemaDocCaster):
+    """
+    Кастер компактных документов: значения полей с вложенными документами хранятся как документы
+    """
+
+    def _from_ext_sub_doc(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        self._check_value_type(value, field_name, field_def, (dict, ISchemaDoc))
+
+        doc_cls = doc.ns.types[self._field_type(field_def)]
+        if isinstance(value, doc_cls):
+            # как и в обычных документах, присвоенный документ не копируется
+            return value
+        elif isinstance(value, ISchemaDoc):
+            return doc_cls._new(value.to_dict())
+
+        try:
+            return doc_cls.from_ext_dict(value)
+        except SchemaDocFieldException as e:
+            self._raise_nested_error(e, field_name)
+
+    def _to_ext_sub_doc(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
+        if type(value) is dict:
+            return doc.ns.types[self._field_type(field_def)]._new(value)
+        return value
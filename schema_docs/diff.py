@@ -0,0 +1,139 @@
+from typing import Iterable, List
+
+from schema_docs.utils import field_def_param
+
+
+# Ключи патча: значения полей (во внутреннем представлении), удаляемые поля и патчи вложенных документов
+PATCH_SET = 'set'
+PATCH_UNSET = 'unset'
+PATCH_NESTED = 'nested'
+
+_MISSING = object()
+
+
+class SchemaDocDiff(object):
+    """
+    Построение и применение патчей между документами одного типа.
+
+    Патч - словарь вида {'set': {поле: значение}, 'unset': [поле, ...], 'nested': {поле: патч}}, ключи без
+    изменений в патч не попадают, для одинаковых документов патч пустой ({}). Значения сравниваются и передаются
+    во внутреннем представлении (как в to_dict()), поэтому даты и uuid не разбираются, а патч можно сериализовать
+    в JSON. Для полей с вложенными документами, если документ есть в обеих версиях, строится вложенный патч,
+    остальные значения (в том числе списки) заменяются целиком.
+
+    Значения из патча записываются в документ без копирования.
+    """
+
+    def __init__(self, doc_cls):
+        self._doc_cls = doc_cls
+        self._fields = None
+        self._sub_docs = None
+
+    def diff(self, old_data: dict, new_data: dict) -> dict:
+        """
+        Возвращает патч, превращающий данные old_data в new_data (словари данных документов)
+        """
+        if self._sub_docs is None:
+            self._compile()
+
+        patch_set = None
+        nested = None
+        added = 0
+        sub_docs = self._sub_docs
+
+        for key, value in new_data.items():
+            old_value = old_data.get(key, _MISSING)
+            if old_value is value:
+                continue
+            if old_value is _MISSING:
+                added += 1
+
+            if key in sub_docs and type(value) is dict and type(old_value) is dict:
+                sub_patch = sub_docs[key].diff(old_value, value)
+                if sub_patch:
+                    if nested is None:
+                        nested = {}
+                    nested[key] = sub_patch
+
+            elif old_value is _MISSING or old_value != value:
+                if patch_set is None:
+                    patch_set = {}
+                patch_set[key] = value
+
+        patch = {}
+        if patch_set is not None:
+            patch[PATCH_SET] = patch_set
+        if nested is not None:
+            patch[PATCH_NESTED] = nested
+        if len(old_data) > len(new_data) - added:
+            # в old_data есть ключи, которых нет в new_data
+            patch[PATCH_UNSET] = [key for key in old_data if key not in new_data]
+
+        return patch
+
+    def apply(self, doc, patch: dict):
+        """
+        Применяет патч к документу. Кэши значений и результатов валидации документа обновляются так же,
+        как при присваивании значений полям
+        """
+        if self._fields is None:
+            self._compile()
+
+        fields = self._fields
+
+        for key in patch.get(PATCH_UNSET, ()):
+            field = fields.get(key)
+            if field is not None:
+                field.unset(doc)
+            else:
+                doc.to_dict().pop(key, None)
+
+        for key, value in patch.get(PATCH_SET, {}).items():
+            field = fields.get(key)
+            if field is not None:
+                field.store(doc, value)
+            else:
+                # ключ, которого нет в схеме (у документов с компактным хранением не сохраняется)
+                doc.to_dict()[key] = value
+
+        for key, sub_patch in patch.get(PATCH_NESTED, {}).items():
+            nested_doc = getattr(doc, key)
+            if nested_doc is None:
+                raise ValueError('Cannot apply nested patch to empty field {0}'.format(key))
+            nested_doc._diff.apply(nested_doc, sub_patch)
+
+        return doc
+
+    def _compile(self):
+        types = self._doc_cls.ns.types
+
+        self._fields = {field.name: field for field in self._doc_cls._fields}
+        self._sub_docs = {
+            field.name: types[field_def_param(field.field_def, 'type')]._diff
+            for field in self._doc_cls._fields
+            if field_def_param(field.field_def, 'type') in types
+        }
+
+
+def diff(old_doc, new_doc) -> dict:
+    """
+    Возвращает патч, превращающий данные документа old_doc в данные документа new_doc того же типа
+    (см. SchemaDocDiff)
+    """
+    if new_doc.schema is not old_doc.schema:
+        raise TypeError('Cannot diff documents of different types: {0} and {1}'.format(
+            old_doc.schema['name'], new_doc.schema['name']
+        ))
+    return old_doc._diff.diff(old_doc.to_dict(), new_doc.to_dict())
+
+
+def apply_patch(doc, patch: dict):
+    """ Применяет к документу патч, построенный функцией diff """
+    return doc._diff.apply(doc, patch)
+
+
+def diff_many(old_docs: Iterable, new_docs: Iterable) -> List[dict]:
+    """
+    Возвращает патчи для пар документов (old_docs[i], new_docs[i]) одного типа
+    """
+    return [diff(old_doc, new_doc) for old_doc, new_doc in zip(old_docs, new_docs)]
@@ -1,4 +1,8 @@
-from schema_docs.exceptions import InvalidSchemaDocException
+from typing import Dict, List, Optional, Tuple, Union
+
+import asyncio
+
+from schema_docs.exceptions import InvalidSchemaDocException, SchemaDocFieldException
 from schema_docs.i import ISchemaDoc
 from schema_docs.caster import SchemaDocCaster
 from schema_docs.validation import SchemaDocValidator
@@ -6,53 +10,224 @@ from schema_docs.validation import SchemaDocValidator
 
 class SchemaDoc(ISchemaDoc):
     """ Документ """
+    # Классы документов, которые строит билдер, слотов не объявляют, поэтому атрибуты документа хранятся в __dict__
+    # (кроме классов с компактным хранением, см. CompactSchemaDoc)
+    __slots__ = ()
+
+    # Кастер и валидатор не хранят состояния документа, поэтому создаются один раз и разделяются всеми
+    # документами типа (билдер назначает их при построении области имен)
+    _cast = SchemaDocCaster()
+    _validator = SchemaDocValidator()
+
+    # Допустимость чисел в строках для числовых полей. На уровне типа задается опцией схемы soft_numbers,
+    # на уровне документа - вызовом setup(soft_numbers=True)
+    _soft_numbers = False
+
+    # Разбор дат не в формате ISO-8601 (через dateutil). Задается опцией схемы lenient_dates или вызовом
+    # setup(lenient_dates=True)
+    _lenient_dates = False
+
+    # Дескрипторы полей в порядке описания в схеме, план валидации и сериализатор в JSON (заполняет билдер)
+    _fields = ()
+    _validation_plan = None
+    _json = None
+    _diff = None
+    _binary = None
+
+    # Кэш результатов правил валидации (план, результаты) и наименования полей, измененных после последней
+    # валидации. Создаются при первой валидации документа (см. SchemaDocValidator), до этого изменения полей
+    # не отслеживаются. Как и для кэша значений полей, изменения в словаре to_dict() не отслеживаются
+    _validated = None
+    _dirty = None
+
+    # Коллекции с индексами, в которые добавлен документ (см. SchemaDocCollection)
+    _collections = None
 
     def __init__(self, *args, **options):
-        self._cast = SchemaDocCaster()
-        self._validator = SchemaDocValidator()
         self._data = dict()
-
-        if "options" in self.schema:
-            self.setup(**self.schema["options"])
+        # Кэш значений полей во внешнем представлении (см. SchemaDocCachedField)
+        self._decoded = dict()
 
         if args and isinstance(args[0], dict):
             self.from_dict(args[0])
 
-        for field_name in self.schema['fields'].keys():
-            if field_name in options:
-                setattr(self, field_name, options[field_name])
+        if options:
+            for field_name in self.schema['fields'].keys():
+                if field_name in options:
+                    setattr(self, field_name, options[field_name])
 
-    def __getattr__(self, item):
-        """ """
-        if item in self.schema['fields']:
-            return self._cast.to_ext(
-                value=self._data.get(item),
-                field_name=item,
-                field_def=self.schema['fields'][item],
-                doc=self
-            )
+    @classmethod
+    def from_records(cls, records) -> 'SchemaDocBatch':
+        """
+        Создает документы из последовательности словарей с данными во внешнем представлении.
 
-        raise AttributeError('Attribute "{0}" is not defined'.format(item))
+        Значения преобразуются по колонкам: функция преобразования каждого поля определяется один раз на всю
+        пачку. Ошибки преобразования не прерывают загрузку, а собираются по строкам
+
+        :param records: список или итерируемый объект словарей
+        :return: SchemaDocBatch с документами (None для строк с ошибками) и ошибками по номерам строк
+        """
+        records = records if isinstance(records, list) else list(records)
+        rows = [{} for _ in records]
+        errors = {}
+
+        for field in cls._fields:
+            field_name, field_def, from_ext = field.name, field.field_def, field.from_ext
+
+            for row, record in enumerate(records):
+                if field_name not in record:
+                    continue
+
+                value = record[field_name]
+                if value is not None:
+                    try:
+                        value = from_ext(value, field_name, field_def, cls)
+                    except SchemaDocFieldException as e:
+                        errors.setdefault(row, []).append(e)
+                        continue
+
+                rows[row][field_name] = value
+
+        docs = [None if row in errors else cls._from_values(data) for row, data in enumerate(rows)]
+        return SchemaDocBatch(docs=docs, errors=errors)
+
+    @classmethod
+    def cast_dict(cls, value: dict) -> dict:
+        """
+        Преобразует словарь с данными во внешнем представлении в словарь данных документа, не создавая
+        сам документ. Вложенные документы преобразуются так же, за один проход.
+
+        Опции преобразования (soft_numbers, lenient_dates) берутся из типа документа
+        """
+        result = dict()
+
+        for field in cls._fields:
+            field_name = field.name
+            if field_name in value:
+                field_value = value[field_name]
+                if field_value is not None:
+                    field_value = field.from_ext(field_value, field_name, field.field_def, cls)
+                result[field_name] = field_value
+
+        return result
+
+    @classmethod
+    def try_cast_dict(cls, value: dict) -> Tuple[Optional[dict], List[SchemaDocFieldException]]:
+        """
+        Вариант cast_dict без исключений: преобразуются значения всех полей, ошибки преобразования возвращаются
+        списком (описания ошибок при этом не формируются, см. SchemaDocFieldException)
+
+        :return: словарь данных документа (None, если есть ошибки) и список ошибок по полям
+        """
+        result = dict()
+        errors = None
+
+        for field in cls._fields:
+            field_name = field.name
+            if field_name in value:
+                field_value = value[field_name]
+                if field_value is not None:
+                    try:
+                        field_value = field.from_ext(field_value, field_name, field.field_def, cls)
+                    except SchemaDocFieldException as e:
+                        if errors is None:
+                            errors = []
+                        errors.append(e)
+                        continue
+                result[field_name] = field_value
 
-    def __setattr__(self, key, value):
-        """ """
-        if key in self.schema['fields']:
-            self._data[key] = self._cast.from_ext(
-                value=value,
-                field_name=key,
-                field_def=self.schema['fields'][key],
-                doc=self
-            )
-        else:
-            super(SchemaDoc, self).__setattr__(key, value)
+        return (None, errors) if errors else (cls._data_dict(result), [])
+
+    # Хранение значений, которые вернул кастер (общие from_records и try_cast_dict). Обычные документы хранят
+    # значения в словаре данных как есть, документы с другим способом хранения (CompactSchemaDoc) переопределяют
+    # оба метода
+    @classmethod
+    def _from_values(cls, values: dict) -> 'SchemaDoc':
+        """ Создает документ по словарю значений полей во внутреннем представлении """
+        return cls._new(values)
+
+    @classmethod
+    def _data_dict(cls, values: dict) -> dict:
+        """ Возвращает словарь данных документа по словарю значений полей во внутреннем представлении """
+        return values
+
+    @classmethod
+    def _from_ext_dict(cls, value: dict) -> 'SchemaDoc':
+        """
+        Создает документ из словаря с данными во внешнем представлении. В отличие от cls(**value) ключи словаря
+        не становятся аргументами конструктора (например, ключ "self" из JSON)
+        """
+        return cls._new(cls.cast_dict(value))
+
+    @classmethod
+    def _new(cls, data: Optional[dict] = None):
+        """ Создает документ над словарем данных data без разбора аргументов конструктора """
+        doc = cls.__new__(cls)
+        doc._data = dict() if data is None else data
+        doc._decoded = dict()
+        return doc
+
+    def __getattr__(self, item):
+        """
+        Поля документа обслуживаются дескрипторами, которые создает билдер. Сюда попадаем только при обращении
+        к неизвестному атрибуту
+        """
+        raise AttributeError('Attribute "{0}" is not defined'.format(item))
 
     def to_dict(self) -> dict:
         return self._data
 
     def from_dict(self, value):
         self._data = value
+        self._decoded.clear()
+        if self._validated is not None:
+            # данные заменены целиком, поэтому все результаты валидации устарели
+            self._validated = None
+            self._dirty = None
+        if self._collections is not None:
+            for collection in self._collections:
+                collection._doc_changed(self)
         return self
 
+    def to_json(self, as_bytes: bool = False) -> Union[str, bytes]:
+        """
+        Возвращает JSON с данными документа (результат совпадает с json.dumps(doc.to_dict()))
+
+        :param as_bytes: вернуть bytes в кодировке utf-8 вместо str
+        """
+        result = self._json.dumps(self._data)
+        return result.encode('utf-8') if as_bytes else result
+
+    @classmethod
+    def dumps_many(cls, docs, fp=None, as_bytes: bool = False) -> Union[str, bytes, None]:
+        """
+        Сериализует документы типа в JSON-массив
+
+        :param docs: документы или словари данных документов
+        :param fp: файловый объект, в который массив записывается по мере сериализации (тогда возвращается None)
+        :param as_bytes: писать (возвращать) bytes вместо str
+        """
+        return cls._json.dumps_many(docs, fp=fp, as_bytes=as_bytes)
+
+    def to_bytes(self) -> bytes:
+        """ Возвращает данные документа в бинарном формате (см. SchemaDocBinaryCodec) """
+        return self._binary.encode(self)
+
+    @classmethod
+    def from_bytes(cls, buf: Union[bytes, bytearray, memoryview]) -> 'SchemaDoc':
+        """ Создает документ по данным в бинарном формате (буфер не копируется) """
+        return cls._binary.decode(buf)
+
+    @classmethod
+    def encode_many(cls, docs) -> bytes:
+        """ Кодирует документы типа (или словари данных документов) в бинарный формат """
+        return cls._binary.encode_many(docs)
+
+    @classmethod
+    def decode_many(cls, buf: Union[bytes, bytearray, memoryview]) -> List['SchemaDoc']:
+        """ Создает документы по данным, закодированным методом encode_many """
+        return cls._binary.decode_many(buf)
+
     def __str__(self):
         return '{0}: {1}'.format(self.schema['name'], self.to_dict())
 
@@ -66,8 +241,37 @@ class SchemaDoc(ISchemaDoc):
         :param raise_exception: если True, то при наличии невалидных значений выбрасывается исключение
         :return:
         """
+        if not raise_exception:
+            # Описания несработавших валидаций не нужны, поэтому проверяем до первой ошибки
+            return self._validator.is_valid(self)
+
         failed_validations = self.failed_validations()
 
+        if failed_validations:
+            raise InvalidSchemaDocException(failed_validations=failed_validations)
+
+        return True
+
+    async def afailed_validations(self, max_concurrency: Optional[int] = None):
+        """
+        Асинхронный вариант failed_validations: асинхронные функции валидации и вложенные документы проверяются
+        конкурентно
+
+        :param max_concurrency: максимальное количество одновременно выполняемых асинхронных функций валидации
+            (None - без ограничения)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        return await self._validator.afailed_validation(self, semaphore)
+
+    async def avalidate(self, raise_exception=False, max_concurrency: Optional[int] = None):
+        """
+        Асинхронная валидация документа (см. afailed_validations). Синхронные функции валидации тоже поддерживаются
+
+        :param raise_exception: если True, то при наличии невалидных значений выбрасывается исключение
+        :param max_concurrency: максимальное количество одновременно выполняемых асинхронных функций валидации
+        """
+        failed_validations = await self.afailed_validations(max_concurrency=max_concurrency)
+
         if failed_validations and raise_exception:
             raise InvalidSchemaDocException(failed_validations=failed_validations)
 
@@ -75,5 +279,65 @@ class SchemaDoc(ISchemaDoc):
 
     def setup(self, **options):
         if "soft_numbers" in options:
-            self._cast.allow_number_as_string = True
+            self._soft_numbers = True
+        if "lenient_dates" in options:
+            self._lenient_dates = True
+        return self
+
+
+class SlottedSetupMixin(object):
+    """
+    setup(...) для документов со __slots__ (CompactSchemaDoc, GeneratedSchemaDoc): опции нельзя записать
+    в атрибуты документа, поэтому класс документа заменяется на производный класс с включенными опциями.
+    Производные классы запоминаются в классе документа и общие для всех, кто построил ту же схему
+    """
+    __slots__ = ()
+
+    # Производные классы с опциями по наборам опций (создаются при первом обращении)
+    _setup_classes = None
+
+    def setup(self, **options):
+        flags = {name for name in ('soft_numbers', 'lenient_dates') if name in options}
+        if flags:
+            # опции, включенные ранее (в схеме или предыдущим вызовом setup), сохраняются
+            flags.update(name for name in ('soft_numbers', 'lenient_dates') if getattr(self, '_' + name))
+            self.__class__ = self.ns.types[self.schema['name']]._setup_class(tuple(sorted(flags)))
         return self
+
+    @classmethod
+    def _setup_class(cls, flags: tuple):
+        """ Возвращает производный класс документа с включенными опциями flags (без новых слотов) """
+        if cls._setup_classes is None:
+            cls._setup_classes = {}
+
+        setup_cls = cls._setup_classes.get(flags)
+        if setup_cls is None:
+            attrs = {'__slots__': (), '__module__': cls.__module__}
+            attrs.update({'_{0}'.format(flag): True for flag in flags})
+            setup_cls = cls._setup_classes[flags] = type(cls.__name__, (cls, ), attrs)
+
+        return setup_cls
+
+
+class SchemaDocBatch(object):
+    """
+    Результат пакетного создания документов (см. SchemaDoc.from_records)
+    """
+    def __init__(self, docs: List[Optional[SchemaDoc]], errors: Dict[int, List[SchemaDocFieldException]]):
+        self._docs = docs
+        self._errors = errors
+
+    @property
+    def docs(self) -> List[Optional[SchemaDoc]]:
+        """ Документы в порядке входных записей. Для записей с ошибками преобразования - None """
+        return self._docs
+
+    @property
+    def errors(self) -> Dict[int, List[SchemaDocFieldException]]:
+        """ Ошибки преобразования значений по номерам записей """
+        return self._errors
+
+    @property
+    def valid_docs(self) -> List[SchemaDoc]:
+        """ Документы, созданные без ошибок """
+        return [doc for doc in self._docs if doc is not None]
@@ -0,0 +1,42 @@
+from typing import Optional
+
+
+# Коды ошибок преобразования значений и несработавших валидаций
+ERROR_TYPE = 'type'
+ERROR_REQUIRED = 'required'
+ERROR_NOT_EMPTY = 'not-empty'
+ERROR_CUSTOM = 'custom'
+ERROR_ITEM_REQUIRED = 'item-required'
+ERROR_ITEM_NOT_EMPTY = 'item-not-empty'
+ERROR_ITEM_CUSTOM = 'item-custom'
+
+# Шаблоны описаний ошибок по кодам: path - путь к полю, value - значение, detail - тип поля для ошибок
+# преобразования или описание, которое вернула функция валидации
+MESSAGES = {
+    ERROR_TYPE: 'Value {value} is not compatible with field {path} of type {detail}',
+    ERROR_REQUIRED: 'Не указано обязательное значение поля {path}',
+    ERROR_NOT_EMPTY: 'В поле {path} должно быть указано непустое значение',
+    ERROR_CUSTOM: '{detail}',
+    ERROR_ITEM_REQUIRED: '{path}: Не указано обязательное значение элемента',
+    ERROR_ITEM_NOT_EMPTY: '{path}: Должно быть указано непустое значение элемента',
+    ERROR_ITEM_CUSTOM: '{path}: {detail}',
+}
+
+
+def format_path(path: tuple) -> str:
+    """
+    Возвращает запись пути к полю: наименования полей через точку, номера элементов списков в скобках
+    (например, ('lines', 1, 'code') -> 'lines[1].code')
+    """
+    result = ''
+    for part in path:
+        if isinstance(part, int):
+            result = '{0}[{1}]'.format(result, part)
+        else:
+            result = '{0}.{1}'.format(result, part) if result else part
+    return result
+
+
+def render_message(code: str, path: tuple, value=None, detail: Optional[str] = None) -> str:
+    """ Формирует описание ошибки по коду """
+    return MESSAGES[code].format(path=format_path(path), value=value, detail=detail)
@@ -1,15 +1,38 @@
 from typing import Optional
 
+from schema_docs.errors import ERROR_TYPE, format_path, render_message
+
 
 class SchemaDocFieldException(Exception):
+    """
+    Ошибка преобразования значения поля: код ошибки (см. schema_docs.errors), путь к полю (с учетом вложенных
+    документов и элементов списков), тип поля и значение. Описание формируется при первом обращении к msg
+    (или при выводе исключения), поэтому выброс и перехват исключения не тратят время на форматирование значения
+    """
+
+    def __init__(self, msg: Optional[str] = None, field_name: Optional[str] = None, field_type=None,
+                 failed_value=None, code: str = ERROR_TYPE, path: Optional[tuple] = None):
+        super(SchemaDocFieldException, self).__init__()
 
-    def __init__(self, msg, field_name, field_type, failed_value):
-        self.msg = msg
-        self.field_name = field_name
+        self.code = code
+        self.path = path if path is not None else (field_name, )
         self.field_type = field_type
         self.failed_value = failed_value
+        self._msg = msg
 
-        super(SchemaDocFieldException, self).__init__(msg)
+    @property
+    def msg(self) -> str:
+        if self._msg is None:
+            self._msg = render_message(self.code, self.path, self.failed_value, self.field_type)
+        return self._msg
+
+    @property
+    def field_name(self) -> str:
+        """ Путь к полю в виде строки (например, lines[1].code) """
+        return format_path(self.path)
+
+    def __str__(self):
+        return self.msg
 
 
 class InvalidSchemaDocException(Exception):
@@ -17,5 +40,26 @@ class InvalidSchemaDocException(Exception):
     Исключение о том, что schema_doc не является валидным
     """
     def __init__(self, failed_validations=None):
-        msg = '; '.join([fv.msg for fv in failed_validations])
-        super(InvalidSchemaDocException, self).__init__(msg)
+        super(InvalidSchemaDocException, self).__init__()
+        self.failed_validations = failed_validations or []
+
+    def __str__(self):
+        return '; '.join([fv.msg for fv in self.failed_validations])
+
+
+class SchemaDocStreamException(Exception):
+    """
+    Исключение о невалидной строке потока документов (режим fail-fast)
+    """
+    def __init__(self, line_no, failed_validations=None):
+        self.line_no = line_no
+        self.failed_validations = failed_validations or []
+
+        msg = 'Line {0}: {1}'.format(line_no, '; '.join([fv.msg for fv in self.failed_validations]))
+        super(SchemaDocStreamException, self).__init__(msg)
+
+
+class SchemaDocBinaryException(Exception):
+    """
+    Исключение при кодировании документа в бинарный формат или декодировании некорректных данных
+    """
@@ -0,0 +1,114 @@
+class SchemaDocField(object):
+    """
+    Дескриптор поля схемного документа.
+
+    Создается билдером для каждого поля схемы. Функции преобразования значения из внешнего представления
+    и обратно определяются один раз при построении области имен, поэтому чтение и запись поля документа
+    сводятся к одному вызову дескриптора.
+    """
+    __slots__ = ('name', 'field_def', 'from_ext', 'to_ext')
+
+    def __init__(self, name: str, field_def, from_ext, to_ext):
+        """
+        :param name: наименование поля
+        :param field_def: описание поля из схемы документа
+        :param from_ext: метод кастера для преобразования значения из внешнего представления
+        :param to_ext: метод кастера для преобразования значения во внешнее представление
+        """
+        self.name = name
+        self.field_def = field_def
+        self.from_ext = from_ext
+        self.to_ext = to_ext
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        return self.to_ext(instance._data.get(self.name), self.name, self.field_def, instance)
+
+    def __set__(self, instance, value):
+        if value is not None:
+            # Значение None преобразовывать не нужно. Просто записываем как есть
+            value = self.from_ext(value, self.name, self.field_def, instance)
+
+        instance._data[self.name] = value
+
+        dirty = instance._dirty
+        if dirty is not None:
+            dirty.add(self.name)
+
+        collections = instance._collections
+        if collections is not None:
+            for collection in collections:
+                collection._field_changed(instance, self.name)
+
+    def raw(self, instance):
+        """ Возвращает значение поля во внутреннем представлении (None, если значения нет) """
+        return instance._data.get(self.name)
+
+    def store(self, instance, value):
+        """ Записывает значение во внутреннем представлении (без преобразования и проверки типа) """
+        instance._data[self.name] = value
+        self._changed(instance)
+
+    def unset(self, instance):
+        """ Удаляет значение поля (ключ поля отсутствует в to_dict()) """
+        instance._data.pop(self.name, None)
+        self._changed(instance)
+
+    def _changed(self, instance):
+        dirty = instance._dirty
+        if dirty is not None:
+            dirty.add(self.name)
+
+        collections = instance._collections
+        if collections is not None:
+            for collection in collections:
+                collection._field_changed(instance, self.name)
+
+
+_MISSING = object()
+
+
+class SchemaDocCachedField(SchemaDocField):
+    """
+    Дескриптор поля, преобразование которого во внешнее представление не бесплатно (даты, uuid, вложенные
+    документы). Результат преобразования запоминается в документе и сбрасывается при записи значения поля
+    или загрузке документа через from_dict.
+
+    Значения, изменённые напрямую в словаре, который возвращает to_dict(), кэшем не отслеживаются.
+    """
+    __slots__ = ()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        decoded = instance._decoded
+        value = decoded.get(self.name, _MISSING)
+        if value is _MISSING:
+            value = decoded[self.name] = self.to_ext(
+                instance._data.get(self.name), self.name, self.field_def, instance
+            )
+
+        return value
+
+    def __set__(self, instance, value):
+        if value is not None:
+            value = self.from_ext(value, self.name, self.field_def, instance)
+
+        instance._data[self.name] = value
+        instance._decoded.pop(self.name, None)
+
+        dirty = instance._dirty
+        if dirty is not None:
+            dirty.add(self.name)
+
+        collections = instance._collections
+        if collections is not None:
+            for collection in collections:
+                collection._field_changed(instance, self.name)
+
+    def _changed(self, instance):
+        instance._decoded.pop(self.name, None)
+        super(SchemaDocCachedField, self)._changed(instance)
@@ -13,6 +13,8 @@ class ISchemaDocFailedValidation(object, metaclass=abc.ABCMeta):
 
 
 class ISchemaDoc(object):
+    # Пустые слоты нужны, чтобы у документов с компактным хранением (CompactSchemaDoc) не было __dict__
+    __slots__ = ()
 
     ns = None
     schema = None
@@ -33,6 +35,12 @@ class ISchemaDoc(object):
         """ """
         return []
 
+    async def avalidate(self):
+        return True
+
+    async def afailed_validations(self) -> List[ISchemaDocFailedValidation]:
+        return []
+
 
 class ISchemaDocNamespace(object, metaclass=abc.ABCMeta):
     """
@@ -54,7 +62,8 @@ class ISchemaDocBuilder(object, metaclass=abc.ABCMeta):
     """
 
     @abc.abstractmethod
-    def build_namespace(self, schema: dict) -> ISchemaDocNamespace:
+    def build_namespace(self, schema: dict, compact: bool = False,
+                        intern_size: Optional[int] = None) -> ISchemaDocNamespace:
         """ Возвращает построенный объект области имен схемных документов """
 
 
@@ -72,6 +81,14 @@ class ISchemaDocCaster(object, metaclass=abc.ABCMeta):
     def to_ext(self, value, field_name: str, field_def: dict, doc: ISchemaDoc):
         """ Преобразование значения из внутренного представления во внутреннее """
 
+    @abc.abstractmethod
+    def resolve_from_ext(self, field_def, types: dict):
+        """ Возвращает функцию преобразования из внешнего представления для поля с описанием field_def """
+
+    @abc.abstractmethod
+    def resolve_to_ext(self, field_def, types: dict):
+        """ Возвращает функцию преобразования во внешнее представление для поля с описанием field_def """
+
     @property
     @abc.abstractmethod
     def allow_number_as_string(self) -> bool:
@@ -87,11 +104,34 @@ class ISchemaDocValidator(object, metaclass=abc.ABCMeta):
     def failed_validation(self, schema_doc: ISchemaDoc) -> List[ISchemaDocFailedValidation]:
         """ Возвращает список """
 
+    def is_valid(self, schema_doc: ISchemaDoc) -> bool:
+        """ Возвращает True, если документ проходит все проверки """
+        return not self.failed_validation(schema_doc)
+
+    async def afailed_validation(self, schema_doc: ISchemaDoc, semaphore=None) -> List[ISchemaDocFailedValidation]:
+        """ Асинхронный вариант failed_validation """
+        return self.failed_validation(schema_doc)
+
 
 class ISchemaDocValidationRule(object, metaclass=abc.ABCMeta):
     """
     """
 
+    # True, если результат правила зависит только от значения поля field_name. Результаты таких правил
+    # кэшируются в документе до изменения поля
+    cacheable = False
+
+    # True, если правило нужно проверять через avalidate (например, функция валидации - корутина)
+    is_async = False
+
     @abc.abstractmethod
     def validate(self, doc: ISchemaDoc) -> Optional[ISchemaDocFailedValidation]:
         """ """
+
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        """ Проверка без формирования описания несработавшей валидации """
+        return self.validate(doc) is None
+
+    async def avalidate(self, doc: ISchemaDoc) -> Optional[ISchemaDocFailedValidation]:
+        """ Асинхронная проверка """
+        return self.validate(doc)
@@ -0,0 +1,221 @@
+from typing import Callable, Optional
+
+import time
+
+from schema_docs.i import ISchemaDocNamespace, ISchemaDoc, ISchemaDocValidationRule
+from schema_docs.validation import SchemaDocValidationPlan
+
+
+# События, о которых сообщается в callback
+EVENT_CAST = 'cast'
+EVENT_DECODE = 'decode'
+EVENT_VALIDATION = 'validation'
+
+# Счетчики по полю (в порядке хранения)
+COUNTER_NAMES = (
+    'casts', 'cast_failures', 'cast_seconds', 'decodes', 'decode_seconds',
+    'validations', 'validation_failures', 'validation_seconds',
+)
+
+
+class SchemaDocInstrumentation(object):
+    """
+    Сбор статистики по преобразованиям значений и валидации полей документов области имен.
+
+    Пока инструментирование не включено, документы работают без каких-либо дополнительных проверок: при
+    включении функции преобразования в дескрипторах полей и план валидации типов подменяются на
+    замеряющие обертки, при выключении - возвращаются исходные.
+
+    Подмена выполняется в классах документов области имен, а не в копии: если область имен запомнена
+    (build_schemadoc_namespace(..., memoize=True)), инструментирование действует для всех, кто построил
+    ту же схему. Для замеров в изоляции стройте область имен с memoize=False.
+
+    Пример::
+
+        with SchemaDocInstrumentation(ns) as instrumentation:
+            ...
+        instrumentation.snapshot()
+    """
+
+    def __init__(self, ns: ISchemaDocNamespace, callback: Optional[Callable] = None):
+        """
+        :param ns: область имен схемных документов
+        :param callback: функция callback(type_name, field_name, event, seconds, failed), вызываемая на каждое
+            событие (cast, decode, validation)
+        """
+        self._ns = ns
+        self._callback = callback
+        self._counters = {}
+
+        # исходные функции преобразования полей и планы валидации типов (пока инструментирование включено)
+        self._original_casts = None
+        self._original_plans = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._original_casts is not None
+
+    def enable(self):
+        if self.enabled:
+            return self
+
+        self._original_casts = []
+        self._original_plans = []
+
+        for type_name, doc_cls in self._ns.types.items():
+            for field in doc_cls._fields:
+                counters = self._field_counters(type_name, field.name)
+                self._original_casts.append((field, field.from_ext, field.to_ext))
+
+                field.from_ext = self._wrap_cast(field.from_ext, counters, type_name, field.name, EVENT_CAST)
+                field.to_ext = self._wrap_cast(field.to_ext, counters, type_name, field.name, EVENT_DECODE)
+
+            plan = doc_cls._validation_plan
+            self._original_plans.append((doc_cls, plan))
+
+            doc_cls._validation_plan = SchemaDocValidationPlan(
+                rules=[
+                    InstrumentedValidationRule(rule, self._field_counters(type_name, rule.field_name), self._emit)
+                    for rule in plan.rules
+                ],
+                nested_fields=plan.nested_fields,
+                nested_lists=plan.nested_lists
+            )
+
+        return self
+
+    def disable(self):
+        if not self.enabled:
+            return self
+
+        for field, from_ext, to_ext in self._original_casts:
+            field.from_ext = from_ext
+            field.to_ext = to_ext
+
+        for doc_cls, plan in self._original_plans:
+            doc_cls._validation_plan = plan
+
+        self._original_casts = None
+        self._original_plans = None
+        return self
+
+    def reset(self):
+        """ Обнуляет счетчики """
+        for counters in self._counters.values():
+            counters[:] = _new_counters()
+        return self
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает счетчики в виде словаря: наименование типа -> наименование поля -> счетчики
+        (casts, cast_failures, cast_seconds, decodes, decode_seconds, validations, validation_failures,
+        validation_seconds). Для полей с кэшируемыми значениями (даты, uuid, вложенные документы) decodes
+        учитывает только вычисления значения, а не чтения из кэша
+        """
+        result = {}
+
+        for (type_name, field_name), counters in self._counters.items():
+            result.setdefault(type_name, {})[field_name] = dict(zip(COUNTER_NAMES, counters))
+
+        return result
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disable()
+
+    def _field_counters(self, type_name: str, field_name: str) -> list:
+        key = (type_name, field_name)
+        if key not in self._counters:
+            self._counters[key] = _new_counters()
+        return self._counters[key]
+
+    def _emit(self, type_name: str, field_name: str, event: str, seconds: float, failed: bool):
+        if self._callback is not None:
+            self._callback(type_name, field_name, event, seconds, failed)
+
+    def _wrap_cast(self, cast, counters: list, type_name: str, field_name: str, event: str):
+        perf_counter = time.perf_counter
+        emit = self._emit
+        # позиции счетчиков: количество, ошибки, время
+        count, failures, seconds = (0, 1, 2) if event == EVENT_CAST else (3, None, 4)
+
+        def instrumented_cast(value, name: str, field_def, doc: ISchemaDoc):
+            started = perf_counter()
+            try:
+                result = cast(value, name, field_def, doc)
+            except Exception:
+                elapsed = perf_counter() - started
+                counters[count] += 1
+                counters[seconds] += elapsed
+                if failures is not None:
+                    counters[failures] += 1
+                emit(type_name, field_name, event, elapsed, True)
+                raise
+
+            elapsed = perf_counter() - started
+            counters[count] += 1
+            counters[seconds] += elapsed
+            emit(type_name, field_name, event, elapsed, False)
+            return result
+
+        return instrumented_cast
+
+
+def _new_counters() -> list:
+    return [0, 0, 0.0, 0, 0.0, 0, 0, 0.0]
+
+
+class InstrumentedValidationRule(ISchemaDocValidationRule):
+    """
+    Обертка правила валидации, замеряющая время проверки и считающая несработавшие проверки
+    """
+
+    def __init__(self, rule: ISchemaDocValidationRule, counters: list, emit: Callable):
+        self._rule = rule
+        self._counters = counters
+        self._emit = emit
+
+    @property
+    def field_name(self) -> str:
+        return self._rule.field_name
+
+    @property
+    def field_def(self):
+        return self._rule.field_def
+
+    @property
+    def cacheable(self) -> bool:
+        return self._rule.cacheable
+
+    @property
+    def is_async(self) -> bool:
+        return self._rule.is_async
+
+    def validate(self, doc: ISchemaDoc):
+        started = time.perf_counter()
+        result = self._rule.validate(doc)
+        self._count(doc, time.perf_counter() - started, result is not None)
+        return result
+
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        started = time.perf_counter()
+        result = self._rule.is_valid(doc)
+        self._count(doc, time.perf_counter() - started, not result)
+        return result
+
+    async def avalidate(self, doc: ISchemaDoc):
+        # для асинхронных правил учитывается время до получения результата, включая ожидание
+        started = time.perf_counter()
+        result = await self._rule.avalidate(doc)
+        self._count(doc, time.perf_counter() - started, result is not None)
+        return result
+
+    def _count(self, doc: ISchemaDoc, elapsed: float, failed: bool):
+        counters = self._counters
+        counters[5] += 1
+        counters[7] += elapsed
+        if failed:
+            counters[6] += 1
+        self._emit(doc.schema['name'], self.field_name, EVENT_VALIDATION, elapsed, failed)
@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from schema_docs.utils import safe_str_to_uuid, uuid_to_str, str_to_uuid
+
+
+# Размер пула по умолчанию (количество значений каждого вида)
+DEFAULT_INTERN_SIZE = 65536
+
+
+def _identity(value):
+    return value
+
+
+def _checked_uuid_string(value: str):
+    return value if safe_str_to_uuid(value) is not None else None
+
+
+class SchemaDocInternPool(object):
+    """
+    Пул повторяющихся значений области имен для массовой загрузки документов.
+
+    Одинаковые строки и uuid, приходящие в разных документах, хранятся одним объектом, а результаты разбора
+    и проверки uuid запоминаются, поэтому повторное значение не проверяется заново. Каждый вид значений
+    хранится в отдельном LRU-кэше размером maxsize: при переполнении вытесняются давно не встречавшиеся
+    значения (документы, которые на них ссылаются, при этом не меняются).
+
+    Пул используется кастером области имен, построенной с параметром intern_size
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_INTERN_SIZE):
+        self.maxsize = maxsize
+        # lru_cache от тождественной функции возвращает объект, с которым значение встретилось впервые
+        self.string = lru_cache(maxsize=maxsize)(_identity)
+        # строка uuid -> та же строка, если она является записью uuid, иначе None
+        self.uuid_string = lru_cache(maxsize=maxsize)(_checked_uuid_string)
+        # объект UUID -> строка внутреннего представления
+        self.uuid_to_string = lru_cache(maxsize=maxsize)(uuid_to_str)
+        # строка внутреннего представления -> объект UUID (объекты UUID неизменяемы, поэтому их можно разделять)
+        self.uuid = lru_cache(maxsize=maxsize)(str_to_uuid)
+
+    def info(self) -> dict:
+        """ Возвращает статистику использования пула (попадания, промахи, размер) по видам значений """
+        return {
+            name: getattr(self, name).cache_info()._asdict()
+            for name in ('string', 'uuid_string', 'uuid_to_string', 'uuid')
+        }
+
+    def clear(self):
+        for name in ('string', 'uuid_string', 'uuid_to_string', 'uuid'):
+            getattr(self, name).cache_clear()
@@ -3,6 +3,9 @@ from schema_docs.i import ISchemaDocNamespace
 
 class SchemaDocNamespace(ISchemaDocNamespace):
 
+    # Пул повторяющихся значений (см. SchemaDocInternPool), если область имен построена с intern_size
+    intern_pool = None
+
     def __init__(self):
         self._types = {}
 
@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from schema_docs.builder import SchemaDocBuilder
+from schema_docs.exceptions import SchemaDocFieldException
+from schema_docs.i import ISchemaDocFailedValidation
+from schema_docs.validation import field_exception_failed_validation
+
+
+def validate_records(schema, type_name: str, records, max_workers: Optional[int] = None,
+                     chunk_size: int = 1000) -> List[List[ISchemaDocFailedValidation]]:
+    """
+    Валидирует большое количество записей (словарей с данными во внешнем представлении) в пуле процессов.
+
+    Классы документов в процессы не передаются: каждый процесс один раз строит область имен по схеме, поэтому
+    схема должна сериализоваться через pickle (функции валидации должны быть объявлены на уровне модуля).
+
+    :param schema: схема документов (как для build_schemadoc_namespace)
+    :param type_name: наименование типа документа
+    :param records: последовательность словарей
+    :param max_workers: количество процессов (по умолчанию - количество процессоров). При значении 1
+        валидация выполняется в текущем процессе
+    :param chunk_size: количество записей, передаваемых в процесс за один раз
+    :return: списки несработавших валидаций в порядке входных записей (пустой список для валидной записи)
+    """
+    records = records if isinstance(records, list) else list(records)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(records) <= chunk_size:
+        # область имен строится локально: глобальная область имен есть только у процессов пула
+        doc_cls = SchemaDocBuilder().build_namespace(schema).types[type_name]
+        return _validate_docs(doc_cls, records)
+
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+
+    result = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(schema, )) as executor:
+        # map возвращает результаты в порядке передачи частей
+        for chunk_result in executor.map(_validate_chunk, [type_name] * len(chunks), chunks):
+            result.extend(chunk_result)
+
+    return result
+
+
+# Область имен, построенная в процессе пула
+_worker_ns = None
+
+
+def _init_worker(schema):
+    global _worker_ns
+    _worker_ns = SchemaDocBuilder().build_namespace(schema)
+
+
+def _validate_chunk(type_name: str, records: list) -> List[List[ISchemaDocFailedValidation]]:
+    return _validate_docs(_worker_ns.types[type_name], records)
+
+
+def _validate_docs(doc_cls, records: list) -> List[List[ISchemaDocFailedValidation]]:
+    result = []
+    for record in records:
+        try:
+            doc = doc_cls._from_ext_dict(record)
+        except SchemaDocFieldException as e:
+            result.append([field_exception_failed_validation(e)])
+        else:
+            result.append(doc.failed_validations())
+
+    return result
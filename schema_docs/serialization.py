@@ -0,0 +1,74 @@
+from typing import Iterable, Union
+
+import json
+from itertools import islice
+
+
+# Количество документов, кодируемых за один вызов энкодера при записи в файловый объект
+STREAM_CHUNK_SIZE = 1000
+
+
+def _default(value):
+    raise TypeError('Object of type {0} is not JSON serializable'.format(type(value).__name__))
+
+
+def make_encoder(default=_default) -> json.JSONEncoder:
+    """
+    Возвращает энкодер, кодирующий значение в JSON так же, как json.dumps с параметрами по умолчанию.
+
+    Сериализаторы создают энкодер один раз. Проверка циклических ссылок отключена: данные документа - дерево
+    из словарей и списков
+    """
+    return json.JSONEncoder(check_circular=False, separators=(', ', ': '), default=default)
+
+
+class SchemaDocJsonSerializer(object):
+    """
+    Сериализатор данных документов одного типа в JSON.
+
+    Данные документа (to_dict()) уже хранятся во внешнем представлении, поэтому JSON формируется напрямую из них,
+    без чтения полей. Результат совпадает с json.dumps(doc.to_dict())
+    """
+
+    def __init__(self):
+        self._encode = make_encoder().encode
+
+    def dumps(self, data: dict) -> str:
+        """ Возвращает JSON для словаря данных документа """
+        return self._encode(data)
+
+    def dumps_many(self, docs: Iterable, fp=None, as_bytes: bool = False) -> Union[str, bytes, None]:
+        """
+        Сериализует список документов в JSON-массив
+
+        :param docs: документы (или словари данных документов)
+        :param fp: файловый объект, в который массив записывается частями по мере сериализации документов. Если
+            не указан, результат возвращается
+        :param as_bytes: писать (возвращать) bytes вместо str
+        """
+        if fp is None:
+            result = self._encode([self._data(doc) for doc in docs])
+            return result.encode('utf-8') if as_bytes else result
+
+        write = fp.write
+        separator = ''
+        write(b'[' if as_bytes else '[')
+
+        docs = iter(docs)
+        while True:
+            chunk = [self._data(doc) for doc in islice(docs, STREAM_CHUNK_SIZE)]
+            if not chunk:
+                break
+
+            # кодируем пачку как массив и убираем скобки
+            content = separator + self._encode(chunk)[1:-1]
+            write(content.encode('utf-8') if as_bytes else content)
+            separator = ', '
+
+        write(b']' if as_bytes else ']')
+
+        return None
+
+    @staticmethod
+    def _data(doc) -> dict:
+        return doc if isinstance(doc, dict) else doc.to_dict()
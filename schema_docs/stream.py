@@ -0,0 +1,125 @@
+from typing import Iterator, Optional, Tuple, List
+
+import os
+import json
+import time
+
+from schema_docs.i import ISchemaDoc, ISchemaDocFailedValidation
+from schema_docs.exceptions import SchemaDocFieldException, SchemaDocStreamException
+from schema_docs.validation import SchemaDocFailedValidation, field_exception_failed_validation
+
+
+class SchemaDocJsonLinesReader(object):
+    """
+    Потоковое чтение документов из файла в формате JSON Lines (один JSON-объект на строку).
+
+    Строки читаются и преобразуются в документы по одной, поэтому расход памяти не зависит от размера входных
+    данных. Итерация возвращает кортежи (номер строки, документ, список несработавших валидаций).
+
+    Режимы обработки невалидных строк (некорректный JSON, ошибки преобразования значений, несработавшие
+    валидации):
+
+    - report - строка возвращается вместе со списком ошибок (документ равен None, если его не удалось создать);
+    - skip-invalid - невалидные строки пропускаются;
+    - fail-fast - на первой невалидной строке выбрасывается SchemaDocStreamException.
+    """
+
+    MODE_REPORT = 'report'
+    MODE_SKIP_INVALID = 'skip-invalid'
+    MODE_FAIL_FAST = 'fail-fast'
+
+    MODES = (MODE_REPORT, MODE_SKIP_INVALID, MODE_FAIL_FAST)
+
+    def __init__(self, doc_cls, source, mode: str = MODE_REPORT, encoding: str = 'utf-8'):
+        """
+        :param doc_cls: тип документа из области имен
+        :param source: путь к файлу или открытый файловый объект (текстовый или бинарный)
+        :param mode: режим обработки невалидных строк
+        :param encoding: кодировка файла (если source - путь к файлу)
+        """
+        if mode not in self.MODES:
+            raise ValueError('Unknown mode {0}. Available modes: {1}'.format(mode, ', '.join(self.MODES)))
+
+        self._doc_cls = doc_cls
+        self._source = source
+        self._mode = mode
+        self._encoding = encoding
+
+        self._counters = {
+            'lines': 0,
+            'bytes': 0,
+            'docs': 0,
+            'invalid': 0,
+            'skipped': 0,
+            'seconds': 0.0,
+        }
+
+    @property
+    def counters(self) -> dict:
+        """
+        Счетчики обработки: прочитанные непустые строки, прочитанные байты (символы для текстовых потоков),
+        возвращенные документы, невалидные и пропущенные строки, время обработки (без учета времени
+        потребителя итератора) и производительность в строках в секунду
+        """
+        result = dict(self._counters)
+        result['lines_per_second'] = result['lines'] / result['seconds'] if result['seconds'] else 0.0
+        return result
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[ISchemaDoc], List[ISchemaDocFailedValidation]]]:
+        if isinstance(self._source, (str, bytes, os.PathLike)):
+            with open(self._source, 'r', encoding=self._encoding) as stream:
+                yield from self._read(stream)
+        else:
+            yield from self._read(self._source)
+
+    def _read(self, stream):
+        counters = self._counters
+        perf_counter = time.perf_counter
+
+        for line_no, line in enumerate(stream, start=1):
+            started = perf_counter()
+
+            counters['bytes'] += len(line)
+            if not line.strip():
+                counters['seconds'] += perf_counter() - started
+                continue
+
+            counters['lines'] += 1
+            doc, failed_validations = self._load_line(line)
+
+            if failed_validations:
+                counters['invalid'] += 1
+
+                if self._mode == self.MODE_FAIL_FAST:
+                    counters['seconds'] += perf_counter() - started
+                    raise SchemaDocStreamException(line_no=line_no, failed_validations=failed_validations)
+
+                if self._mode == self.MODE_SKIP_INVALID:
+                    counters['skipped'] += 1
+                    counters['seconds'] += perf_counter() - started
+                    continue
+
+            if doc is not None:
+                counters['docs'] += 1
+
+            counters['seconds'] += perf_counter() - started
+            yield line_no, doc, failed_validations
+
+    def _load_line(self, line) -> Tuple[Optional[ISchemaDoc], List[ISchemaDocFailedValidation]]:
+        """
+        Создает документ из строки и возвращает его вместе со списком несработавших валидаций
+        """
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return None, [SchemaDocFailedValidation(msg='Invalid JSON: {0}'.format(e))]
+
+        if not isinstance(record, dict):
+            return None, [SchemaDocFailedValidation(msg='JSON object expected, got {0}'.format(type(record).__name__))]
+
+        try:
+            doc = self._doc_cls._from_ext_dict(record)
+        except SchemaDocFieldException as e:
+            return None, [field_exception_failed_validation(e)]
+
+        return doc, doc.failed_validations()
@@ -0,0 +1,454 @@
+from typing import Iterable, List
+
+import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from schema_docs.caster import SchemaDocCaster
+from schema_docs.i import ISchemaDoc
+from schema_docs.validation import FieldNotEmptyValidation, FieldRequiredValidation
+from schema_docs.utils import field_def_param, iso_to_date, iso_to_datetime, date_to_iso, datetime_to_iso, \
+    ZERO_DATE, ZERO_DATETIME, ZERO_UUID, uuid_to_str
+
+
+# Виды колонок таблицы по типам полей. Словарь типов тот же, что и у кастера (SchemaDocCaster.MAP_FROM_EXT),
+# типы, не указанные явно (строки, uuid, списки, объекты), а также вложенные документы хранятся в колонках
+# с dtype=object во внешнем представлении
+KIND_NUMBER = 'number'
+KIND_DATE = 'date'
+KIND_DATETIME = 'datetime'
+KIND_BOOL = 'bool'
+KIND_OBJECT = 'object'
+
+COLUMN_KINDS = dict.fromkeys(SchemaDocCaster().MAP_FROM_EXT, KIND_OBJECT)
+COLUMN_KINDS.update({
+    'number': KIND_NUMBER,
+    'num': KIND_NUMBER,
+    'int': KIND_NUMBER,
+    'date': KIND_DATE,
+    'datetime': KIND_DATETIME,
+    'boolean': KIND_BOOL,
+    'bool': KIND_BOOL,
+})
+
+_NUMBER_TYPES = frozenset([int, float, type(None)])
+_STRING_TYPES = frozenset([str, type(None)])
+_BOOL_TYPES = frozenset([bool, type(None)])
+
+_EMPTY_UUIDS = (uuid_to_str(ZERO_UUID), uuid_to_str(ZERO_UUID, no_dashes=False))
+
+# Границы целых значений для колонки int64 и для точного хранения целых в колонке float64
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_FLOAT_INT_MAX = 2 ** 53
+
+
+class DocTable(object):
+    """
+    Колоночное хранилище документов одного типа.
+
+    Вместо отдельного объекта SchemaDoc со своим словарем на каждый документ значения полей хранятся
+    в массивах NumPy: числа - в int64 (если все значения колонки целые) или float64 (целые значения отмечаются
+    в отдельной маске и читаются как int), значения, которые нельзя так сохранить без потерь (логические, большие
+    целые), - в массиве объектов; даты - в datetime64[D], даты/время - в datetime64[us] (значения
+    с часовым поясом приводятся к UTC, часовой пояс строки хранится отдельно, и строка отдает значение в нем же),
+    логические значения - в bool, остальные поля - в массивах объектов
+    во внешнем представлении. Признак отсутствия значения (None) хранится в отдельной маске для каждой колонки.
+
+    Для работы требуется numpy.
+    """
+
+    def __init__(self, doc_cls, records: Iterable = ()):
+        """
+        :param doc_cls: тип документа из области имен
+        :param records: словари с данными во внешнем представлении или документы типа doc_cls
+        """
+        if numpy is None:
+            raise ImportError('DocTable requires numpy')
+
+        self._doc_cls = doc_cls
+        self._kinds = {
+            field.name: COLUMN_KINDS.get(field_def_param(field.field_def, 'type'), KIND_OBJECT)
+            for field in doc_cls._fields
+        }
+        # преобразования во внешнее представление для колонок объектов, значения которых нельзя отдавать как есть
+        self._decoders = {
+            field.name: field.to_ext for field in doc_cls._fields
+            if self._kinds[field.name] == KIND_OBJECT and field.to_ext != doc_cls._cast._to_ext_raw
+        }
+        self._columns = {}
+        self._nulls = {}
+        # маски целых значений числовых колонок: int и float кастер хранит как есть, и строка отдает их так же
+        self._ints = {}
+        # часовые пояса значений колонок даты/времени (None для значений без часового пояса)
+        self._tzinfos = {}
+        self._size = 0
+
+        self.extend(records)
+
+    @property
+    def doc_cls(self):
+        return self._doc_cls
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index: int) -> 'DocTableRow':
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('DocTable index out of range')
+        return DocTableRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield DocTableRow(self, index)
+
+    def column(self, field_name: str):
+        """ Возвращает массив значений поля (для отсутствующих значений содержимое не определено) """
+        return self._columns[field_name]
+
+    def nulls(self, field_name: str):
+        """ Возвращает маску отсутствующих значений поля """
+        return self._nulls[field_name]
+
+    def extend(self, records: Iterable):
+        """
+        Добавляет записи в таблицу. Значения преобразуются по колонкам
+        """
+        records = [record.to_dict() if isinstance(record, ISchemaDoc) else record for record in records]
+        if not records:
+            if not self._columns:
+                for field in self._doc_cls._fields:
+                    self._columns[field.name], self._nulls[field.name], extra = self._cast_column(field, [])
+                    if extra is not None:
+                        self._extras(field.name)[field.name] = extra
+            return self
+
+        for field in self._doc_cls._fields:
+            column, nulls, extra = self._cast_column(field, [record.get(field.name) for record in records])
+
+            if self._size:
+                if self._kinds[field.name] == KIND_NUMBER:
+                    column = self._concat_numbers(self._columns[field.name], self._ints[field.name], column, extra)
+                else:
+                    column = numpy.concatenate((self._columns[field.name], column))
+                nulls = numpy.concatenate((self._nulls[field.name], nulls))
+                if extra is not None:
+                    extra = numpy.concatenate((self._extras(field.name)[field.name], extra))
+
+            self._columns[field.name] = column
+            self._nulls[field.name] = nulls
+            if extra is not None:
+                self._extras(field.name)[field.name] = extra
+
+        self._size += len(records)
+        return self
+
+    def _extras(self, field_name: str) -> dict:
+        """ Дополнительные массивы колонки: маски целых значений чисел или часовые пояса даты/времени """
+        return self._ints if self._kinds[field_name] == KIND_NUMBER else self._tzinfos
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Доступ к значениям
+    # ------------------------------------------------------------------------------------------------------------------
+    def value(self, index: int, field_name: str):
+        """
+        Возвращает значение поля строки так же, как его вернул бы SchemaDoc
+        """
+        if self._nulls[field_name][index]:
+            return None
+
+        value = self._columns[field_name][index]
+        kind = self._kinds[field_name]
+
+        if kind == KIND_OBJECT:
+            decoder = self._decoders.get(field_name)
+            if decoder is None:
+                return value
+            return decoder(value, field_name, self._doc_cls.schema['fields'][field_name], self._doc_cls._new())
+        elif kind == KIND_NUMBER:
+            return self._number(value, self._ints[field_name][index])
+        elif kind == KIND_DATETIME:
+            return self._datetime(value, self._tzinfos[field_name][index])
+
+        return value.item()
+
+    def ext_value(self, index: int, field_name: str):
+        """
+        Возвращает значение поля строки во внешнем представлении (как в словаре SchemaDoc.to_dict()). Даты
+        и дата/время возвращаются в расширенном формате ISO-8601, а не в той записи, в которой были переданы
+        """
+        if self._nulls[field_name][index]:
+            return None
+
+        value = self._columns[field_name][index]
+        kind = self._kinds[field_name]
+
+        if kind == KIND_DATE:
+            return date_to_iso(value.item())
+        elif kind == KIND_DATETIME:
+            return datetime_to_iso(self._datetime(value, self._tzinfos[field_name][index]))
+        elif kind == KIND_OBJECT:
+            return value
+        elif kind == KIND_NUMBER:
+            return self._number(value, self._ints[field_name][index])
+
+        return value.item()
+
+    @staticmethod
+    def _number(value, is_int):
+        if not isinstance(value, numpy.generic):
+            # колонка объектов
+            return value
+        value = value.item()
+        return int(value) if is_int else value
+
+    @staticmethod
+    def _datetime(value, tzinfo):
+        value = value.item()
+        if tzinfo is not None:
+            value = value.replace(tzinfo=datetime.timezone.utc).astimezone(tzinfo)
+        return value
+
+    def row_dict(self, index: int) -> dict:
+        return {field.name: self.ext_value(index, field.name) for field in self._doc_cls._fields}
+
+    def to_dicts(self) -> List[dict]:
+        return [self.row_dict(index) for index in range(self._size)]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Валидация
+    # ------------------------------------------------------------------------------------------------------------------
+    def failed_rows(self) -> dict:
+        """
+        Проверяет правила валидации схемы по колонкам.
+
+        Правила required и not-empty проверяются векторно, пользовательские функции валидации, правила элементов
+        списков и вложенные документы - построчно.
+
+        :return: словарь: наименование поля -> маска строк, не прошедших проверку
+        """
+        result = {}
+
+        for rule in self._doc_cls._validation_plan.rules:
+            failed = self._failed_rule_rows(rule)
+            result[rule.field_name] = result[rule.field_name] | failed if rule.field_name in result else failed
+
+        for field_name in self._doc_cls._validation_plan.nested_fields:
+            failed = numpy.fromiter((
+                not self._nulls[field_name][index] and not self.value(index, field_name).validate()
+                for index in range(self._size)
+            ), dtype=bool, count=self._size)
+            result[field_name] = result[field_name] | failed if field_name in result else failed
+
+        for field_name in self._doc_cls._validation_plan.nested_lists:
+            failed = numpy.fromiter((
+                not self._nulls[field_name][index] and not all(
+                    item is None or item.validate() for item in self.value(index, field_name)
+                )
+                for index in range(self._size)
+            ), dtype=bool, count=self._size)
+            result[field_name] = result[field_name] | failed if field_name in result else failed
+
+        return result
+
+    def valid_mask(self):
+        """ Возвращает маску строк, прошедших все проверки """
+        valid = numpy.ones(self._size, dtype=bool)
+        for failed in self.failed_rows().values():
+            valid &= ~failed
+        return valid
+
+    def _failed_rule_rows(self, rule):
+        nulls = self._nulls[rule.field_name]
+
+        if type(rule) is FieldRequiredValidation:
+            return nulls.copy()
+
+        if type(rule) is FieldNotEmptyValidation:
+            return nulls | self._empty_rows(rule.field_name, rule.field_def)
+
+        return numpy.fromiter(
+            (not rule.is_valid(DocTableRow(self, index)) for index in range(self._size)),
+            dtype=bool, count=self._size
+        )
+
+    def _empty_rows(self, field_name: str, field_def):
+        column = self._columns[field_name]
+        kind = self._kinds[field_name]
+        field_type = field_def_param(field_def, 'type')
+
+        if kind == KIND_NUMBER:
+            return (column == 0).astype(bool)
+        elif kind == KIND_DATE:
+            return column <= numpy.datetime64(ZERO_DATE, 'D')
+        elif kind == KIND_DATETIME:
+            return column <= numpy.datetime64(ZERO_DATETIME, 'us')
+        elif field_type == 'uuid':
+            return numpy.isin(column, _EMPTY_UUIDS)
+        elif kind == KIND_OBJECT and field_type in COLUMN_KINDS:
+            return ~numpy.frompyfunc(bool, 1, 1)(column).astype(bool)
+
+        # для bool/boolean и вложенных документов понятия "пустого значения" нет
+        return numpy.zeros(len(column), dtype=bool)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Преобразование колонок
+    # ------------------------------------------------------------------------------------------------------------------
+    def _cast_column(self, field, values: list):
+        nulls = numpy.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        kind = self._kinds[field.name]
+        value_types = set(map(type, values))
+
+        if kind == KIND_NUMBER:
+            if not value_types <= _NUMBER_TYPES:
+                values = self._cast_values(field, values)
+                value_types = set(map(type, values))
+            ints = numpy.fromiter((type(value) is int for value in values), dtype=bool, count=len(values))
+            return self._number_column(values, value_types), nulls, ints
+
+        elif kind == KIND_BOOL:
+            if not value_types <= _BOOL_TYPES:
+                values = self._cast_values(field, values)
+            column = numpy.array([bool(value) for value in values], dtype=bool)
+
+        elif kind == KIND_DATE:
+            lenient = self._doc_cls._lenient_dates
+            values = self._decode_values(field, values, lambda value: self._to_date(value, lenient))
+            column = numpy.array(values, dtype='datetime64[D]')
+
+        elif kind == KIND_DATETIME:
+            lenient = self._doc_cls._lenient_dates
+            values = self._decode_values(field, values, lambda value: self._to_datetime(value, lenient))
+            tzinfos = numpy.empty(len(values), dtype=object)
+            tzinfos[:] = [None if value is None else value.tzinfo for value in values]
+            column = numpy.array([None if value is None else self._to_utc(value) for value in values],
+                                 dtype='datetime64[us]')
+            return column, nulls, tzinfos
+
+        else:
+            if field_def_param(field.field_def, 'type') in ('str', 'string') and value_types <= _STRING_TYPES:
+                column = numpy.empty(len(values), dtype=object)
+                column[:] = values
+            else:
+                column = numpy.empty(len(values), dtype=object)
+                column[:] = self._cast_values(field, values)
+
+        return column, nulls, None
+
+    @staticmethod
+    def _number_column(values: list, value_types: set):
+        """
+        Колонка числовых значений: int64, если все значения целые, float64, если целые значения представимы
+        в нем точно, иначе массив объектов (например, для логических значений, которые кастер чисел пропускает)
+        """
+        if value_types <= _NUMBER_TYPES:
+            numbers = [value for value in values if type(value) is int]
+            if float not in value_types and all(_INT64_MIN <= value <= _INT64_MAX for value in numbers):
+                return numpy.array([0 if value is None else value for value in values], dtype=numpy.int64)
+            if all(-_FLOAT_INT_MAX <= value <= _FLOAT_INT_MAX for value in numbers):
+                return numpy.array([0 if value is None else value for value in values], dtype=numpy.float64)
+
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    @staticmethod
+    def _concat_numbers(column, ints, added, added_ints):
+        if column.dtype == added.dtype:
+            return numpy.concatenate((column, added))
+
+        if column.dtype != object and added.dtype != object:
+            # int64 и float64: целые переводятся во float64, если представимы в нем точно
+            int_column = column if column.dtype == numpy.int64 else added
+            if not len(int_column) or -_FLOAT_INT_MAX <= int_column.min() and int_column.max() <= _FLOAT_INT_MAX:
+                return numpy.concatenate((column.astype(numpy.float64), added.astype(numpy.float64)))
+
+        return numpy.concatenate((DocTable._number_objects(column, ints), DocTable._number_objects(added, added_ints)))
+
+    @staticmethod
+    def _number_objects(column, ints):
+        """ Массив объектов со значениями числовой колонки в том виде, в каком их отдает строка """
+        if column.dtype == object:
+            return column
+        result = numpy.empty(len(column), dtype=object)
+        result[:] = [int(value) if is_int else value for value, is_int in zip(column.tolist(), ints.tolist())]
+        return result
+
+    def _cast_values(self, field, values: list) -> list:
+        """ Поэлементное преобразование значений кастером (с проверкой типов) """
+        doc = self._doc_cls._new()
+        name, field_def, from_ext = field.name, field.field_def, field.from_ext
+        return [None if value is None else from_ext(value, name, field_def, doc) for value in values]
+
+    def _decode_values(self, field, values: list, decode) -> list:
+        try:
+            return [None if value is None else decode(value) for value in values]
+        except (TypeError, ValueError):
+            # значения с ошибкой проверяем кастером, чтобы получить SchemaDocFieldException
+            self._cast_values(field, values)
+            raise
+
+    @staticmethod
+    def _to_date(value, lenient: bool) -> datetime.date:
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        elif isinstance(value, datetime.date):
+            return value
+        return iso_to_date(value, lenient=lenient)
+
+    @staticmethod
+    def _to_datetime(value, lenient: bool) -> datetime.datetime:
+        if isinstance(value, datetime.datetime):
+            return value
+        return iso_to_datetime(value, lenient=lenient)
+
+    @staticmethod
+    def _to_utc(value: datetime.datetime) -> datetime.datetime:
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class DocTableRow(ISchemaDoc):
+    """
+    Строка таблицы DocTable. Поля читаются как у SchemaDoc, значения берутся из колонок таблицы
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: DocTable, index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def ns(self):
+        return self._table.doc_cls.ns
+
+    @property
+    def schema(self):
+        return self._table.doc_cls.schema
+
+    def __getattr__(self, item):
+        if item in self._table._kinds:
+            return self._table.value(self._index, item)
+
+        raise AttributeError('Attribute "{0}" is not defined'.format(item))
+
+    def to_dict(self) -> dict:
+        return self._table.row_dict(self._index)
+
+    def to_doc(self) -> ISchemaDoc:
+        """ Возвращает документ SchemaDoc с данными строки """
+        return self._table.doc_cls(self.to_dict())
+
+    def validate(self, raise_exception=False):
+        return self.to_doc().validate(raise_exception=raise_exception)
+
+    def failed_validations(self):
+        return self.to_doc().failed_validations()
+
+    def __str__(self):
+        return '{0}: {1}'.format(self.schema['name'], self.to_dict())
@@ -1,8 +1,8 @@
 from typing import Union, Optional
 
+import re
 import uuid
 import datetime
-import dateutil
 
 
 def field_def_param(field_def: Union[str, dict], param_name: str, default=None):
@@ -39,17 +39,92 @@ def defaulted_field_def_param(field_def: Union[str, dict], param_name: str):
 # ----------------------------------------------------------------------------------------------------------------------
 # Касты
 # ----------------------------------------------------------------------------------------------------------------------
-def iso_to_datetime(iso_datetime: str) -> datetime.datetime:
-    return dateutil.parser.parse(iso_datetime)
+_ISO_TZ = r'(Z|z|[+-]\d{2}(?::?\d{2})?)?'
 
+# Расширенный (2020-01-05T10:00:00.123+03:00) и базовый (20200105T100000.123+0300) форматы ISO-8601
+_ISO_EXTENDED_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2})(?::(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?' + _ISO_TZ + r')?'
+)
+_ISO_BASIC_RE = re.compile(
+    r'(\d{4})(\d{2})(\d{2})(?:T(\d{2})(?:(\d{2})(?:(\d{2})(?:[.,](\d+))?)?)?' + _ISO_TZ + r')?'
+)
 
-def iso_to_date(iso_date: str) -> datetime.date:
-    return iso_to_datetime(iso_date).date()
+
+def parse_iso_datetime(iso_datetime: str) -> Optional[datetime.datetime]:
+    """
+    Разбирает строку в формате ISO-8601 без использования datetime.fromisoformat (в старых версиях python
+    fromisoformat не понимает Z, смещения без двоеточия и базовый формат)
+
+    :param iso_datetime: строка с датой или датой/временем
+    :return: None, если строка не является записью в формате ISO-8601
+    """
+    match = _ISO_EXTENDED_RE.fullmatch(iso_datetime) or _ISO_BASIC_RE.fullmatch(iso_datetime)
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction, tz = match.groups()
+
+    tzinfo = None
+    if tz in ('Z', 'z'):
+        tzinfo = datetime.timezone.utc
+    elif tz:
+        offset = datetime.timedelta(hours=int(tz[1:3]), minutes=int(tz[-2:]) if len(tz) > 3 else 0)
+        tzinfo = datetime.timezone(-offset if tz[0] == '-' else offset)
+
+    return datetime.datetime(
+        int(year), int(month), int(day),
+        int(hour or 0), int(minute or 0), int(second or 0),
+        int(fraction[:6].ljust(6, '0')) if fraction else 0,
+        tzinfo=tzinfo
+    )
+
+
+def lenient_parse_datetime(value: str) -> datetime.datetime:
+    """
+    Разбирает дату/время в произвольном формате с помощью dateutil. Используется только в нестрогом режиме
+    (опция схемы lenient_dates), когда значение не является записью в формате ISO-8601
+    """
+    from dateutil import parser
+
+    try:
+        return parser.parse(value)
+    except OverflowError as e:
+        raise ValueError(str(e))
+
+
+def iso_to_datetime(iso_datetime: str, lenient: bool = False) -> datetime.datetime:
+    """
+    Преобразует строку в формате ISO-8601 в дату/время
+
+    :param iso_datetime: строка с датой/временем
+    :param lenient: если True, то строки не в формате ISO-8601 разбираются с помощью dateutil
+    :return:
+    """
+    try:
+        return datetime.datetime.fromisoformat(iso_datetime)
+    except ValueError:
+        pass
+
+    result = parse_iso_datetime(iso_datetime)
+    if result is not None:
+        return result
+
+    if lenient:
+        return lenient_parse_datetime(iso_datetime)
+
+    raise ValueError('Invalid ISO-8601 string: {0!r}'.format(iso_datetime))
+
+
+def iso_to_date(iso_date: str, lenient: bool = False) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(iso_date)
+    except ValueError:
+        return iso_to_datetime(iso_date, lenient=lenient).date()
 
 
-def safe_iso_to_date(iso_date: str) -> Optional[datetime.date]:
+def safe_iso_to_date(iso_date: str, lenient: bool = False) -> Optional[datetime.date]:
     try:
-        return iso_to_date(iso_date)
+        return iso_to_date(iso_date, lenient=lenient)
     except (TypeError, ValueError):
         return None
 
@@ -67,9 +142,9 @@ def datetime_to_iso(dt: Union[datetime.datetime, datetime.date]) -> str:
 date_to_iso = datetime_to_iso
 
 
-def safe_iso_to_datetime(iso_datetime: str) -> Optional[datetime.datetime]:
+def safe_iso_to_datetime(iso_datetime: str, lenient: bool = False) -> Optional[datetime.datetime]:
     try:
-        return iso_to_datetime(iso_datetime)
+        return iso_to_datetime(iso_datetime, lenient=lenient)
     except (TypeError, ValueError):
         return None
 
@@ -1,11 +1,27 @@
 from typing import Optional, List
 
+import asyncio
+import inspect
+
+from schema_docs.errors import (
+    ERROR_CUSTOM, ERROR_ITEM_CUSTOM, ERROR_ITEM_NOT_EMPTY, ERROR_ITEM_REQUIRED, ERROR_NOT_EMPTY, ERROR_REQUIRED,
+    render_message,
+)
 from schema_docs.utils import defaulted_field_def_param, field_def_param, zero_uuid, is_empty_date, is_empty_datetime
 
 
 from schema_docs.i import ISchemaDoc, ISchemaDocFailedValidation, ISchemaDocValidator, ISchemaDocValidationRule
 
 
+# Результат правила в кэше документа, если правило не прошло при проверке без описаний (is_valid): описание
+# несработавшей валидации формируется только при запросе описаний
+_FAILED = object()
+
+# Типы полей, значения которых можно изменить на месте (doc.tags.append(...)), не присваивая полю. Результаты
+# правил, зависящих от содержимого таких значений, не кэшируются
+MUTABLE_TYPES = ('array', 'list', 'object', 'obj')
+
+
 class SchemaDocValidator(ISchemaDocValidator):
     """ Валидатор """
 
@@ -13,28 +29,182 @@ class SchemaDocValidator(ISchemaDocValidator):
 
         result = []
 
-        validation_rules = self._collect_validation_rules(schema_doc)
-        for rule in validation_rules:
-            validation_result = rule.validate(schema_doc)
+        plan = schema_doc._validation_plan or self.compile(schema_doc.schema, schema_doc.ns.types)
+        results = self._rule_results(schema_doc, plan)
+
+        for index, check in enumerate(plan.checks):
+            validation_result = results.get(index, _FAILED)
+            if validation_result is _FAILED:
+                validation_result = check(schema_doc)
+                if plan.cacheable[index]:
+                    results[index] = validation_result
+
             if validation_result is not None:
                 result.append(validation_result)
 
-        # Если в списке полей есть вложенное значение, то валидируем его тоже
-        for field_name, field_def in schema_doc.schema['fields'].items():
-            if field_def_param(field_def, 'type') in schema_doc.ns.types:
-                nested_doc = getattr(schema_doc, field_name, None)
-                if nested_doc is not None:
-                    result.extend(self.failed_validation(nested_doc))
+        # Вложенные документы валидируем тоже (путь к полям вложенного документа дополняется путем к нему)
+        for field_name in plan.nested_fields:
+            nested_doc = getattr(schema_doc, field_name)
+            if nested_doc is not None:
+                result.extend(_nested(self.failed_validation(nested_doc), (field_name, )))
+
+        for field_name in plan.nested_lists:
+            nested_docs = getattr(schema_doc, field_name)
+            if nested_docs is not None:
+                for index, nested_doc in enumerate(nested_docs):
+                    if nested_doc is not None:
+                        result.extend(_nested(self.failed_validation(nested_doc), (field_name, index)))
+
+        return result
+
+    def is_valid(self, schema_doc: ISchemaDoc) -> bool:
+        """
+        Проверяет документ до первой несработавшей валидации, не формируя описаний несработавших валидаций
+        """
+        plan = schema_doc._validation_plan or self.compile(schema_doc.schema, schema_doc.ns.types)
+        results = self._rule_results(schema_doc, plan)
+
+        for index, is_valid in enumerate(plan.valid_checks):
+            if index in results:
+                if results[index] is not None:
+                    return False
+            elif plan.cacheable[index]:
+                if is_valid(schema_doc):
+                    results[index] = None
+                else:
+                    results[index] = _FAILED
+                    return False
+            elif not is_valid(schema_doc):
+                return False
+
+        for field_name in plan.nested_fields:
+            nested_doc = getattr(schema_doc, field_name)
+            if nested_doc is not None and not self.is_valid(nested_doc):
+                return False
+
+        for field_name in plan.nested_lists:
+            nested_docs = getattr(schema_doc, field_name)
+            if nested_docs is not None:
+                for nested_doc in nested_docs:
+                    if nested_doc is not None and not self.is_valid(nested_doc):
+                        return False
+
+        return True
+
+    async def afailed_validation(self, schema_doc: ISchemaDoc,
+                                 semaphore: Optional[asyncio.Semaphore] = None) -> List[ISchemaDocFailedValidation]:
+        """
+        Асинхронный вариант failed_validation. Асинхронные правила (функции валидации - корутины) и вложенные
+        документы проверяются конкурентно, синхронные правила - сразу, как в failed_validation. Порядок описаний
+        несработавших валидаций тот же, что у failed_validation
+
+        :param semaphore: ограничение количества одновременно выполняемых асинхронных правил (на все дерево
+            вложенных документов)
+        """
+        plan = schema_doc._validation_plan or self.compile(schema_doc.schema, schema_doc.ns.types)
+        results = self._rule_results(schema_doc, plan)
+
+        rule_results = [None] * len(plan.rules)
+        pending_indexes = []
+        pending = []
+
+        for index, rule in enumerate(plan.rules):
+            if results.get(index, _FAILED) is not _FAILED:
+                rule_results[index] = results[index]
+            elif rule.is_async:
+                pending_indexes.append(index)
+                pending.append(self._arun_rule(rule, schema_doc, semaphore))
+            else:
+                validation_result = rule_results[index] = plan.checks[index](schema_doc)
+                if plan.cacheable[index]:
+                    results[index] = validation_result
+
+        nested_paths = []
+        for field_name in plan.nested_fields:
+            nested_doc = getattr(schema_doc, field_name)
+            if nested_doc is not None:
+                nested_paths.append((field_name, ))
+                pending.append(self.afailed_validation(nested_doc, semaphore))
+
+        for field_name in plan.nested_lists:
+            nested_docs = getattr(schema_doc, field_name)
+            if nested_docs is not None:
+                for index, nested_doc in enumerate(nested_docs):
+                    if nested_doc is not None:
+                        nested_paths.append((field_name, index))
+                        pending.append(self.afailed_validation(nested_doc, semaphore))
+
+        completed = await asyncio.gather(*pending) if pending else []
+
+        for index, validation_result in zip(pending_indexes, completed):
+            rule_results[index] = validation_result
+
+        result = [validation_result for validation_result in rule_results if validation_result is not None]
+        for nested_path, nested_result in zip(nested_paths, completed[len(pending_indexes):]):
+            result.extend(_nested(nested_result, nested_path))
 
         return result
 
-    def _collect_validation_rules(self, schema_doc: ISchemaDoc):
+    async def _arun_rule(self, rule: ISchemaDocValidationRule, schema_doc: ISchemaDoc,
+                         semaphore: Optional[asyncio.Semaphore]):
+        if semaphore is None:
+            return await rule.avalidate(schema_doc)
+
+        async with semaphore:
+            return await rule.avalidate(schema_doc)
+
+    def _rule_results(self, schema_doc: ISchemaDoc, plan: 'SchemaDocValidationPlan') -> dict:
+        """
+        Возвращает кэш результатов правил документа (номер правила в плане -> описание несработавшей валидации,
+        _FAILED или None), предварительно удалив из него результаты правил по полям, измененным с прошлой валидации
         """
-        Collects validation rules for schema_doc and returns list of ISchemaDocValidationRule
+        validated = schema_doc._validated
+        if validated is None or validated[0] is not plan:
+            # документ еще не валидировался, загружен через from_dict или изменился план валидации типа
+            results = {}
+            schema_doc._validated = (plan, results)
+            schema_doc._dirty = set()
+            return results
+
+        results = validated[1]
+
+        dirty = schema_doc._dirty
+        if dirty:
+            field_rules = plan.field_rules
+            for field_name in dirty:
+                for index in field_rules.get(field_name, ()):
+                    results.pop(index, None)
+            dirty.clear()
+
+        return results
+
+    def compile(self, type_schema: dict, types: dict) -> 'SchemaDocValidationPlan':
+        """
+        Строит план валидации для типа документа. Билдер вызывает метод один раз на каждый тип при построении
+        области имен
+        """
+        rules = self._collect_validation_rules(type_schema)
+
+        nested_fields = tuple(
+            field_name for field_name, field_def in type_schema['fields'].items()
+            if field_def_param(field_def, 'type') in types
+        )
+
+        # списки вложенных документов ({'type': 'array', 'items': <тип документа>})
+        nested_lists = tuple(
+            field_name for field_name, field_def in type_schema['fields'].items()
+            if _items_def(field_def) is not None and field_def_param(_items_def(field_def), 'type') in types
+        )
+
+        return SchemaDocValidationPlan(rules=rules, nested_fields=nested_fields, nested_lists=nested_lists)
+
+    def _collect_validation_rules(self, type_schema: dict):
+        """
+        Collects validation rules for type_schema and returns list of ISchemaDocValidationRule
         """
         rules = []
 
-        for field_name, field_def in schema_doc.schema['fields'].items():
+        for field_name, field_def in type_schema['fields'].items():
             validation = defaulted_field_def_param(field_def, 'validate')
             if validation == 'required':
                 rules.append(FieldRequiredValidation(field_name=field_name, field_def=field_def))
@@ -43,23 +213,103 @@ class SchemaDocValidator(ISchemaDocValidator):
             elif callable(validation):
                 rules.append(CustomValidation(field_name=field_name, field_def=field_def))
 
+            items_def = _items_def(field_def)
+            if items_def is not None and defaulted_field_def_param(items_def, 'validate') is not None:
+                rules.append(FieldItemsValidation(field_name=field_name, field_def=field_def))
+
         return rules
 
 
+class SchemaDocValidationPlan(object):
+    """
+    Скомпилированный план валидации типа документа: проверки полей (с описанием несработавших валидаций
+    и без него), списки полей с вложенными документами и со списками вложенных документов.
+
+    Результаты правил, зависящих только от значения своего поля (cacheable), кэшируются в документе
+    до изменения поля (field_rules - номера таких правил по наименованиям полей)
+    """
+    __slots__ = ('rules', 'checks', 'valid_checks', 'nested_fields', 'nested_lists', 'cacheable', 'field_rules')
+
+    def __init__(self, rules: List[ISchemaDocValidationRule], nested_fields: tuple, nested_lists: tuple = ()):
+        self.rules = tuple(rules)
+        self.checks = tuple(rule.validate for rule in rules)
+        self.valid_checks = tuple(rule.is_valid for rule in rules)
+        self.nested_fields = nested_fields
+        self.nested_lists = nested_lists
+
+        self.cacheable = tuple(bool(rule.cacheable) for rule in rules)
+        self.field_rules = {}
+        for index, rule in enumerate(self.rules):
+            if rule.cacheable:
+                self.field_rules.setdefault(rule.field_name, []).append(index)
+
+    def __reduce__(self):
+        # функции проверок восстанавливаются из правил
+        return SchemaDocValidationPlan, (list(self.rules), self.nested_fields, self.nested_lists)
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Описание несработавшей валидации
 # ----------------------------------------------------------------------------------------------------------------------
 class SchemaDocFailedValidation(ISchemaDocFailedValidation):
     """
-
+    Описание несработавшей валидации: код ошибки (см. schema_docs.errors), путь к полю (с учетом вложенных
+    документов и элементов списков) и проверенное значение. Текст описания формируется при первом обращении
+    к msg, в нем указывается путь к полю внутри документа, которому принадлежит правило
     """
-    def __init__(self, msg: str):
+
+    def __init__(self, msg: Optional[str] = None, code: str = ERROR_CUSTOM, path: tuple = (), value=None,
+                 detail: Optional[str] = None):
+        """
+        :param msg: готовое описание (если не указано, формируется по коду)
+        :param detail: описание, которое вернула функция валидации
+        """
         self._msg = msg
+        self.code = code
+        self.path = path
+        self.value = value
+        self.detail = detail
+        # количество элементов пути к вложенному документу в начале path (в описание не попадают)
+        self._nested_len = 0
+        # описания с путями вложенного документа по путям (см. nested)
+        self._nested = None
 
     @property
     def msg(self) -> str:
+        if self._msg is None:
+            self._msg = render_message(
+                self.code, self.path[self._nested_len:] if self._nested_len else self.path, self.value, self.detail
+            )
         return self._msg
 
+    def nested(self, prefix: tuple) -> 'SchemaDocFailedValidation':
+        """
+        Возвращает описание с путем, дополненным путем prefix к вложенному документу. Исходное описание может
+        находиться в кэше результатов правил документа (см. SchemaDocValidator._rule_results), поэтому оно
+        не изменяется, а описание с путем запоминается в нем для повторных валидаций
+        """
+        if self._nested is None:
+            self._nested = {}
+
+        result = self._nested.get(prefix)
+        if result is None:
+            result = self._nested[prefix] = SchemaDocFailedValidation(
+                self._msg, self.code, prefix + self.path, self.value, self.detail
+            )
+            result._nested_len = self._nested_len + len(prefix)
+        return result
+
+
+def _nested(failed_validations: List[SchemaDocFailedValidation], prefix: tuple) -> List[SchemaDocFailedValidation]:
+    return [failed_validation.nested(prefix) for failed_validation in failed_validations]
+
+
+def field_exception_failed_validation(error) -> SchemaDocFailedValidation:
+    """ Возвращает описание несработавшей валидации по ошибке преобразования значения (SchemaDocFieldException) """
+    return SchemaDocFailedValidation(
+        code=error.code, path=error.path, value=error.failed_value, detail=error.field_type
+    )
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Правила валидации
@@ -75,6 +325,10 @@ class FieldBasedSchemaDocValidationRule(ISchemaDocValidationRule):
     def field_def(self) -> dict:
         return self._field_def
 
+    def __reduce__(self):
+        # производные атрибуты правила вычисляются заново в конструкторе
+        return type(self), (self._field_name, self._field_def)
+
     @property
     def field_name(self) -> str:
         return self._field_name
@@ -84,60 +338,227 @@ class FieldRequiredValidation(FieldBasedSchemaDocValidationRule):
     """
     Правило валидации на то, что значение поля должно быть указано (любое значение, отличное от None)
     """
+    cacheable = True
 
     def validate(self, doc: ISchemaDoc) -> Optional[ISchemaDocFailedValidation]:
 
         result = None
         if getattr(doc, self.field_name, None) is None:
-            failed_msg = 'Не указано обязательное значение поля {0}'.format(self.field_name)
-            result = SchemaDocFailedValidation(msg=failed_msg)
+            result = required_failed_validation(self.field_name)
 
         return result
 
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        return getattr(doc, self.field_name, None) is not None
+
+
+def required_failed_validation(field_name: str) -> ISchemaDocFailedValidation:
+    return SchemaDocFailedValidation(code=ERROR_REQUIRED, path=(field_name, ))
+
+
+def _is_falsy(value) -> bool:
+    return not value
+
+
+def _is_zero_uuid(value) -> bool:
+    return value == zero_uuid()
+
+
+def _is_never_empty(value) -> bool:
+    return False
+
+
+# Проверки на "пустое" значение по типам полей.
+# Для bool/boolean не существует понятия "пустого значения" (только True и False)
+EMPTY_CHECKS = {
+    'str': _is_falsy,
+    'string': _is_falsy,
+    'number': _is_falsy,
+    'num': _is_falsy,
+    'int': _is_falsy,
+    'array': _is_falsy,
+    'list': _is_falsy,
+    'object': _is_falsy,
+    'obj': _is_falsy,
+    'date': is_empty_date,
+    'datetime': is_empty_datetime,
+    'uuid': _is_zero_uuid,
+}
+
 
 class FieldNotEmptyValidation(FieldBasedSchemaDocValidationRule):
     """
     Валидатор на то, что значение указано непустое (т.е., не None и не одно из значений, которые интепретируются
     системой как пустое)
     """
+
+    def __init__(self, field_name: str, field_def: dict):
+        super(FieldNotEmptyValidation, self).__init__(field_name, field_def)
+
+        # проверка на "пустое" значение определяется по типу поля один раз
+        self._is_empty = EMPTY_CHECKS.get(defaulted_field_def_param(field_def, 'type'), _is_never_empty)
+        # пустота списка или объекта меняется и без присваивания полю
+        self.cacheable = defaulted_field_def_param(field_def, 'type') not in MUTABLE_TYPES
+
     def validate(self, doc: ISchemaDoc):
 
         # Сначала проверяем на то, что хотя бы какое-то значение было указано
-        result = FieldRequiredValidation(field_name=self.field_name, field_def=self.field_def).validate(doc)
-        if result:
-            return result
-
-        # Какое-то значение в поле указано, проверяем, что оно не соответствует "пустому" значению
-        field_type = defaulted_field_def_param(self.field_def, 'type')
         field_value = getattr(doc, self.field_name, None)
-        failed_msg = 'В поле {0} должно быть указано непустое значение'.format(self.field_name)
+        if field_value is None:
+            return required_failed_validation(self.field_name)
 
-        if field_type in ('str', 'string', 'number', 'int', 'array', 'list', 'object', 'obj'):
-            result = SchemaDocFailedValidation(msg=failed_msg) if not field_value else None
-        elif field_type == 'date':
-            result = SchemaDocFailedValidation(msg=failed_msg) if is_empty_date(field_value) else None
-        elif field_type == 'datetime':
-            result = SchemaDocFailedValidation(msg=failed_msg) if is_empty_datetime(field_value) else None
-        elif field_type == 'uuid':
-            result = SchemaDocFailedValidation(msg=failed_msg) if field_value == zero_uuid() else None
+        # Какое-то значение в поле указано, проверяем, что оно не соответствует "пустому" значению
+        if self._is_empty(field_value):
+            return SchemaDocFailedValidation(code=ERROR_NOT_EMPTY, path=(self.field_name, ), value=field_value)
 
-        # для bool/boolean не существует понятия "пустого значения" (только True и False)
+        return None
 
-        return result
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        field_value = getattr(doc, self.field_name, None)
+        return field_value is not None and not self._is_empty(field_value)
 
 
 class CustomValidation(FieldBasedSchemaDocValidationRule):
+    """
+    Правило с функцией валидации validate(value, doc), возвращающей строку с описанием ошибки. Функция может быть
+    корутиной (async def): при асинхронной валидации (SchemaDoc.avalidate) такие функции выполняются конкурентно,
+    при синхронной - в отдельном цикле событий
+    """
+
+    def __init__(self, field_name: str, field_def: dict):
+        super(CustomValidation, self).__init__(field_name, field_def)
+
+        self._validate_cb = field_def_param(field_def, 'validate')
+        self.is_async = inspect.iscoroutinefunction(self._validate_cb)
 
     def validate(self, doc: ISchemaDoc):
         """ Выполняем функцию валидации """
-        result = None
+        value = getattr(doc, self.field_name, None)
+        return self._failed_validation(value, self._call(value, doc))
 
-        validate_cb = field_def_param(self.field_def, 'validate')
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        return not isinstance(self._call(getattr(doc, self.field_name, None), doc), str)
 
-        if callable(validate_cb):
-            field_value = getattr(doc, self.field_name, None)
-            validate_cb_result = validate_cb(field_value, doc)
+    async def avalidate(self, doc: ISchemaDoc):
+        value = getattr(doc, self.field_name, None)
+        validate_cb_result = self._validate_cb(value, doc)
+        if inspect.isawaitable(validate_cb_result):
+            validate_cb_result = await validate_cb_result
 
-            result = SchemaDocFailedValidation(msg=validate_cb_result) if isinstance(validate_cb_result, str) else None
+        return self._failed_validation(value, validate_cb_result)
 
-        return result
+    def _call(self, value, doc: ISchemaDoc):
+        result = self._validate_cb(value, doc)
+        return run_awaitable(result) if inspect.isawaitable(result) else result
+
+    def _failed_validation(self, value, validate_cb_result) -> Optional[ISchemaDocFailedValidation]:
+        if not isinstance(validate_cb_result, str):
+            return None
+        return SchemaDocFailedValidation(
+            code=ERROR_CUSTOM, path=(self.field_name, ), value=value, detail=validate_cb_result
+        )
+
+
+def run_awaitable(awaitable):
+    """
+    Выполняет корутину асинхронной функции валидации при синхронной валидации документа. Внутри работающего цикла
+    событий это невозможно без блокировки цикла, поэтому там нужно использовать avalidate()
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(awaitable))
+
+    if inspect.iscoroutine(awaitable):
+        awaitable.close()
+    raise RuntimeError('Document has async validators; use "await doc.avalidate()" inside a running event loop')
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _items_def(field_def):
+    """ Возвращает описание элементов типизированного списка или None для полей других типов """
+    if field_def_param(field_def, 'type') in ('array', 'list'):
+        return field_def_param(field_def, 'items')
+    return None
+
+
+class FieldItemsValidation(FieldBasedSchemaDocValidationRule):
+    """
+    Правило валидации элементов типизированного списка ({'type': 'array', 'items': {'type': ..., 'validate': ...}}).
+    Правило из описания элемента (required, not-empty или функция) проверяется для всех элементов списка за один
+    проход, в описание несработавшей валидации попадает первый некорректный элемент
+    """
+
+    def __init__(self, field_name: str, field_def: dict):
+        super(FieldItemsValidation, self).__init__(field_name, field_def)
+
+        items_def = field_def_param(field_def, 'items')
+        self._items_def = items_def
+        self._validation = field_def_param(items_def, 'validate')
+        self._is_empty = EMPTY_CHECKS.get(field_def_param(items_def, 'type'), _is_never_empty)
+        self.is_async = inspect.iscoroutinefunction(self._validation)
+
+    def validate(self, doc: ISchemaDoc):
+        items = getattr(doc, self.field_name, None)
+        if not items:
+            return None
+
+        for index, item in enumerate(items):
+            failed = self._failed_item(item, doc)
+            if failed is not None:
+                return self._failed_validation(index, item, failed)
+
+        return None
+
+    async def avalidate(self, doc: ISchemaDoc):
+        items = getattr(doc, self.field_name, None)
+        if not items or not callable(self._validation):
+            return self.validate(doc)
+
+        for index, item in enumerate(items):
+            result = self._validation(item, doc)
+            if inspect.isawaitable(result):
+                result = await result
+            if isinstance(result, str):
+                return self._failed_validation(index, item, (ERROR_ITEM_CUSTOM, result))
+
+        return None
+
+    def is_valid(self, doc: ISchemaDoc) -> bool:
+        items = getattr(doc, self.field_name, None)
+        if not items:
+            return True
+
+        validation = self._validation
+        if validation == 'required':
+            return None not in items
+        elif validation == 'not-empty':
+            is_empty = self._is_empty
+            return not any(item is None or is_empty(item) for item in items)
+
+        return all(self._failed_item(item, doc) is None for item in items)
+
+    def _failed_item(self, item, doc: ISchemaDoc) -> Optional[tuple]:
+        """ Возвращает код ошибки и описание от функции валидации для некорректного элемента (None для корректного) """
+        validation = self._validation
+
+        if validation == 'required' or validation == 'not-empty':
+            if item is None:
+                return ERROR_ITEM_REQUIRED, None
+            if validation == 'not-empty' and self._is_empty(item):
+                return ERROR_ITEM_NOT_EMPTY, None
+
+        elif callable(validation):
+            result = validation(item, doc)
+            if inspect.isawaitable(result):
+                result = run_awaitable(result)
+            if isinstance(result, str):
+                return ERROR_ITEM_CUSTOM, result
+
+        return None
+
+    def _failed_validation(self, index: int, item, failed: tuple) -> ISchemaDocFailedValidation:
+        return SchemaDocFailedValidation(code=failed[0], path=(self.field_name, index), value=item, detail=failed[1])
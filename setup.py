@@ -10,8 +10,11 @@ setup(
     author_email='akvarats@gmail.com',
     url='https://github.com/akvarats/schema_docs',
     license="",
-    packages=find_packages(exclude=('tests', 'docs')),
+    packages=find_packages(exclude=('tests', 'docs', 'benchmarks')),
     install_requires=[
         "python-dateutil"
-    ]
+    ],
+    extras_require={
+        "table": ["numpy"]
+    }
 )
@@ -0,0 +1,99 @@
+import datetime
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.array import SchemaDocList
+from schema_docs.exceptions import SchemaDocFieldException
+
+
+class TestTypedArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Line',
+            'fields': {
+                'code': {'type': 'string', 'validate': 'required'},
+                'qty': 'number',
+            }
+        }, {
+            'name': 'Document',
+            'fields': {
+                'ids': {'type': 'array', 'items': 'uuid'},
+                'dates': {'type': 'list', 'items': 'date'},
+                'names': {'type': 'array', 'items': {'type': 'string', 'validate': 'not-empty'}},
+                'lines': {'type': 'array', 'items': 'Line'},
+                'raw': 'array',
+            }
+        }])
+
+    def test_cast_and_read(self):
+        uid = uuid.uuid4()
+        doc = self.ns.Document(
+            ids=[uid, uid.hex, None], dates=['2020-01-05', datetime.date(2020, 1, 6)], names=['a', 'b'],
+            lines=[{'code': 'a', 'qty': '1'.isdigit() and 1}, self.ns.Line(code='b')]
+        )
+
+        self.assertEqual(doc.to_dict()['ids'], [uid.hex, uid.hex, None])
+        self.assertEqual(doc.to_dict()['dates'], ['2020-01-05', '2020-01-06'])
+        self.assertEqual(doc.to_dict()['lines'], [{'code': 'a', 'qty': 1}, {'code': 'b'}])
+
+        self.assertIsInstance(doc.ids, SchemaDocList)
+        self.assertEqual(doc.ids, [uid, uid, None])
+        self.assertEqual(doc.ids[-1:], [None])
+        self.assertEqual(len(doc.dates), 2)
+        self.assertEqual(doc.dates[1], datetime.date(2020, 1, 6))
+        # элементы простых типов не преобразуются, поэтому список отдается как есть
+        self.assertIs(doc.names, doc.to_dict()['names'])
+
+        # вложенные документы создаются над словарями списка
+        self.assertIsInstance(doc.lines[0], self.ns.Line)
+        self.assertIs(doc.lines[0], doc.lines[0])
+        doc.lines[1].qty = 5
+        self.assertEqual(doc.to_dict()['lines'][1], {'code': 'b', 'qty': 5})
+
+    def test_batch_check_keeps_list(self):
+        ids = [uuid.uuid4().hex for _ in range(10)]
+        doc = self.ns.Document(ids=ids)
+
+        self.assertIs(doc.to_dict()['ids'], ids)
+        self.assertIs(self.ns.Document.cast_dict({'ids': ids})['ids'], ids)
+
+    def test_item_errors(self):
+        with self.assertRaises(SchemaDocFieldException) as cm:
+            self.ns.Document(ids=[uuid.uuid4(), 'abc'])
+        self.assertEqual(cm.exception.field_name, 'ids[1]')
+        self.assertEqual(cm.exception.failed_value, 'abc')
+
+        # проверка списка целиком и поэлементное преобразование принимают одни и те же значения
+        with self.assertRaises(SchemaDocFieldException):
+            self.ns.Document(ids=[uuid.uuid4().hex + '\n'])
+        with self.assertRaises(SchemaDocFieldException):
+            self.ns.Document(ids=[str(uuid.uuid4()) + '\n'])
+
+        with self.assertRaises(SchemaDocFieldException) as cm:
+            self.ns.Document(lines=[{'code': 'a'}, {'code': 1}])
+        self.assertEqual(cm.exception.field_name, 'lines[1].code')
+
+        with self.assertRaises(SchemaDocFieldException) as cm:
+            self.ns.Document(dates='2020-01-05')
+        self.assertEqual(cm.exception.field_name, 'dates')
+
+        batch = self.ns.Document.from_records([{'names': ['a']}, {'names': ['a', 2]}])
+        self.assertEqual(batch.errors[1][0].field_name, 'names[1]')
+
+    def test_validation(self):
+        doc = self.ns.Document(names=['a', ''], lines=[{'code': 'a'}, {'qty': 1}])
+
+        self.assertFalse(doc.validate())
+        self.assertEqual(
+            [fv.msg for fv in doc.failed_validations()],
+            [
+                'names[1]: Должно быть указано непустое значение элемента',
+                'Не указано обязательное значение поля code',
+            ]
+        )
+
+        doc = self.ns.Document(names=['a'], lines=[{'code': 'a'}, None], raw=[1, 'a'])
+        self.assertTrue(doc.validate())
+        self.assertEqual(doc.failed_validations(), [])
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import InvalidSchemaDocException
+
+
+class TestAsyncValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+
+        async def lookup(value, doc):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                self.running -= 1
+            return None if value else 'Unknown reference'
+
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'required'},
+                'a': {'type': 'string', 'validate': lookup},
+                'b': {'type': 'string', 'validate': lookup},
+                'c': {'type': 'string', 'validate': lambda value, doc: None if value else 'c is empty'},
+                'line': 'Line',
+            }
+        }, {
+            'name': 'Line',
+            'fields': {
+                'ref': {'type': 'string', 'validate': lookup},
+            }
+        }])
+
+    def test_concurrent(self):
+        doc = self.ns.Document(name='x', a='a', b='', c='c', line={'ref': ''})
+
+        failed_validations = asyncio.run(doc.afailed_validations())
+
+        self.assertEqual([fv.msg for fv in failed_validations], ['Unknown reference', 'Unknown reference'])
+        self.assertEqual(self.max_running, 3)
+
+        self.assertFalse(asyncio.run(doc.avalidate()))
+        with self.assertRaises(InvalidSchemaDocException):
+            asyncio.run(doc.avalidate(raise_exception=True))
+
+        doc.b = 'b'
+        doc.line.ref = 'r'
+        self.assertTrue(asyncio.run(doc.avalidate()))
+
+    def test_max_concurrency(self):
+        doc = self.ns.Document(name='x', a='a', b='b', c='c', line={'ref': 'r'})
+
+        self.assertTrue(asyncio.run(doc.avalidate(max_concurrency=1)))
+        self.assertEqual(self.max_running, 1)
+
+    def test_sync_validation(self):
+        doc = self.ns.Document(a='a', b='', c='', line={'ref': 'r'})
+
+        self.assertFalse(doc.validate())
+        self.assertEqual(len(doc.failed_validations()), 3)
+
+        async def validate_in_loop():
+            return doc.validate(raise_exception=True)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(validate_in_loop())
+
+    def test_async_items_validator(self):
+        async def known(item, doc):
+            await asyncio.sleep(0)
+            return None if item in ('a', 'b') else 'Unknown item {0}'.format(item)
+
+        ns = build_schemadoc_namespace({
+            'name': 'Document',
+            'fields': {'items': {'type': 'array', 'items': {'type': 'string', 'validate': known}}},
+        })
+        doc = ns.Document(items=['a', 'x', 'y'])
+
+        failed_validations = asyncio.run(doc.afailed_validations())
+        self.assertEqual([(fv.path, fv.msg) for fv in failed_validations], [(('items', 1), 'items[1]: Unknown item x')])
+        self.assertFalse(asyncio.run(doc.avalidate()))
+
+        doc.items = ['a', 'b']
+        self.assertTrue(asyncio.run(doc.avalidate()))
+        # синхронная валидация вне цикла событий выполняет корутины сама
+        self.assertTrue(doc.validate())
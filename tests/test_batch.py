@@ -0,0 +1,56 @@
+import unittest
+import datetime
+
+from schema_docs import build_schemadoc_namespace
+
+
+class TestFromRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Line',
+            'fields': {
+                'code': 'string',
+                'qty': 'number'
+            }
+        }, {
+            'name': 'Document',
+            'fields': {
+                'name': 'string',
+                'date': 'date',
+                'amount': 'number',
+                'line': 'Line'
+            }
+        }])
+
+    def test_records(self):
+        records = ({
+            'name': 'doc{0}'.format(i),
+            'date': datetime.date(2020, 1, i + 1),
+            'amount': i,
+            'line': {'code': 'x', 'qty': i}
+        } for i in range(3))
+
+        batch = self.ns.Document.from_records(records)
+
+        self.assertEqual(batch.errors, {})
+        self.assertEqual(len(batch.docs), 3)
+        self.assertEqual(batch.docs[2].to_dict(), {
+            'name': 'doc2', 'date': '2020-01-03', 'amount': 2, 'line': {'code': 'x', 'qty': 2}
+        })
+        self.assertEqual(batch.docs[1].date, datetime.date(2020, 1, 2))
+        self.assertEqual(batch.docs[1].line.qty, 1)
+
+    def test_errors_per_row(self):
+        batch = self.ns.Document.from_records([
+            {'name': 'ok', 'amount': 1},
+            {'name': 1, 'amount': 'x', 'unknown': 1},
+            {'line': {'qty': 'y'}},
+            {'amount': None},
+        ])
+
+        self.assertEqual(sorted(batch.errors), [1, 2])
+        self.assertEqual([e.field_name for e in batch.errors[1]], ['name', 'amount'])
+        self.assertEqual(batch.errors[2][0].field_name, 'line.qty')
+        self.assertIsNone(batch.docs[1])
+        self.assertEqual([doc.to_dict() for doc in batch.valid_docs], [{'name': 'ok', 'amount': 1}, {'amount': None}])
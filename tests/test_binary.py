@@ -0,0 +1,91 @@
+import datetime
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocBinaryException
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': 'string',
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': 'string',
+        'uid': 'uuid',
+        'date': 'date',
+        'created': 'datetime',
+        'amount': 'number',
+        'active': 'bool',
+        'line': 'Line',
+        'lines': {'type': 'array', 'items': 'Line'},
+        'ids': {'type': 'array', 'items': 'uuid'},
+        'extra': 'object',
+        'tags': 'array',
+    }
+}]
+
+
+class TestBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace(SCHEMA)
+
+    def make_doc(self, ns):
+        doc = ns.Document(
+            name='документ', uid=uuid.uuid4(), date=datetime.date(2020, 1, 5),
+            created=datetime.datetime(2020, 1, 5, 10, 20, 30, 5), amount=-3.5, active=False,
+            line={'code': 'x', 'qty': 10 ** 30}, lines=[None, {'code': 'y', 'qty': -1}],
+            ids=[str(uuid.uuid4()), None, uuid.uuid4()], extra={'a': [1, None, True, 's', {'b': 2.5}]}, tags=[],
+        )
+        doc.created = None
+        return doc
+
+    def test_round_trip(self):
+        for ns in (self.ns, build_schemadoc_namespace(SCHEMA, compact=True)):
+            doc = self.make_doc(ns)
+            data = doc.to_bytes()
+
+            self.assertIsInstance(data, bytes)
+            self.assertLess(len(data), len(doc.to_json()) / 2)
+
+            decoded = ns.Document.from_bytes(memoryview(data))
+            self.assertEqual(decoded.to_dict(), doc.to_dict())
+            self.assertEqual(decoded.uid, doc.uid)
+            self.assertEqual(decoded.lines[1].qty, -1)
+
+            self.assertEqual(ns.Document.from_bytes(ns.Document().to_bytes()).to_dict(), {})
+
+    def test_non_canonical_strings(self):
+        # строки, для которых нет упакованного представления, сохраняются как есть
+        doc = self.ns.Document(
+            date='20200105', created='2020-01-05T10:00:00+03:00', uid='8f5a7a8e-2c1b-4d6e-9f0a-1b2c3d4e5f60'
+        )
+        decoded = self.ns.Document.from_bytes(doc.to_bytes())
+
+        self.assertEqual(decoded.to_dict(), doc.to_dict())
+        self.assertEqual(decoded.date, datetime.date(2020, 1, 5))
+
+    def test_many(self):
+        docs = [self.make_doc(self.ns) for _ in range(3)] + [self.ns.Document()]
+        data = self.ns.Document.encode_many(docs)
+
+        decoded = self.ns.Document.decode_many(memoryview(bytearray(data)))
+        self.assertEqual([doc.to_dict() for doc in decoded], [doc.to_dict() for doc in docs])
+        self.assertEqual(self.ns.Document.decode_many(self.ns.Document.encode_many([])), [])
+
+    def test_errors(self):
+        doc = self.ns.Document(name='a')
+        doc.to_dict()['amount'] = 'abc'
+        with self.assertRaises(SchemaDocBinaryException):
+            doc.to_bytes()
+
+        data = self.make_doc(self.ns).to_bytes()
+        with self.assertRaises(SchemaDocBinaryException):
+            self.ns.Document.from_bytes(data[:-3])
+        with self.assertRaises(SchemaDocBinaryException):
+            self.ns.Document.from_bytes(data + b'\x00')
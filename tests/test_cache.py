@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.cache import SchemaDocNamespaceCache, schema_hash
+
+
+def check_code(value, doc):
+    return None if value else 'code is empty'
+
+
+def schema(validate='required'):
+    return [{
+        'name': 'Document',
+        'fields': {
+            'code': {'type': 'string', 'validate': validate},
+            'line': 'Line',
+        }
+    }, {
+        'name': 'Line',
+        'fields': {'qty': 'number'}
+    }]
+
+
+class TestNamespaceCache(unittest.TestCase):
+
+    def test_memoized_build(self):
+        ns = build_schemadoc_namespace(schema())
+
+        self.assertIs(build_schemadoc_namespace(schema()), ns)
+        self.assertIsNot(build_schemadoc_namespace(schema('not-empty')), ns)
+        self.assertIsNot(build_schemadoc_namespace(schema(), memoize=False), ns)
+
+    def test_schema_mutated_after_build(self):
+        cache = SchemaDocNamespaceCache()
+        mutable_schema = schema()
+        ns = cache.get(mutable_schema)
+
+        mutable_schema[0]['fields']['code']['validate'] = 'not-empty'
+        mutable_schema[0]['fields']['name'] = 'string'
+
+        self.assertEqual(ns.Document.schema, schema()[0])
+        self.assertIs(cache.get(schema()), ns)
+
+        other = cache.get(mutable_schema)
+        self.assertIsNot(other, ns)
+        self.assertIn('name', other.Document.schema['fields'])
+
+    def test_hash_policy_for_callables(self):
+        self.assertEqual(schema_hash(schema(check_code)), schema_hash(schema(check_code)))
+        validate, other_validate = lambda v, d: None, lambda v, d: None
+        self.assertEqual(schema_hash(schema(validate)), schema_hash(schema(validate)))
+        self.assertNotEqual(schema_hash(schema(validate)), schema_hash(schema(other_validate)))
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            SchemaDocNamespaceCache(directory=tmp).get(schema(check_code))
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+            # новый кэш (как в новом процессе) загружает скомпилированную схему с диска без компиляции
+            cache = SchemaDocNamespaceCache(directory=tmp)
+            cache._builder.compile = None
+            ns = cache.get(schema(check_code))
+
+            doc = ns.Document(line={'qty': 1})
+            self.assertEqual(doc.line.qty, 1)
+            self.assertEqual([fv.msg for fv in doc.failed_validations()], ['code is empty'])
+
+            # схемы с lambda-функциями на диск не сохраняются
+            SchemaDocNamespaceCache(directory=tmp).get(schema(lambda v, d: None))
+            self.assertEqual(len(os.listdir(tmp)), 1)
@@ -65,3 +65,25 @@ class TestCasts(unittest.TestCase):
         except SchemaDocFieldException as e:
             # всё ок, должно прийти такое сообщение
             pass
+
+    def test_soft_numbers_per_instance(self):
+        schema = [{
+            "name": "Document",
+            "fields": {
+                "x": "number"
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+
+        soft_doc = ns.Document().setup(soft_numbers=True)
+        doc = ns.Document()
+
+        # кастер общий для всех документов типа, но опция soft_numbers действует только на soft_doc
+        self.assertIs(soft_doc._cast, doc._cast)
+
+        soft_doc.x = "1.5"
+        self.assertEqual(soft_doc.x, 1.5)
+
+        with self.assertRaises(SchemaDocFieldException):
+            doc.x = "1.5"
@@ -0,0 +1,169 @@
+import datetime
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+import uuid
+from contextlib import redirect_stdout
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.codegen import GeneratedSchemaDoc, generate_module, write_module
+from schema_docs.codegen.cli import main
+from schema_docs.collection import SchemaDocCollection
+from schema_docs.diff import apply_patch, diff
+from schema_docs.exceptions import InvalidSchemaDocException, SchemaDocFieldException
+
+
+def positive(value, doc):
+    if value is not None and value <= 0:
+        return 'Количество должно быть положительным'
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'required'},
+        'qty': {'type': 'number', 'validate': positive},
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'title': {'type': 'string', 'validate': 'not-empty'},
+        'uid': {'type': 'uuid', 'validate': 'not-empty'},
+        'date': 'date',
+        'created': 'datetime',
+        'amount': 'number',
+        'active': 'boolean',
+        'line': 'Line',
+        'lines': {'type': 'array', 'items': 'Line'},
+        'tags': {'type': 'array', 'items': {'type': 'string', 'validate': 'not-empty'}},
+        'external-id': 'string',
+        'class': 'string',
+    }
+}]
+
+
+def load_module(path, name='generated_docs'):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestCodegen(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        path = os.path.join(self.tmp.name, 'generated_docs.py')
+        write_module(SCHEMA, path)
+        self.module = load_module(path)
+        self.ns = self.module.ns
+
+    def test_layout(self):
+        doc = self.module.Document(name='a')
+
+        self.assertIsInstance(doc, GeneratedSchemaDoc)
+        self.assertFalse(hasattr(doc, '__dict__'))
+        self.assertIs(self.ns.Document, self.module.Document)
+        self.assertIs(self.ns.types['Line'], self.module.Line)
+        self.assertEqual([field.name for field in self.ns.Document._fields], list(SCHEMA[1]['fields']))
+
+    def test_same_behaviour_as_namespace_docs(self):
+        uid = uuid.uuid4()
+        data = {
+            'name': 'a', 'title': 't', 'uid': uid, 'date': datetime.date(2020, 1, 5),
+            'created': '2020-01-05T10:00:00', 'amount': 1.5, 'active': 'true',
+            'line': {'code': 'x', 'qty': 1}, 'lines': [{'code': 'y'}, None], 'tags': ['a'],
+            'external-id': 'e', 'class': 'c',
+        }
+
+        for ns in (build_schemadoc_namespace(SCHEMA), self.ns):
+            doc = ns.Document(**data)
+
+            self.assertEqual(doc.to_dict(), {
+                'name': 'a', 'title': 't', 'uid': uid.hex, 'date': '2020-01-05', 'created': '2020-01-05T10:00:00',
+                'amount': 1.5, 'active': True, 'line': {'code': 'x', 'qty': 1}, 'lines': [{'code': 'y'}, None],
+                'tags': ['a'], 'external-id': 'e', 'class': 'c',
+            })
+            self.assertEqual(doc.to_dict(), ns.Document.cast_dict(data))
+            self.assertEqual(doc.uid, uid)
+            self.assertEqual(doc.date, datetime.date(2020, 1, 5))
+            self.assertEqual(doc.created, datetime.datetime(2020, 1, 5, 10))
+            self.assertEqual(getattr(doc, 'external-id'), 'e')
+            self.assertEqual(getattr(doc, 'class'), 'c')
+
+            # изменения во вложенных документах видны в документе-владельце
+            doc.line.qty = 5
+            doc.lines[0].qty = 3
+            self.assertEqual(doc.to_dict()['line'], {'code': 'x', 'qty': 5})
+            self.assertEqual(doc.to_dict()['lines'][0], {'code': 'y', 'qty': 3})
+
+            self.assertTrue(doc.validate())
+            doc.line = {'qty': -1}
+            doc.title = ''
+            self.assertFalse(doc.validate())
+            self.assertEqual([fv.msg for fv in doc.failed_validations()], [
+                'В поле title должно быть указано непустое значение',
+                'Не указано обязательное значение поля code',
+                'Количество должно быть положительным',
+            ])
+            with self.assertRaises(InvalidSchemaDocException):
+                doc.validate(raise_exception=True)
+
+            doc.from_dict({'name': 'b', 'uid': uid.hex, 'title': 't', 'lines': [{'qty': 1}]})
+            self.assertIsNone(doc.line)
+            self.assertFalse(doc.validate())
+            doc.lines[0].code = 'z'
+            self.assertTrue(doc.validate())
+
+            with self.assertRaises(SchemaDocFieldException):
+                doc.amount = '10'
+            with self.assertRaises(SchemaDocFieldException):
+                doc.name = 1
+            doc.setup(soft_numbers=True)
+            doc.amount = '10'
+            self.assertEqual(doc.amount, 10)
+
+    def test_shared_features(self):
+        docs = [self.ns.Document(name=str(i), uid=uuid.UUID(int=i), amount=i) for i in range(1, 4)]
+
+        self.assertEqual(self.ns.Document.decode_many(self.ns.Document.encode_many(docs))[1].to_dict(),
+                         docs[1].to_dict())
+        self.assertEqual(self.ns.Document.dumps_many(docs), build_schemadoc_namespace(SCHEMA).Document.dumps_many(
+            [doc.to_dict() for doc in docs]
+        ))
+
+        patch = diff(docs[0], docs[1])
+        apply_patch(docs[0], patch)
+        self.assertEqual(docs[0].to_dict(), docs[1].to_dict())
+
+        collection = SchemaDocCollection(self.ns.Document, docs, hash_index=['uid'], sorted_index=['amount'])
+        docs[2].amount = 0
+        self.assertEqual([doc.name for doc in collection.range('amount', stop=2)], ['3', '2', '2'])
+        self.assertIs(collection.find_one('uid', uuid.UUID(int=3)), docs[2])
+
+        batch = self.ns.Document.from_records([{'name': 'a', 'amount': 1}, {'name': 'b', 'amount': 'x'}])
+        self.assertEqual(batch.valid_docs[0].to_dict(), {'name': 'a', 'amount': 1})
+        self.assertEqual(list(batch.errors), [1])
+
+    def test_not_importable_function(self):
+        schema = {'name': 'Doc', 'fields': {'qty': {'type': 'number', 'validate': lambda value, doc: None}}}
+
+        with self.assertRaises(ValueError):
+            generate_module(schema)
+
+    def test_cli(self):
+        output = os.path.join(self.tmp.name, 'cli_docs.py')
+        self.assertEqual(main(['tests.test_codegen:SCHEMA', '-o', output]), 0)
+
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual(f.read(), generate_module(SCHEMA, source='tests.test_codegen:SCHEMA'))
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            main(['tests.test_codegen:SCHEMA'])
+        self.assertIn('class Document(GeneratedSchemaDoc):', stdout.getvalue())
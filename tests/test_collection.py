@@ -0,0 +1,113 @@
+import datetime
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.collection import SchemaDocCollection
+from schema_docs.diff import apply_patch
+
+
+SCHEMA = {
+    'name': 'Document',
+    'fields': {
+        'uid': 'uuid',
+        'date': 'date',
+        'status': 'string',
+        'amount': 'number',
+        'data': 'object',
+    }
+}
+
+
+class TestCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace(SCHEMA)
+        self.docs = [
+            self.ns.Document(
+                uid=uuid.UUID(int=i), date=datetime.date(2020, 1, 1 + i), status='new' if i % 2 else 'closed',
+                amount=i,
+            )
+            for i in range(10)
+        ]
+        self.collection = SchemaDocCollection(
+            self.ns.Document, self.docs, hash_index=('uid', 'status'), sorted_index=('date', 'amount')
+        )
+
+    def test_queries(self):
+        collection = self.collection
+
+        self.assertEqual(len(collection), 10)
+        self.assertIs(collection.find_one('uid', uuid.UUID(int=3)), self.docs[3])
+        self.assertIs(collection.find_one('uid', str(uuid.UUID(int=3))), self.docs[3])
+        self.assertEqual(collection.find('status', 'new'), self.docs[1::2])
+        self.assertEqual(collection.find('date', datetime.date(2020, 1, 2)), [self.docs[1]])
+        # поле без индекса
+        self.assertEqual(collection.find('data', None), self.docs)
+
+        self.assertEqual(
+            collection.range('date', datetime.date(2020, 1, 3), datetime.date(2020, 1, 5)), self.docs[2:5]
+        )
+        self.assertEqual(collection.range('date', '2020-01-03', '2020-01-05', include_stop=False), self.docs[2:4])
+        self.assertEqual(collection.range('amount', stop=1.5), self.docs[:2])
+        self.assertEqual(collection.prefix('date', '2020-01-0'), self.docs[:9])
+
+        with self.assertRaises(ValueError):
+            collection.range('status', 'a', 'b')
+        with self.assertRaises(ValueError):
+            SchemaDocCollection(self.ns.Document, hash_index=('data', ))
+
+    def test_date_keys(self):
+        ns = build_schemadoc_namespace({'name': 'Event', 'fields': {'day': 'date', 'at': 'datetime'}})
+        docs = [
+            ns.Event(day='20200105', at='2020-01-05T10:00:00Z'),
+            ns.Event(day='2020-01-04', at='2020-01-05T09:30:00-05:00'),
+            ns.Event(day=datetime.date(2020, 1, 6), at=datetime.datetime(2020, 1, 5, 12)),
+        ]
+
+        for index_kind in ('hash_index', 'sorted_index'):
+            collection = SchemaDocCollection(ns.Event, docs, **{index_kind: ('day', 'at')})
+            self.assertEqual(collection.find('day', datetime.date(2020, 1, 5)), [docs[0]])
+            self.assertEqual(collection.find('at', '2020-01-05T14:30:00+00:00'), [docs[1]])
+
+        collection = SchemaDocCollection(ns.Event, docs, sorted_index=('day', 'at'))
+        self.assertEqual(collection.range('day', '2020-01-05'), [docs[0], docs[2]])
+        self.assertEqual(collection.range('at'), [docs[0], docs[2], docs[1]])
+        self.assertEqual(collection.range('at', stop=datetime.datetime(2020, 1, 5, 13)), [docs[0], docs[2]])
+
+        # запрос без индекса сравнивает значения так же
+        self.assertEqual(SchemaDocCollection(ns.Event, docs).find('day', '2020-01-05'), [docs[0]])
+
+    def test_updates(self):
+        collection = self.collection
+        doc = self.docs[0]
+
+        doc.status = 'new'
+        doc.date = datetime.date(2021, 1, 1)
+        self.assertEqual(collection.find('status', 'new'), self.docs[1::2] + [doc])
+        self.assertEqual(collection.range('date', '2020-12-31'), [doc])
+        self.assertEqual(collection.range('date', stop='2020-01-01'), [])
+
+        apply_patch(doc, {'set': {'amount': 100}})
+        self.assertEqual(collection.range('amount', 50), [doc])
+
+        doc.from_dict({'status': 'archived'})
+        self.assertEqual(collection.find('status', 'archived'), [doc])
+        self.assertEqual(collection.find('uid', None), [doc])
+
+        collection.remove(doc)
+        self.assertEqual(collection.find('status', 'archived'), [])
+        self.assertNotIn(doc, collection)
+        doc.status = 'new'
+        self.assertEqual(collection.find('status', 'new'), self.docs[1::2])
+
+    def test_compact(self):
+        ns = build_schemadoc_namespace(SCHEMA, compact=True)
+        docs = [ns.Document(status=str(i)) for i in range(3)]
+        collection = SchemaDocCollection(ns.Document, docs, sorted_index=('status', ))
+
+        docs[0].status = '5'
+        self.assertEqual(collection.range('status', '1'), docs[1:] + docs[:1])
+
+        with self.assertRaises(TypeError):
+            collection.add(self.docs[0])
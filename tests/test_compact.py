@@ -0,0 +1,91 @@
+import datetime
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.compact import CompactSchemaDoc
+from schema_docs.exceptions import SchemaDocFieldException
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'required'},
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'uid': 'uuid',
+        'date': 'date',
+        'amount': 'number',
+        'line': 'Line',
+        'lines': {'type': 'array', 'items': 'Line'},
+    }
+}]
+
+
+class TestCompactDocs(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace(SCHEMA, compact=True)
+
+    def test_layout(self):
+        doc = self.ns.Document(name='a')
+
+        self.assertIsInstance(doc, CompactSchemaDoc)
+        self.assertFalse(hasattr(doc, '__dict__'))
+        self.assertIsNot(self.ns.Document, build_schemadoc_namespace(SCHEMA).Document)
+        self.assertIs(self.ns.Document, build_schemadoc_namespace(SCHEMA, compact=True).Document)
+
+    def test_same_behaviour_as_dict_docs(self):
+        uid = uuid.uuid4()
+        data = {
+            'name': 'a', 'uid': uid, 'date': datetime.date(2020, 1, 5), 'line': {'code': 'x', 'qty': 1},
+            'lines': [{'code': 'y'}, None],
+        }
+
+        for ns in (build_schemadoc_namespace(SCHEMA), self.ns):
+            doc = ns.Document(**data)
+
+            self.assertEqual(doc.to_dict(), {
+                'name': 'a', 'uid': uid.hex, 'date': '2020-01-05', 'line': {'code': 'x', 'qty': 1},
+                'lines': [{'code': 'y'}, None],
+            })
+            self.assertEqual(doc.uid, uid)
+            self.assertEqual(doc.date, datetime.date(2020, 1, 5))
+            self.assertIsNone(doc.amount)
+            self.assertNotIn('amount', doc.to_dict())
+
+            # изменения во вложенных документах видны в документе-владельце
+            doc.line.qty = 5
+            doc.lines[0].qty = 3
+            self.assertEqual(doc.to_dict()['line'], {'code': 'x', 'qty': 5})
+            self.assertEqual(doc.to_dict()['lines'][0], {'code': 'y', 'qty': 3})
+            self.assertEqual(doc.to_json(), ns.Document(doc.to_dict()).to_json())
+
+            self.assertTrue(doc.validate())
+            doc.line = {'qty': 1}
+            self.assertEqual([fv.msg for fv in doc.failed_validations()],
+                             ['Не указано обязательное значение поля code'])
+
+            doc.from_dict({'name': 'b', 'line': {'code': 'z'}})
+            self.assertEqual(doc.to_dict(), {'name': 'b', 'line': {'code': 'z'}})
+            self.assertEqual(doc.line.code, 'z')
+            self.assertIsNone(doc.uid)
+
+            with self.assertRaises(SchemaDocFieldException):
+                doc.amount = '10'
+            doc.setup(soft_numbers=True).setup(lenient_dates=True)
+            doc.amount = '10'
+            doc.date = '05.01.2020'
+            self.assertEqual(doc.amount, 10)
+            self.assertIsInstance(doc, ns.Document)
+
+    def test_from_records(self):
+        batch = self.ns.Document.from_records([{'name': 'a', 'line': {'code': 'x'}}, {'amount': 'bad'}])
+
+        self.assertEqual(list(batch.errors), [1])
+        self.assertEqual(batch.docs[0].to_dict(), {'name': 'a', 'line': {'code': 'x'}})
+        self.assertEqual(self.ns.Document.cast_dict({'line': {'qty': 1}}), {'line': {'qty': 1}})
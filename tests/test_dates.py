@@ -0,0 +1,95 @@
+import unittest
+import datetime
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocFieldException
+from schema_docs.utils import iso_to_datetime, iso_to_date, parse_iso_datetime, safe_iso_to_date, \
+    safe_iso_to_datetime
+
+
+UTC = datetime.timezone.utc
+MSK = datetime.timezone(datetime.timedelta(hours=3))
+NY = datetime.timezone(-datetime.timedelta(hours=5))
+
+# Корпус корректных значений в формате ISO-8601 и ожидаемых результатов разбора
+ISO_CORPUS = [
+    ('2020-01-05', datetime.datetime(2020, 1, 5)),
+    ('20200105', datetime.datetime(2020, 1, 5)),
+    ('2020-01-05T10', datetime.datetime(2020, 1, 5, 10)),
+    ('2020-01-05T10:20', datetime.datetime(2020, 1, 5, 10, 20)),
+    ('2020-01-05 10:20:30', datetime.datetime(2020, 1, 5, 10, 20, 30)),
+    ('2020-01-05T10:20:30.5', datetime.datetime(2020, 1, 5, 10, 20, 30, 500000)),
+    ('2020-01-05T10:20:30,123', datetime.datetime(2020, 1, 5, 10, 20, 30, 123000)),
+    ('2020-01-05T10:20:30.123456', datetime.datetime(2020, 1, 5, 10, 20, 30, 123456)),
+    ('2020-01-05T10:20:30.1234567', datetime.datetime(2020, 1, 5, 10, 20, 30, 123456)),
+    ('2020-01-05T10:20:30Z', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=UTC)),
+    ('2020-01-05T10:20:30+00:00', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=UTC)),
+    ('2020-01-05T10:20:30+03:00', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=MSK)),
+    ('2020-01-05T10:20:30+0300', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=MSK)),
+    ('2020-01-05T10:20:30+03', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=MSK)),
+    ('2020-01-05T10:20:30-05:00', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=NY)),
+    ('2020-01-05T10:20:30.5Z', datetime.datetime(2020, 1, 5, 10, 20, 30, 500000, tzinfo=UTC)),
+    ('20200105T1020', datetime.datetime(2020, 1, 5, 10, 20)),
+    ('20200105T102030', datetime.datetime(2020, 1, 5, 10, 20, 30)),
+    ('20200105T102030Z', datetime.datetime(2020, 1, 5, 10, 20, 30, tzinfo=UTC)),
+    ('20200105T102030.25+0300', datetime.datetime(2020, 1, 5, 10, 20, 30, 250000, tzinfo=MSK)),
+]
+
+# Значения, которые не должны разбираться в строгом режиме
+INVALID_CORPUS = [
+    '',
+    'abc',
+    '2020-13-01',
+    '2020-02-30',
+    '2020-01-05T25:00',
+    '2020-01-05T10:61',
+    '05.01.2020',
+    'Jan 5 2020',
+    '2020-01-05T10:20:30+3',
+    '2020-01-05\n',
+    '2020-01-05T10:00:00\n',
+    '20200105T100000Z\n',
+]
+
+
+class TestIsoDates(unittest.TestCase):
+
+    def test_corpus(self):
+        for value, expected in ISO_CORPUS:
+            with self.subTest(value=value):
+                self.assertEqual(iso_to_datetime(value), expected)
+                self.assertEqual(iso_to_datetime(value).utcoffset(), expected.utcoffset())
+                self.assertEqual(iso_to_date(value), expected.date())
+
+    def test_hand_written_parser_corpus(self):
+        for value, expected in ISO_CORPUS:
+            with self.subTest(value=value):
+                self.assertEqual(parse_iso_datetime(value), expected)
+
+    def test_invalid_corpus(self):
+        for value in INVALID_CORPUS:
+            with self.subTest(value=value):
+                self.assertIsNone(safe_iso_to_datetime(value))
+                self.assertIsNone(safe_iso_to_date(value))
+
+    def test_lenient(self):
+        self.assertEqual(iso_to_datetime('Jan 5 2020', lenient=True), datetime.datetime(2020, 1, 5))
+        self.assertIsNone(safe_iso_to_datetime('abc', lenient=True))
+
+    def test_lenient_option(self):
+        schema = [{
+            'name': 'Strict',
+            'fields': {'d': 'date'}
+        }, {
+            'name': 'Lenient',
+            'options': {'lenient_dates': True},
+            'fields': {'d': 'date'}
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+
+        with self.assertRaises(SchemaDocFieldException):
+            ns.Strict(d='Jan 5 2020')
+
+        self.assertEqual(ns.Lenient(d='Jan 5 2020').d, datetime.date(2020, 1, 5))
+        self.assertEqual(ns.Strict().setup(lenient_dates=True).d, None)
@@ -0,0 +1,110 @@
+import datetime
+import json
+import unittest
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.diff import apply_patch, diff, diff_many
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'required'},
+        'qty': 'number',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'date': 'date',
+        'amount': 'number',
+        'line': 'Line',
+        'lines': {'type': 'array', 'items': 'Line'},
+    }
+}]
+
+
+class TestDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace(SCHEMA)
+
+    def test_patch(self):
+        old = self.ns.Document(name='a', amount=1, date=datetime.date(2020, 1, 5), line={'code': 'x', 'qty': 1})
+        new = self.ns.Document(name='a', amount=2, line={'code': 'x', 'qty': 3}, lines=[{'code': 'y'}])
+
+        patch = diff(old, new)
+        self.assertEqual(patch, {
+            'set': {'amount': 2, 'lines': [{'code': 'y'}]},
+            'unset': ['date'],
+            'nested': {'line': {'set': {'qty': 3}}},
+        })
+        # патч содержит значения во внутреннем представлении
+        json.dumps(patch)
+
+        self.assertEqual(diff(old, self.ns.Document(old.to_dict())), {})
+        self.assertEqual(diff(old, old), {})
+
+    def test_apply_patch(self):
+        old = self.ns.Document(name='a', amount=1, date=datetime.date(2020, 1, 5), line={'code': 'x', 'qty': 1})
+        new = self.ns.Document(name='b', line={'code': 'x', 'qty': 3}, lines=[{'code': 'y'}])
+
+        self.assertEqual(old.date, datetime.date(2020, 1, 5))
+        self.assertEqual(old.line.qty, 1)
+
+        apply_patch(old, diff(old, new))
+
+        self.assertEqual(old.to_dict(), new.to_dict())
+        # кэш прочитанных значений сброшен
+        self.assertIsNone(old.date)
+        self.assertEqual(old.line.qty, 3)
+        self.assertEqual(old.lines[0].code, 'y')
+
+    def test_patch_revalidates(self):
+        doc = self.ns.Document(name='a', line={'code': 'x'})
+        self.assertTrue(doc.validate())
+
+        apply_patch(doc, diff(doc, self.ns.Document(line={'code': 'x'})))
+        self.assertFalse(doc.validate())
+
+        apply_patch(doc, {'nested': {'line': {'unset': ['code']}}, 'set': {'name': 'b'}})
+        self.assertEqual(len(doc.failed_validations()), 1)
+        self.assertFalse(doc.line.validate())
+
+    def test_nested_patch_to_empty_field(self):
+        doc = self.ns.Document(name='a')
+        with self.assertRaises(ValueError):
+            apply_patch(doc, {'nested': {'line': {'set': {'qty': 1}}}})
+
+    def test_different_types(self):
+        with self.assertRaises(TypeError):
+            diff(self.ns.Document(name='a'), self.ns.Line(code='a'))
+
+    def test_field_named_diff(self):
+        ns = build_schemadoc_namespace({'name': 'Document', 'fields': {'diff': 'string'}}, memoize=False)
+        doc = ns.Document(diff='a')
+
+        patch = diff(doc, ns.Document(diff='b'))
+        self.assertEqual(patch, {'set': {'diff': 'b'}})
+        self.assertEqual(apply_patch(doc, patch).diff, 'b')
+
+    def test_diff_many(self):
+        old_docs = [self.ns.Document(name=str(i), amount=i) for i in range(3)]
+        new_docs = [self.ns.Document(name=str(i), amount=i % 2) for i in range(3)]
+
+        self.assertEqual(diff_many(old_docs, new_docs), [{}, {}, {'set': {'amount': 0}}])
+
+    def test_compact(self):
+        ns = build_schemadoc_namespace(SCHEMA, compact=True)
+        old = ns.Document(name='a', amount=1, line={'code': 'x', 'qty': 1}, lines=[{'code': 'y'}])
+        new = ns.Document(name='a', line={'code': 'x', 'qty': 3}, lines=[{'code': 'z'}])
+
+        patch = diff(old, new)
+        self.assertEqual(patch, {
+            'set': {'lines': [{'code': 'z'}]}, 'unset': ['amount'], 'nested': {'line': {'set': {'qty': 3}}},
+        })
+
+        apply_patch(old, patch)
+        self.assertEqual(old.to_dict(), new.to_dict())
+        self.assertEqual(old.lines[0].code, 'z')
+        self.assertIsNone(old.amount)
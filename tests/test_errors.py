@@ -0,0 +1,121 @@
+import asyncio
+import pickle
+import unittest
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.errors import (
+    ERROR_CUSTOM, ERROR_ITEM_NOT_EMPTY, ERROR_NOT_EMPTY, ERROR_REQUIRED, ERROR_TYPE, format_path
+)
+from schema_docs.exceptions import InvalidSchemaDocException, SchemaDocFieldException
+
+
+def known_code(value, doc):
+    if value is not None and value != 'A':
+        return 'Неизвестный код {0}'.format(value)
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'code': {'type': 'string', 'validate': 'required'},
+        'qty': 'number',
+        'unit': {'type': 'string', 'validate': known_code},
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'not-empty'},
+        'line': 'Line',
+        'lines': {'type': 'array', 'items': 'Line'},
+        'tags': {'type': 'array', 'items': {'type': 'string', 'validate': 'not-empty'}},
+    }
+}]
+
+
+class CountingValue(object):
+    """ Значение, которое считает, сколько раз его привели к строке """
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return 'counting'
+
+
+class TestStructuredErrors(unittest.TestCase):
+
+    def test_format_path(self):
+        self.assertEqual(format_path(('lines', 1, 'code')), 'lines[1].code')
+        self.assertEqual(format_path(('line', 'qty')), 'line.qty')
+        self.assertEqual(format_path(('name', )), 'name')
+
+    def test_cast_errors(self):
+        for ns in (build_schemadoc_namespace(SCHEMA), build_schemadoc_namespace(SCHEMA, compact=True)):
+            value = CountingValue()
+            with self.assertRaises(SchemaDocFieldException) as cm:
+                ns.Document(line={'qty': value})
+
+            error = cm.exception
+            self.assertEqual(error.code, ERROR_TYPE)
+            self.assertEqual(error.path, ('line', 'qty'))
+            self.assertEqual(error.field_name, 'line.qty')
+            self.assertIs(error.failed_value, value)
+            # описание формируется только по требованию
+            self.assertEqual(value.formatted, 0)
+            self.assertEqual(str(error), 'Value counting is not compatible with field line.qty of type number')
+            self.assertEqual(value.formatted, 1)
+
+            with self.assertRaises(SchemaDocFieldException) as cm:
+                ns.Document(lines=[{'code': 'a'}, {'code': 1}])
+            self.assertEqual(cm.exception.path, ('lines', 1, 'code'))
+
+            restored = pickle.loads(pickle.dumps(cm.exception))
+            self.assertEqual((restored.path, restored.msg), (cm.exception.path, cm.exception.msg))
+
+    def test_try_cast_dict(self):
+        for ns in (build_schemadoc_namespace(SCHEMA), build_schemadoc_namespace(SCHEMA, compact=True)):
+            data, errors = ns.Document.try_cast_dict({
+                'name': 1, 'line': {'code': 'x'}, 'lines': [{'qty': 'x'}], 'tags': ['a', 2],
+            })
+
+            self.assertIsNone(data)
+            self.assertEqual([(error.code, error.path) for error in errors], [
+                (ERROR_TYPE, ('name', )), (ERROR_TYPE, ('lines', 0, 'qty')), (ERROR_TYPE, ('tags', 1)),
+            ])
+
+            data, errors = ns.Document.try_cast_dict({'name': 'a', 'line': {'code': 'x', 'qty': 1}})
+            self.assertEqual(errors, [])
+            self.assertEqual(data, {'name': 'a', 'line': {'code': 'x', 'qty': 1}})
+
+    def test_failed_validations(self):
+        ns = build_schemadoc_namespace(SCHEMA)
+        doc = ns.Document(name='', line={'unit': 'B'}, lines=[{'code': 'a'}, {'qty': 1}], tags=['a', ''])
+
+        # кэшированные результаты правил вложенных документов не должны получать путь повторно
+        for _ in range(2):
+            failed_validations = doc.failed_validations()
+            self.assertEqual([(fv.code, fv.path, fv.value) for fv in failed_validations], [
+                (ERROR_NOT_EMPTY, ('name', ), ''),
+                (ERROR_ITEM_NOT_EMPTY, ('tags', 1), ''),
+                (ERROR_REQUIRED, ('line', 'code'), None),
+                (ERROR_CUSTOM, ('line', 'unit'), 'B'),
+                (ERROR_REQUIRED, ('lines', 1, 'code'), None),
+            ])
+
+        # в описании указывается путь к полю внутри документа, которому принадлежит правило
+        self.assertEqual([fv.msg for fv in failed_validations], [
+            'В поле name должно быть указано непустое значение',
+            'tags[1]: Должно быть указано непустое значение элемента',
+            'Не указано обязательное значение поля code',
+            'Неизвестный код B',
+            'Не указано обязательное значение поля code',
+        ])
+
+        async_failed = asyncio.run(doc.afailed_validations())
+        self.assertEqual([fv.path for fv in async_failed], [fv.path for fv in failed_validations])
+
+        with self.assertRaises(InvalidSchemaDocException) as cm:
+            doc.validate(raise_exception=True)
+        self.assertEqual(len(cm.exception.failed_validations), 5)
+        self.assertTrue(str(cm.exception).startswith('В поле name должно быть указано непустое значение; '))
@@ -0,0 +1,163 @@
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocFieldException
+from schema_docs.field import SchemaDocField
+
+
+class TestFields(unittest.TestCase):
+
+    def test_fields_compiled_to_descriptors(self):
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'uid': 'uuid',
+                'name': 'string'
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+
+        self.assertIsInstance(ns.Document.__dict__['uid'], SchemaDocField)
+        self.assertIsInstance(ns.Document.__dict__['name'], SchemaDocField)
+
+        uid = uuid.uuid4()
+        doc = ns.Document(uid=uid, name='abc')
+
+        self.assertEqual(doc.uid, uid)
+        self.assertEqual(doc.name, 'abc')
+        self.assertEqual(doc.to_dict(), {'uid': uid.hex, 'name': 'abc'})
+
+        doc.name = None
+        self.assertIsNone(doc.name)
+        self.assertIn('name', doc.to_dict())
+
+    def test_sub_doc_declared_after_owner(self):
+        schema = [{
+            'name': 'Order',
+            'fields': {
+                'customer': 'Customer'
+            }
+        }, {
+            'name': 'Customer',
+            'fields': {
+                'name': 'string'
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+        order = ns.Order(customer={'name': 'abc'})
+
+        self.assertIsInstance(order.customer, ns.Customer)
+        self.assertEqual(order.customer.name, 'abc')
+
+    def test_unknown_attribute_and_type(self):
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'x': 'unknown'
+            }
+        }]
+
+        doc = build_schemadoc_namespace(schema).Document()
+
+        with self.assertRaises(AttributeError):
+            getattr(doc, 'y')
+
+        with self.assertRaises(NotImplementedError):
+            doc.x = 1
+
+    def test_field_name_conflicts_with_document_attribute(self):
+        for field_name in ('validate', 'schema', 'to_dict', 'from_dict', '_data'):
+            schema = {'name': 'Document', 'fields': {field_name: 'string'}}
+
+            for compact in (False, True):
+                with self.assertRaisesRegex(ValueError, 'Field {0} of Document'.format(field_name)):
+                    build_schemadoc_namespace(schema, compact=compact, memoize=False)
+
+        # служебные атрибуты и слоты компактных документов
+        for field_name in ('_v0', '_slot_setters'):
+            schema = {'name': 'Document', 'fields': {field_name: 'string'}}
+
+            self.assertEqual(build_schemadoc_namespace(schema, memoize=False).Document(
+                **{field_name: 'a'}).to_dict(), {field_name: 'a'})
+            with self.assertRaisesRegex(ValueError, 'Field {0} of Document'.format(field_name)):
+                build_schemadoc_namespace(schema, compact=True, memoize=False)
+
+    def test_field_names_of_helper_methods(self):
+        fields = ('diff', 'collection', 'to_json', 'from_records', 'slot_name')
+        schema = {'name': 'Document', 'fields': {field_name: 'string' for field_name in fields}}
+
+        for compact in (False, True):
+            ns = build_schemadoc_namespace(schema, compact=compact, memoize=False)
+            doc = ns.Document(**{field_name: field_name for field_name in fields})
+
+            self.assertEqual(doc.to_dict(), {field_name: field_name for field_name in fields})
+            self.assertEqual(doc.to_json, 'to_json')
+            self.assertTrue(doc.validate())
+
+    def test_decoded_values_cache(self):
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'uid': 'uuid',
+                'created': 'datetime',
+                'line': 'Line'
+            }
+        }, {
+            'name': 'Line',
+            'fields': {
+                'code': 'string'
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+        doc = ns.Document(uid=uuid.uuid4(), created='2020-01-05T10:00:00', line={'code': 'a'})
+
+        self.assertIs(doc.uid, doc.uid)
+        self.assertIs(doc.created, doc.created)
+        self.assertIs(doc.line, doc.line)
+
+        # изменения через вложенный документ видны в родительском
+        doc.line.code = 'b'
+        self.assertEqual(doc.to_dict()['line'], {'code': 'b'})
+
+        uid = uuid.uuid4()
+        doc.uid = uid
+        self.assertEqual(doc.uid, uid)
+
+        doc.line = None
+        self.assertIsNone(doc.line)
+
+        doc.from_dict({'created': '2021-02-03T00:00:00'})
+        self.assertEqual(doc.created.year, 2021)
+        self.assertIsNone(doc.uid)
+
+    def test_nested_docs_cast_in_one_pass(self):
+        schema = [{
+            'name': 'Order',
+            'fields': {'line': 'Line'}
+        }, {
+            'name': 'Line',
+            'fields': {'product': 'Product', 'qty': 'number'}
+        }, {
+            'name': 'Product',
+            'fields': {'uid': 'uuid', 'name': 'string'}
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+        uid = uuid.uuid4()
+
+        order = ns.Order(line={'qty': 2, 'product': {'uid': uid, 'name': 'p', 'extra': 1}})
+        self.assertEqual(order.to_dict(), {'line': {'product': {'uid': uid.hex, 'name': 'p'}, 'qty': 2}})
+
+        # обертки вложенных документов работают поверх данных родительского документа
+        self.assertIs(order.line.product.to_dict(), order.to_dict()['line']['product'])
+        self.assertEqual(order.line.product.uid, uid)
+
+        order.line.product.name = 'q'
+        self.assertEqual(order.to_dict()['line']['product']['name'], 'q')
+
+        with self.assertRaises(SchemaDocFieldException):
+            ns.Order(line={'product': {'uid': 'abc'}})
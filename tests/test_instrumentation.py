@@ -0,0 +1,69 @@
+import unittest
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocFieldException
+from schema_docs.instrumentation import SchemaDocInstrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'required'},
+                'date': 'date',
+                'line': 'Line'
+            }
+        }, {
+            'name': 'Line',
+            'fields': {
+                'qty': {'type': 'number', 'validate': 'required'}
+            }
+        }])
+
+    def test_counters(self):
+        events = []
+
+        with SchemaDocInstrumentation(self.ns, callback=lambda *args: events.append(args)) as instrumentation:
+            doc = self.ns.Document(date='2020-01-05', line={})
+            doc.date
+            doc.date
+
+            with self.assertRaises(SchemaDocFieldException):
+                doc.name = 1
+
+            self.assertEqual(len(doc.failed_validations()), 2)
+            self.assertFalse(doc.validate())
+
+        snapshot = instrumentation.snapshot()
+
+        self.assertEqual(snapshot['Document']['date']['casts'], 1)
+        self.assertEqual(snapshot['Document']['date']['decodes'], 1)
+        self.assertEqual(snapshot['Document']['name']['casts'], 1)
+        self.assertEqual(snapshot['Document']['name']['cast_failures'], 1)
+        # validate() берет результат правила name из кэша, оставшегося после failed_validations()
+        self.assertEqual(snapshot['Document']['name']['validations'], 1)
+        self.assertEqual(snapshot['Document']['name']['validation_failures'], 1)
+        self.assertEqual(snapshot['Line']['qty']['validation_failures'], 1)
+        self.assertGreater(snapshot['Document']['date']['cast_seconds'], 0)
+
+        kinds = [(type_name, field_name, event, failed) for type_name, field_name, event, _, failed in events]
+        self.assertIn(('Document', 'date', 'cast', False), kinds)
+        self.assertIn(('Document', 'name', 'cast', True), kinds)
+        self.assertIn(('Line', 'qty', 'validation', True), kinds)
+
+    def test_disable_restores_hot_path(self):
+        field = self.ns.Document.__dict__['name']
+        from_ext, plan = field.from_ext, self.ns.Document._validation_plan
+
+        instrumentation = SchemaDocInstrumentation(self.ns).enable()
+        self.assertIsNot(field.from_ext, from_ext)
+        self.assertIsNot(self.ns.Document._validation_plan, plan)
+
+        instrumentation.disable()
+        self.assertEqual(field.from_ext, from_ext)
+        self.assertIs(self.ns.Document._validation_plan, plan)
+
+        self.ns.Document(name='a')
+        self.assertEqual(instrumentation.snapshot()['Document']['name']['casts'], 0)
@@ -0,0 +1,76 @@
+import unittest
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocFieldException
+
+
+SCHEMA = [{
+    'name': 'Line',
+    'fields': {
+        'product': 'uuid',
+        'currency': 'string',
+    }
+}, {
+    'name': 'Document',
+    'fields': {
+        'status': 'string',
+        'customer': 'uuid',
+        'line': 'Line',
+        'tags': {'type': 'array', 'items': 'string'},
+    }
+}]
+
+
+class TestInternPool(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace(SCHEMA, intern_size=16)
+        # область имен общая для тестов (кэш областей имен)
+        self.ns.intern_pool.clear()
+
+    def test_shared_values(self):
+        customer = uuid.uuid4()
+        records = [{
+            'status': ''.join(['ne', 'w']), 'customer': customer.hex.upper(), 'tags': [''.join(['a', 'b'])],
+            'line': {'product': str(customer), 'currency': ''.join(['RU', 'B'])},
+        } for _ in range(3)]
+
+        docs = self.ns.Document.from_records(records).docs + [self.ns.Document(**records[0])]
+        first = docs[0].to_dict()
+
+        for doc in docs[1:]:
+            data = doc.to_dict()
+            self.assertIs(data['status'], first['status'])
+            self.assertIs(data['customer'], first['customer'])
+            self.assertIs(data['tags'][0], first['tags'][0])
+            self.assertIs(data['line']['currency'], first['line']['currency'])
+            self.assertIs(doc.customer, docs[0].customer)
+            self.assertEqual(doc.line.product, customer)
+
+        info = self.ns.intern_pool.info()
+        self.assertEqual(info['uuid_string']['misses'], 2)
+        self.assertEqual(info['uuid_string']['hits'], 6)
+
+    def test_same_behaviour(self):
+        ns = build_schemadoc_namespace(SCHEMA)
+        uid = uuid.uuid4()
+
+        for namespace in (ns, self.ns, build_schemadoc_namespace(SCHEMA, compact=True, intern_size=16)):
+            doc = namespace.Document(status='new', customer=uid)
+            self.assertEqual(doc.to_dict(), {'status': 'new', 'customer': uid.hex})
+            self.assertEqual(doc.customer, uid)
+
+            for _ in range(2):
+                with self.assertRaises(SchemaDocFieldException):
+                    doc.customer = 'not uuid'
+                with self.assertRaises(SchemaDocFieldException):
+                    doc.status = 1
+
+    def test_namespaces(self):
+        self.assertIs(build_schemadoc_namespace(SCHEMA, intern_size=16), self.ns)
+        self.assertIsNot(build_schemadoc_namespace(SCHEMA), self.ns)
+        self.assertIsNone(build_schemadoc_namespace(SCHEMA).intern_pool)
+
+        self.ns.intern_pool.clear()
+        self.assertEqual(self.ns.intern_pool.info()['string']['currsize'], 0)
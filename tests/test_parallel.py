@@ -0,0 +1,53 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from schema_docs.parallel import validate_records
+
+
+SCHEMA = [{
+    'name': 'Document',
+    'fields': {
+        'name': {'type': 'string', 'validate': 'required'},
+        'amount': 'number',
+    }
+}]
+
+
+class TestParallelValidation(unittest.TestCase):
+
+    def test_results_in_input_order(self):
+        records = []
+        for i in range(100):
+            if i % 10 == 0:
+                records.append({'amount': 'x'})
+            elif i % 3 == 0:
+                records.append({'amount': i})
+            else:
+                records.append({'name': str(i), 'amount': i})
+
+        expected = [1 if i % 10 == 0 or i % 3 == 0 else 0 for i in range(100)]
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                result = validate_records(SCHEMA, 'Document', records, max_workers=max_workers, chunk_size=7)
+                self.assertEqual([len(failed) for failed in result], expected)
+                self.assertIn('amount', result[0][0].msg)
+
+    def test_self_key(self):
+        schema = {'name': 'Document', 'fields': {'self': {'type': 'string', 'validate': 'required'}}}
+        records = [{'self': 'a'}, {}, {'self': 1}]
+
+        result = validate_records(schema, 'Document', records, max_workers=1)
+        self.assertEqual([len(failed) for failed in result], [0, 1, 1])
+
+    def test_threads_with_different_schemas(self):
+        other_schema = [{'name': 'Document', 'fields': {'code': {'type': 'string', 'validate': 'required'}}}]
+        records = [{'name': 'a'}] * 50
+
+        def validate(schema):
+            return [len(failed) for failed in validate_records(schema, 'Document', records, max_workers=1)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(validate, [SCHEMA, other_schema] * 20))
+
+        self.assertEqual(results, [[0] * 50, [1] * 50] * 20)
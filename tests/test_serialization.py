@@ -0,0 +1,69 @@
+import io
+import json
+import unittest
+import uuid
+from unittest import mock
+
+from schema_docs import build_schemadoc_namespace
+
+
+class TestJsonSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Line',
+            'fields': {
+                'code': 'string',
+                'qty': 'number',
+            }
+        }, {
+            'name': 'Document',
+            'fields': {
+                'name': 'string',
+                'uid': 'uuid',
+                'date': 'date',
+                'amount': 'number',
+                'active': 'bool',
+                'tags': 'list',
+                'extra': 'object',
+                'line': 'Line',
+            }
+        }])
+
+        self.doc = self.ns.Document(
+            name='Ёлка "1"', uid=uuid.uuid4(), date='2020-01-05', amount=1.5, active=False, tags=['a', 1],
+            extra={'x': [1, None]}, line={'code': 'c', 'qty': 2}
+        )
+
+    def test_to_json(self):
+        self.assertEqual(self.doc.to_json(), json.dumps(self.doc.to_dict()))
+        self.assertEqual(json.loads(self.doc.to_json(as_bytes=True)), self.doc.to_dict())
+
+    def test_unknown_keys(self):
+        doc = self.ns.Document().from_dict({'unknown': {'a': 1}, 'amount': float('nan'), 'name': None})
+
+        self.assertEqual(doc.to_json(), '{"unknown": {"a": 1}, "amount": NaN, "name": null}')
+
+        doc = self.ns.Document().from_dict({'unknown': object()})
+        with self.assertRaises(TypeError):
+            doc.to_json()
+
+    def test_dumps_many(self):
+        docs = [self.doc, self.ns.Document(name='b'), {'name': 'c'}]
+        expected = [self.doc.to_dict(), {'name': 'b'}, {'name': 'c'}]
+
+        self.assertEqual(json.loads(self.ns.Document.dumps_many(docs)), expected)
+        self.assertEqual(self.ns.Document.dumps_many([]), '[]')
+
+        stream = io.BytesIO()
+        self.assertIsNone(self.ns.Document.dumps_many(docs, fp=stream, as_bytes=True))
+        self.assertEqual(json.loads(stream.getvalue()), expected)
+
+        with mock.patch('schema_docs.serialization.STREAM_CHUNK_SIZE', 2):
+            stream = io.StringIO()
+            self.ns.Document.dumps_many(iter(docs), fp=stream)
+            self.assertEqual(stream.getvalue(), json.dumps(expected))
+
+            stream = io.StringIO()
+            self.ns.Document.dumps_many([], fp=stream)
+            self.assertEqual(stream.getvalue(), '[]')
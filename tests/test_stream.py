@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+
+from schema_docs import build_schemadoc_namespace, read_schemadoc_jsonl
+from schema_docs.exceptions import SchemaDocStreamException
+
+
+LINES = '\n'.join([
+    '{"name": "a", "amount": 1}',
+    '',
+    '{"amount": 2}',
+    '{"name": "c", "amount": "x"}',
+    'not a json',
+    '{"name": "e", "amount": 5}',
+]) + '\n'
+
+
+class TestJsonLines(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'required'},
+                'amount': 'number'
+            }
+        }])
+
+    def test_report(self):
+        reader = read_schemadoc_jsonl(self.ns, 'Document', io.StringIO(LINES))
+        result = list(reader)
+
+        self.assertEqual([line_no for line_no, _, _ in result], [1, 3, 4, 5, 6])
+        self.assertEqual(result[0][1].name, 'a')
+        self.assertEqual(result[0][2], [])
+        self.assertEqual(len(result[1][2]), 1)
+        self.assertIsNone(result[2][1])
+        self.assertIsNone(result[3][1])
+
+        counters = reader.counters
+        self.assertEqual(counters['lines'], 5)
+        self.assertEqual(counters['docs'], 3)
+        self.assertEqual(counters['invalid'], 3)
+        self.assertEqual(counters['bytes'], len(LINES))
+
+    def test_skip_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'docs.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(LINES)
+
+            reader = read_schemadoc_jsonl(self.ns, 'Document', path, mode='skip-invalid')
+            names = [doc.name for _, doc, _ in reader]
+
+        self.assertEqual(names, ['a', 'e'])
+        self.assertEqual(reader.counters['skipped'], 3)
+
+    def test_fail_fast(self):
+        reader = iter(read_schemadoc_jsonl(self.ns, 'Document', io.BytesIO(LINES.encode()), mode='fail-fast'))
+
+        self.assertEqual(next(reader)[0], 1)
+
+        with self.assertRaises(SchemaDocStreamException) as cm:
+            next(reader)
+
+        self.assertEqual(cm.exception.line_no, 3)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            read_schemadoc_jsonl(self.ns, 'Document', io.StringIO(LINES), mode='unknown')
+
+    def test_self_key(self):
+        schema = {'name': 'Document', 'fields': {'name': 'string', 'self': 'string'}}
+        lines = '{"name": "a", "self": "x"}\n{"self": 1}\n{"name": "c", "other": {"self": 1}}\n'
+
+        for compact in (False, True):
+            ns = build_schemadoc_namespace(schema, compact=compact)
+            result = list(read_schemadoc_jsonl(ns, 'Document', io.StringIO(lines)))
+
+            self.assertEqual(getattr(result[0][1], 'self'), 'x')
+            self.assertIsNone(result[1][1])
+            self.assertEqual(result[1][2][0].path, ('self', ))
+            self.assertEqual(result[2][1].to_dict(), {'name': 'c'})
@@ -0,0 +1,147 @@
+import unittest
+import datetime
+import uuid
+
+from schema_docs import build_schemadoc_namespace
+from schema_docs.exceptions import SchemaDocFieldException
+
+try:
+    import numpy
+    from schema_docs.table import DocTable
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestDocTable(unittest.TestCase):
+
+    def setUp(self):
+        self.ns = build_schemadoc_namespace([{
+            'name': 'Line',
+            'fields': {
+                'qty': {'type': 'number', 'validate': 'required'}
+            }
+        }, {
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'not-empty'},
+                'amount': {'type': 'number', 'validate': 'not-empty'},
+                'count': 'int',
+                'date': {'type': 'date', 'validate': 'required'},
+                'created': 'datetime',
+                'flag': 'bool',
+                'uid': {'type': 'uuid', 'validate': 'not-empty'},
+                'line': 'Line',
+            }
+        }])
+
+        self.uid = uuid.uuid4()
+        self.records = [{
+            'name': 'a',
+            'amount': 1.5,
+            'count': 3,
+            'date': '2020-01-05',
+            'created': '2020-01-05T10:00:00+03:00',
+            'flag': True,
+            'uid': self.uid,
+            'line': {'qty': 1},
+        }, {
+            'name': '',
+            'amount': 0,
+            'date': None,
+            'created': datetime.datetime(2020, 1, 6),
+            'flag': 'false',
+            'uid': '00000000-0000-0000-0000-000000000000',
+            'line': {},
+        }]
+
+    def test_columns(self):
+        table = DocTable(self.ns.Document, self.records)
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.column('amount').dtype, numpy.float64)
+        self.assertEqual(table.column('count').dtype, numpy.int64)
+        self.assertEqual(table.column('date').dtype, numpy.dtype('datetime64[D]'))
+        self.assertEqual(table.column('created').dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(table.column('flag').tolist(), [True, False])
+        self.assertEqual(table.nulls('count').tolist(), [False, True])
+
+    def test_rows(self):
+        table = DocTable(self.ns.Document).extend(self.records[:1]).extend(self.records[1:])
+        row = table[0]
+
+        self.assertEqual(row.name, 'a')
+        self.assertEqual(row.amount, 1.5)
+        self.assertEqual(row.date, datetime.date(2020, 1, 5))
+        self.assertEqual(row.created, self.ns.Document(self.records[0]).created)
+        self.assertEqual(row.created.utcoffset(), datetime.timedelta(hours=3))
+        self.assertIsNone(table[1].created.tzinfo)
+        self.assertEqual(row.uid, self.uid)
+        self.assertEqual(row.line.qty, 1)
+        self.assertIsNone(table[-1].count)
+
+        self.assertEqual(row.to_dict()['date'], '2020-01-05')
+        self.assertEqual(row.to_dict()['created'], '2020-01-05T10:00:00+03:00')
+        self.assertEqual(table.column('created')[0], numpy.datetime64('2020-01-05T07:00:00'))
+        self.assertTrue(row.validate())
+        self.assertEqual(row.to_doc().uid, self.uid)
+
+    def test_failed_rows(self):
+        table = DocTable(self.ns.Document, self.records)
+
+        failed = table.failed_rows()
+        self.assertEqual(sorted(failed), ['amount', 'date', 'line', 'name', 'uid'])
+        for mask in failed.values():
+            self.assertEqual(mask.tolist(), [False, True])
+
+        self.assertEqual(table.valid_mask().tolist(), [True, False])
+
+    def test_invalid_values(self):
+        with self.assertRaises(SchemaDocFieldException):
+            DocTable(self.ns.Document, [{'amount': 'x'}])
+
+        with self.assertRaises(SchemaDocFieldException):
+            DocTable(self.ns.Document, [{'date': 'x'}])
+
+    def test_numbers_as_in_docs(self):
+        records = [{'amount': 2, 'count': 1.5}, {'amount': 0.5, 'count': 2 ** 70}, {'amount': True, 'count': 3}]
+
+        for size in (1, 2, 3):
+            table = DocTable(self.ns.Document, records[:size])
+            for index, record in enumerate(records[:size]):
+                doc = self.ns.Document(record)
+                for field_name in ('amount', 'count'):
+                    value = getattr(table[index], field_name)
+                    self.assertEqual((type(value), value), (type(getattr(doc, field_name)), record[field_name]))
+                    self.assertEqual(type(table.ext_value(index, field_name)), type(doc.to_dict()[field_name]))
+
+        table = DocTable(self.ns.Document).extend([{'count': 2}]).extend([{'count': 0.5}]).extend([{'count': 2 ** 70}])
+        self.assertEqual([row.count for row in table], [2, 0.5, 2 ** 70])
+        self.assertEqual(type(table[0].count), int)
+        self.assertEqual(table.failed_rows()['amount'].tolist(), [True, True, True])
+
+    def test_items_rule(self):
+        ns = build_schemadoc_namespace({
+            'name': 'Document',
+            'fields': {'tags': {'type': 'array', 'items': {'type': 'string', 'validate': 'not-empty'}}},
+        })
+        records = [{'tags': ['a', '']}, {'tags': ['b']}, {'tags': None}]
+
+        table = DocTable(ns.Document, records)
+        self.assertEqual(table.valid_mask().tolist(), [ns.Document(record).validate() for record in records])
+        self.assertEqual(table.valid_mask().tolist(), [False, True, True])
+
+    def test_lenient_dates(self):
+        ns = build_schemadoc_namespace({
+            'name': 'Document',
+            'options': {'lenient_dates': True},
+            'fields': {'date': 'date', 'created': 'datetime'},
+        })
+        record = {'date': 'Jan 5 2020', 'created': 'Jan 5 2020 10:00'}
+
+        row = DocTable(ns.Document, [record])[0]
+        doc = ns.Document(record)
+        self.assertEqual((row.date, row.created), (doc.date, doc.created))
+
+        with self.assertRaises(SchemaDocFieldException):
+            DocTable(self.ns.Document, [{'date': 'Jan 5 2020'}])
@@ -1,6 +1,10 @@
 import unittest
+from unittest import mock
 
 from schema_docs.api import build_schemadoc_namespace
+from schema_docs.exceptions import InvalidSchemaDocException
+from schema_docs.instrumentation import SchemaDocInstrumentation
+
 
 class TestsValidation(unittest.TestCase):
     """
@@ -33,4 +37,151 @@ class TestsValidation(unittest.TestCase):
         self.assertEqual(len(doc.failed_validations()), 1)
 
         doc.code = '1'
-        self.assertTrue(doc.validate())
\ No newline at end of file
+        self.assertTrue(doc.validate())
+
+    def test_validation_plan(self):
+
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'uid': {'type': 'uuid', 'validate': 'not-empty'},
+                'date': {'type': 'date', 'validate': 'not-empty'},
+                'flag': {'type': 'bool', 'validate': 'not-empty'},
+                'code': {'type': 'string', 'validate': lambda value, doc: None if value else 'code is empty'},
+                'line': 'Line',
+            }
+        }, {
+            'name': 'Line',
+            'fields': {
+                'qty': {'type': 'number', 'validate': 'required'},
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+
+        plan = ns.Document._validation_plan
+        self.assertEqual(len(plan.checks), 4)
+        self.assertEqual(plan.nested_fields, ('line', ))
+
+        doc = ns.Document(
+            uid='00000000000000000000000000000000', date='0001-01-01', flag=False, code='', line={}
+        )
+        self.assertEqual(len(doc.failed_validations()), 4)
+
+        doc.uid = '8f5a7a8e2c1b4d6e9f0a1b2c3d4e5f60'
+        doc.date = '2020-01-01'
+        doc.code = 'a'
+        doc.line.qty = 1
+        self.assertTrue(doc.validate())
+
+    def test_short_circuit_validate(self):
+
+        calls = []
+
+        def check_code(value, doc):
+            calls.append(value)
+            return None if value else 'code is empty'
+
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'required'},
+                'code': {'type': 'string', 'validate': check_code},
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+
+        doc = ns.Document()
+
+        # проверка прекращается на первом несработавшем правиле, описания несработавших валидаций не формируются
+        with mock.patch('schema_docs.validation.SchemaDocFailedValidation') as failed_validation_cls:
+            self.assertFalse(doc.validate())
+            self.assertFalse(doc.validate())
+        failed_validation_cls.assert_not_called()
+        self.assertEqual(calls, [])
+
+        doc.name = 'a'
+        self.assertFalse(doc.validate())
+        self.assertEqual(calls, [None])
+
+        with self.assertRaises(InvalidSchemaDocException) as cm:
+            doc.validate(raise_exception=True)
+        self.assertEqual(str(cm.exception), 'code is empty')
+
+        doc.code = 'x'
+        self.assertTrue(doc.validate(raise_exception=True))
+
+    def test_incremental_validation(self):
+        calls = []
+
+        def check_code(value, doc):
+            calls.append(value)
+            return None if value else 'code is empty'
+
+        schema = [{
+            'name': 'Document',
+            'fields': {
+                'name': {'type': 'string', 'validate': 'required'},
+                'title': {'type': 'string', 'validate': 'not-empty'},
+                'code': {'type': 'string', 'validate': check_code},
+                'line': 'Line',
+            }
+        }, {
+            'name': 'Line',
+            'fields': {
+                'qty': {'type': 'number', 'validate': 'required'},
+            }
+        }]
+
+        ns = build_schemadoc_namespace(schema)
+        doc = ns.Document(title='', code='a', line={})
+
+        def checks():
+            snapshot = instrumentation.snapshot()
+            return sum(counters['validations'] for fields in snapshot.values() for counters in fields.values())
+
+        with SchemaDocInstrumentation(ns) as instrumentation:
+            self.assertEqual(len(doc.failed_validations()), 3)
+            self.assertEqual(checks(), 4)
+
+            # без изменений правила по полям не перепроверяются, функции валидации вызываются всегда
+            self.assertEqual(len(doc.failed_validations()), 3)
+            self.assertEqual(checks(), 5)
+            self.assertEqual(calls, ['a', 'a'])
+
+            doc.name = 'abc'
+            self.assertEqual(len(doc.failed_validations()), 2)
+            self.assertEqual(checks(), 7)
+
+            # изменение во вложенном документе перепроверяет только его поле
+            doc.line.qty = 1
+            self.assertEqual([fv.msg for fv in doc.failed_validations()],
+                             ['В поле title должно быть указано непустое значение'])
+            self.assertEqual(checks(), 9)
+
+            doc.title = 'x'
+            self.assertTrue(doc.validate())
+
+            # после from_dict перепроверяются все правила
+            doc.from_dict({'title': 'x', 'code': 'a'})
+            self.assertFalse(doc.validate())
+            self.assertEqual(instrumentation.snapshot()['Document']['name']['validations'], 3)
+
+    def test_in_place_changes_of_lists(self):
+        ns = build_schemadoc_namespace({
+            'name': 'Document',
+            'fields': {
+                'tags': {'type': 'array', 'validate': 'not-empty'},
+                'ids': {'type': 'array', 'items': {'type': 'string', 'validate': 'not-empty'}},
+            }
+        })
+        doc = ns.Document(tags=[], ids=['a'])
+
+        self.assertFalse(doc.validate())
+        doc.tags.append('x')
+        self.assertTrue(doc.validate())
+
+        doc.ids.append('')
+        self.assertFalse(doc.validate())
+        self.assertEqual([fv.path for fv in doc.failed_validations()], [('ids', 1)])